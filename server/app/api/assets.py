@@ -13,15 +13,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.auth import get_current_user, require_submitter
 from app.core.config import settings
 from app.core.database import get_db
-from app.models.asset import Asset, AssetStatus
+from app.models.asset import Asset, AssetDerivative, AssetStatus
 from app.models.party import Party, PartyUser
 from app.schemas.asset import AssetListItem, AssetMetadataUpdate, AssetResponse
-from app.services.badge import generate_badge_overlay, generate_qr_code
-from app.services.encryption import encrypt_data, generate_dek, encrypt_dek, encrypt_string
-from app.services.hashing import compute_all_hashes
+from app.services.asset_metadata import asset_metadata
+from app.services.encryption import encrypt_string
+from app.services.image_executor import image_executor
+from app.services.pdq_index import pdq_index
 from app.services.promoter_overlay import overlay_promoter_statement, VALID_POSITIONS
-from app.services.storage import store_blob, retrieve_blob
-from app.services.thumbnail import generate_thumbnail
+from app.services.storage import retrieve_blob
+from app.services.submission import run_submission, submission_stats
+from app.services.upload import ingest_upload
+from app.services.verification_cache import verification_cache
 
 router = APIRouter(prefix="/assets", tags=["assets"])
 
@@ -32,7 +35,7 @@ ALLOWED_MIME_TYPES = {
     "image/svg+xml",
     "application/pdf",
 }
-MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+MAX_FILE_SIZE = settings.MAX_UPLOAD_SIZE
 
 
 def _get_effective_promoter_statement(user: PartyUser, party: Party) -> str | None:
@@ -63,104 +66,27 @@ async def submit_asset(
     - promoter_position: corner for promoter text (top-left, top-right, bottom-left, bottom-right)
     - check_promoter_statement: OCR the image to check for existing promoter statement
     """
-    # Validate file type
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file type: {file.content_type}. Allowed: {ALLOWED_MIME_TYPES}",
-        )
-
-    # Read file bytes
-    image_bytes = await file.read()
-    if len(image_bytes) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB",
-        )
-    if len(image_bytes) == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Empty file",
-        )
+    # Validate type (sniffed from the content), size and emptiness while
+    # reading the upload in chunks
+    upload = await ingest_upload(file, ALLOWED_MIME_TYPES, MAX_FILE_SIZE)
+    image_bytes = await upload.read()
 
     # Get party info
     party_result = await db.execute(select(Party).where(Party.id == user.party_id))
     party = party_result.scalar_one()
 
-    # Auto-detect promoter statement via OCR
-    auto_promoter_added = False
-    promoter_already_present = False
-    promoter_check_result = None
-    promoter_storage_key = None
-
     effective_statement = _get_effective_promoter_statement(user, party)
-
-    if effective_statement:
-        # Always run OCR to check for existing promoter statement
-        from app.services.ocr import find_promoter_statement
-        promoter_check_result = find_promoter_statement(
-            image_bytes, effective_statement
-        )
-
-        if promoter_check_result.get("found"):
-            promoter_already_present = True
-        else:
-            # Promoter not found -- auto-add it
-            position = promoter_position or user.default_statement_position
-            if position not in VALID_POSITIONS:
-                position = "bottom-left"
-
-            promoter_bytes = overlay_promoter_statement(
-                image_bytes, effective_statement, position=position
-            )
-            promoter_storage_key = await store_blob(promoter_bytes, prefix="promoter")
-            auto_promoter_added = True
-    elif add_promoter_statement:
+    if add_promoter_statement and not effective_statement:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No promoter statement set. Set one via your profile or party settings.",
         )
 
-    # If user explicitly requested promoter and it wasn't auto-added (already present)
-    if add_promoter_statement and not promoter_storage_key and not promoter_already_present:
-        if effective_statement:
-            position = promoter_position or user.default_statement_position
-            if position not in VALID_POSITIONS:
-                position = "bottom-left"
-            promoter_bytes = overlay_promoter_statement(
-                image_bytes, effective_statement, position=position
-            )
-            promoter_storage_key = await store_blob(promoter_bytes, prefix="promoter")
-
-    # Compute hashes on the original image (before any badge overlay)
-    hashes = compute_all_hashes(image_bytes)
-
-    # Generate verification ID
-    verification_id = _generate_verification_id()
-
-    # Encrypt and store original image
-    dek = generate_dek()
-    encrypted_image, nonce = encrypt_data(image_bytes, dek)
-    encrypted_dek = encrypt_dek(dek)
-    storage_key = await store_blob(encrypted_image, prefix="assets")
-
-    # Generate and store QR code
-    qr_bytes = generate_qr_code(verification_id)
-    qr_storage_key = await store_blob(qr_bytes, prefix="qrcodes")
+    position = promoter_position or user.default_statement_position
+    if position not in VALID_POSITIONS:
+        position = "bottom-left"
 
-    # Generate and store badge overlay image
-    badge_bytes = generate_badge_overlay(
-        image_bytes, verification_id, party.short_name, badge_position
-    )
-    badge_dek = generate_dek()
-    encrypted_badge, badge_nonce = encrypt_data(badge_bytes, badge_dek)
-    badge_storage_key = await store_blob(encrypted_badge, prefix="badges")
-
-    # Generate and store thumbnail (unencrypted, low-res preview)
-    thumb_bytes = generate_thumbnail(image_bytes)
-    thumbnail_storage_key = await store_blob(thumb_bytes, prefix="thumbnails")
-
-    # Parse metadata JSON
+    # Parse metadata JSON before any work or storage is done
     metadata_dict = None
     if metadata:
         try:
@@ -171,29 +97,70 @@ async def submit_asset(
                 detail="Invalid JSON in metadata field",
             )
 
+    # Generate verification ID
+    verification_id = _generate_verification_id()
+
+    # OCR check for an existing promoter statement (auto-adding it when
+    # missing), hashing, badge, QR code and thumbnail run in the image
+    # executor, off the event loop, and every blob is stored as soon as it
+    # is ready; the blobs are deleted again if any stage fails
+    submission = await run_submission(
+        image_bytes,
+        verification_id,
+        party.short_name,
+        badge_position,
+        effective_statement,
+        position,
+    )
+    hashes = submission.hashes
+    promoter_check_result = submission.promoter_check
+    promoter_already_present = bool(
+        promoter_check_result and promoter_check_result.get("found")
+    )
+    promoter_storage_key = submission.promoter_storage_key
+    auto_promoter_added = promoter_storage_key is not None
+
     # Create asset record
     asset = Asset(
         party_id=user.party_id,
         submitted_by=user.id,
         original_filename_encrypted=encrypt_string(file.filename or "unknown"),
-        mime_type=file.content_type,
-        file_size=len(image_bytes),
+        mime_type=upload.mime_type,
+        file_size=upload.size,
         sha256_hash=hashes["sha256"],
         pdq_hash=hashes["pdq_hash"],
         pdq_quality=hashes["pdq_quality"],
         phash=hashes["phash"],
-        encrypted_storage_key=f"{storage_key}|{encrypted_dek}",
-        encryption_iv=nonce.hex(),
-        badge_storage_key=badge_storage_key,
+        encrypted_storage_key=f"{submission.storage_key}|{submission.encrypted_dek}",
+        encryption_iv=submission.nonce.hex(),
+        badge_storage_key=submission.badge_storage_key,
         promoter_storage_key=promoter_storage_key,
-        qr_code_storage_key=qr_storage_key,
-        thumbnail_storage_key=thumbnail_storage_key,
+        qr_code_storage_key=submission.qr_storage_key,
+        thumbnail_storage_key=submission.thumbnail_storage_key,
         verification_id=verification_id,
         metadata_json=metadata_dict,
     )
+    # Register the distributed versions for exact matching
+    for kind, derivative in submission.derivative_hashes.items():
+        db.add(
+            AssetDerivative(
+                asset=asset,
+                kind=kind,
+                sha256_hash=derivative["sha256"],
+                pdq_hash=derivative["pdq_hash"],
+            )
+        )
     db.add(asset)
-    await db.commit()
+    try:
+        with submission_stats.time("commit"):
+            await db.commit()
+    except Exception:
+        await db.rollback()
+        await submission.discard()
+        raise
     await db.refresh(asset)
+    pdq_index.add(asset.id, asset.pdq_hash, asset.phash)
+    verification_cache.clear()
 
     verification_url = f"{settings.VERIFICATION_BASE_URL}/{verification_id}"
     return AssetResponse(
@@ -236,23 +203,8 @@ async def add_promoter_to_image(
     Does NOT register the image as an asset. Returns the modified image
     as PNG bytes for download.
     """
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file type: {file.content_type}",
-        )
-
-    image_bytes = await file.read()
-    if len(image_bytes) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB",
-        )
-    if len(image_bytes) == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Empty file",
-        )
+    upload = await ingest_upload(file, ALLOWED_MIME_TYPES, MAX_FILE_SIZE)
+    image_bytes = await upload.read()
 
     # Get effective promoter statement (user's own or party fallback)
     party_result = await db.execute(select(Party).where(Party.id == user.party_id))
@@ -269,8 +221,8 @@ async def add_promoter_to_image(
     if pos not in VALID_POSITIONS:
         pos = "bottom-left"
 
-    result_bytes = overlay_promoter_statement(
-        image_bytes, effective_statement, position=pos
+    result_bytes = await image_executor.run(
+        "overlay", overlay_promoter_statement, image_bytes, effective_statement, pos
     )
     return Response(
         content=result_bytes,
@@ -378,6 +330,10 @@ async def update_asset(
 
     await db.commit()
     await db.refresh(asset)
+    if asset.status != AssetStatus.ACTIVE:
+        pdq_index.remove(asset.id)
+        verification_cache.clear()
+        asset_metadata.discard_asset(asset.id)
 
     verification_url = f"{settings.VERIFICATION_BASE_URL}/{asset.verification_id}"
     return AssetResponse(
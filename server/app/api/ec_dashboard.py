@@ -1,5 +1,6 @@
 """Electoral Commission dashboard API endpoints."""
 
+import asyncio
 import uuid
 from datetime import datetime, timedelta, timezone
 
@@ -14,7 +15,19 @@ from app.models.asset import Asset, AssetStatus
 from app.models.geo_stats import VerificationGeoStat
 from app.models.party import Party, PartyUser
 from app.models.verification import VerificationLog, VerificationResult
+from app.services.asset_metadata import asset_metadata
 from app.services.encryption import decrypt_dek, decrypt_data
+from app.services.geo_counters import geo_counters
+from app.services.geolocation import geolocation_stats
+from app.services.image_executor import image_executor, ocr_executor
+from app.services.log_sink import log_sink
+from app.services.ocr_cache import ocr_cache
+from app.services.promoter_checks import promoter_checks
+from app.services.promoter_index import promoter_index
+from app.services.single_flight import verification_flight, verification_worker_flight
+from app.services.submission import submission_stats
+from app.services.verification_cache import verification_cache
+from app.services.verification_stats import verification_stats
 from app.services.storage import retrieve_blob
 
 router = APIRouter(prefix="/ec", tags=["electoral_commission"])
@@ -139,6 +152,31 @@ async def ec_geo_stats(
     ]
 
 
+@router.get("/performance")
+async def ec_performance_stats(
+    user: PartyUser = Depends(require_electoral_commission),
+):
+    """Runtime statistics for this API worker process."""
+    return {
+        "image_executor": image_executor.stats(),
+        "ocr_executor": ocr_executor.stats(),
+        "promoter_checks": promoter_checks.stats(),
+        "promoter_index": promoter_index.stats(),
+        "ocr_cache": await asyncio.to_thread(ocr_cache.stats),
+        "verification": verification_stats.stats(),
+        "submission": submission_stats.stats(),
+        "verification_cache": verification_cache.stats(),
+        "asset_metadata": asset_metadata.stats(),
+        "verification_log_sink": log_sink.stats(),
+        "geo_counters": geo_counters.stats(),
+        "geolocation": geolocation_stats(),
+        "verification_coalescing": {
+            "in_process": verification_flight.stats(),
+            "across_workers": verification_worker_flight.stats(),
+        },
+    }
+
+
 @router.get("/images")
 async def ec_browse_images(
     page: int = Query(1, ge=1),
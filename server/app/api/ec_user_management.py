@@ -22,6 +22,7 @@ from app.services.email_sender import (
     send_email_changed_notification,
     send_password_reset_email,
 )
+from app.services.promoter_index import promoter_index
 
 logger = logging.getLogger(__name__)
 
@@ -214,6 +215,7 @@ async def ec_create_candidate(
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    promoter_index.set_user(new_user)
 
     return {
         "id": str(new_user.id),
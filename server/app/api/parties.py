@@ -20,7 +20,10 @@ from app.schemas.party import (
     PromoterStatementResponse,
     PromoterStatementUpdate,
 )
+from app.services.asset_metadata import asset_metadata
 from app.services.encryption import encrypt_string
+from app.services.promoter_index import promoter_index
+from app.services.verification_cache import verification_cache
 
 router = APIRouter(prefix="/parties", tags=["parties"])
 
@@ -79,6 +82,8 @@ async def set_user_promoter_statement(
 
     await db.commit()
     await db.refresh(db_user)
+    promoter_index.set_user(db_user)
+    verification_cache.clear()
 
     return {
         "user_statement": db_user.promoter_statement,
@@ -98,6 +103,8 @@ async def clear_user_promoter_statement(
     db_user.promoter_statement_updated_at = None
 
     await db.commit()
+    promoter_index.set_user(db_user)
+    verification_cache.clear()
 
     party_result = await db.execute(select(Party).where(Party.id == user.party_id))
     party = party_result.scalar_one()
@@ -212,6 +219,10 @@ async def update_party(
 
     await db.commit()
     await db.refresh(party)
+    # Cached verification responses embed the party name
+    verification_cache.clear()
+    asset_metadata.discard_party(party.id)
+    promoter_index.set_party(party)
     return party
 
 
@@ -314,7 +325,9 @@ async def set_promoter_statement(
     party.promoter_statement_updated_at = datetime.now(timezone.utc)
 
     await db.commit()
+    verification_cache.clear()
     await db.refresh(party)
+    promoter_index.set_party(party)
 
     return PromoterStatementResponse(
         statement=party.promoter_statement,
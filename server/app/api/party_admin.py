@@ -20,6 +20,7 @@ from app.services.email_sender import (
     send_email_changed_notification,
     send_password_reset_email,
 )
+from app.services.promoter_index import promoter_index
 
 logger = logging.getLogger(__name__)
 
@@ -128,6 +129,7 @@ async def create_candidate(
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    promoter_index.set_user(new_user)
 
     return {
         "id": str(new_user.id),
@@ -271,6 +273,7 @@ async def toggle_member_active(
 
     target.is_active = body.is_active
     await db.commit()
+    promoter_index.set_user(target)
 
     return {
         "detail": f"User {'activated' if body.is_active else 'deactivated'}",
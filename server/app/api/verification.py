@@ -1,30 +1,52 @@
 """Public verification endpoints - no authentication required."""
 
-import asyncio
 import hashlib
 import logging
-from datetime import date
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
 
-from fastapi import APIRouter, Depends, File, Request, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.models.asset import Asset, AssetStatus
-from app.models.geo_stats import VerificationGeoStat
-from app.models.party import Party
-from app.models.verification import MatchType, VerificationLog, VerificationResult
+from app.models.asset import Asset, AssetDerivative, AssetStatus
+from app.models.verification import (
+    MatchType,
+    PromoterCheck,
+    VerificationLog,
+    VerificationResult,
+)
 from app.schemas.verification import (
     HashVerifyRequest,
+    PromoterCheckResponse,
     VerificationByIdResponse,
     VerificationResponse,
 )
-from app.services.hashing import (
-    compute_all_hashes,
-    pdq_match,
-    phash_match,
+from app.services.asset_metadata import AssetInfo, asset_metadata
+from app.services.geo_counters import geo_counters
+from app.services.hash_search import (
+    find_closest_pdq,
+    find_closest_pdq_banded,
+    find_closest_phash,
+)
+from app.services.hashing import compute_perceptual_hashes
+from app.services.image_executor import image_executor
+from app.services.log_sink import log_sink
+from app.services.pdq_index import pdq_index
+from app.services.promoter_checks import promoter_checks
+from app.services.promoter_index import promoter_index
+from app.services.single_flight import verification_flight, verification_worker_flight
+from app.services.upload import (
+    RASTER_IMAGE_TYPES,
+    EmptyUpload,
+    IngestedUpload,
+    ingest_upload,
 )
+from app.services.verification_cache import hash_key, image_key, verification_cache
+from app.services.verification_stats import verification_stats
 
 logger = logging.getLogger(__name__)
 
@@ -36,99 +58,140 @@ def _hash_ip(request: Request) -> str:
     return hashlib.sha256(client_ip.encode()).hexdigest()
 
 
+MatchResult = tuple[AssetInfo | None, MatchType, int | None, int | None, float]
+
+NO_MATCH: MatchResult = (None, MatchType.NONE, None, None, 0.0)
+
+
+async def _find_exact(db: AsyncSession, sha256: str) -> MatchResult | None:
+    """Tier 1: exact SHA-256 lookup of originals, then of the badge and
+    promoter-stamped files generated from them. Needs no image decode."""
+    result = await db.execute(
+        select(Asset).where(
+            Asset.sha256_hash == sha256,
+            Asset.status == AssetStatus.ACTIVE,
+        )
+    )
+    asset = result.scalar_one_or_none()
+    if not asset:
+        result = await db.execute(
+            select(Asset)
+            .join(AssetDerivative, AssetDerivative.asset_id == Asset.id)
+            .where(
+                AssetDerivative.sha256_hash == sha256,
+                Asset.status == AssetStatus.ACTIVE,
+            )
+            .limit(1)
+        )
+        asset = result.scalar_one_or_none()
+    if asset:
+        info = await asset_metadata.from_asset(db, asset)
+        return info, MatchType.EXACT, None, None, 1.0
+    return None
+
+
+async def _find_perceptual(
+    db: AsyncSession,
+    pdq_hash: str | None = None,
+    phash: str | None = None,
+) -> MatchResult:
+    """Tiers 2 and 3: PDQ matching, then the pHash fallback."""
+    best_match = None
+    pdq_distance = None
+    phash_distance = None
+    if settings.PDQ_MATCH_BACKEND == "memory":
+        # One cascade pass over the in-memory index covers both hashes
+        if pdq_hash or phash:
+            await pdq_index.sync(db)
+            hit = pdq_index.match(pdq_hash, phash)
+            if hit:
+                best_match = await asset_metadata.get(db, hit.key)
+                if best_match and best_match.status == AssetStatus.ACTIVE:
+                    pdq_distance, phash_distance = hit.pdq_distance, hit.phash_distance
+                else:
+                    # Stale entry (revoked by another worker since the last sync)
+                    pdq_index.remove(hit.key)
+                    best_match = None
+    else:
+        # Band lookup or full database-side filter, per PDQ_MATCH_BACKEND
+        if pdq_hash:
+            finder = (
+                find_closest_pdq_banded
+                if settings.PDQ_MATCH_BACKEND == "bands"
+                else find_closest_pdq
+            )
+            found = await finder(db, pdq_hash, settings.PDQ_MATCH_THRESHOLD)
+            if found:
+                asset, pdq_distance = found
+                best_match = await asset_metadata.from_asset(db, asset)
+        if not best_match and phash:
+            found = await find_closest_phash(db, phash, settings.PHASH_MATCH_THRESHOLD)
+            if found:
+                asset, phash_distance = found
+                best_match = await asset_metadata.from_asset(db, asset)
+
+    if best_match and pdq_distance is not None:
+        verification_stats.record_tier("pdq")
+        confidence = 1.0 - (pdq_distance / settings.PDQ_MATCH_THRESHOLD)
+        return (
+            best_match,
+            MatchType.PERCEPTUAL,
+            pdq_distance,
+            None,
+            max(0.5, confidence),
+        )
+
+    if best_match:
+        verification_stats.record_tier("phash")
+        confidence = 1.0 - (phash_distance / settings.PHASH_MATCH_THRESHOLD)
+        return (
+            best_match,
+            MatchType.PERCEPTUAL,
+            None,
+            phash_distance,
+            max(0.4, confidence),
+        )
+
+    verification_stats.record_tier("none")
+    return NO_MATCH
+
+
 async def _find_match(
     db: AsyncSession,
     sha256: str | None = None,
     pdq_hash: str | None = None,
     phash: str | None = None,
-) -> tuple[Asset | None, MatchType, int | None, int | None, float]:
+) -> MatchResult:
     """Search for matching assets using hash comparison.
     Returns (asset, match_type, pdq_distance, phash_distance, confidence).
     """
     # 1. Try exact SHA-256 match first (fastest)
     if sha256:
-        result = await db.execute(
-            select(Asset).where(
-                Asset.sha256_hash == sha256,
-                Asset.status == AssetStatus.ACTIVE,
-            )
-        )
-        asset = result.scalar_one_or_none()
-        if asset:
-            return asset, MatchType.EXACT, None, None, 1.0
+        exact = await _find_exact(db, sha256)
+        if exact:
+            verification_stats.record_tier("exact")
+            return exact
 
-    # 2. Try PDQ perceptual match
-    if pdq_hash:
-        result = await db.execute(
-            select(Asset).where(Asset.status == AssetStatus.ACTIVE)
-        )
-        assets = result.scalars().all()
-        best_match = None
-        best_distance = 256
-        for asset in assets:
-            is_match, distance = pdq_match(pdq_hash, asset.pdq_hash)
-            if is_match and distance < best_distance:
-                best_distance = distance
-                best_match = asset
-
-        if best_match:
-            confidence = 1.0 - (best_distance / settings.PDQ_MATCH_THRESHOLD)
-            return (
-                best_match,
-                MatchType.PERCEPTUAL,
-                best_distance,
-                None,
-                max(0.5, confidence),
-            )
-
-    # 3. Try pHash fallback
-    if phash:
-        result = await db.execute(
-            select(Asset).where(Asset.status == AssetStatus.ACTIVE)
-        )
-        assets = result.scalars().all()
-        best_match = None
-        best_distance = 64
-        for asset in assets:
-            is_match, distance = phash_match(phash, asset.phash)
-            if is_match and distance < best_distance:
-                best_distance = distance
-                best_match = asset
-
-        if best_match:
-            confidence = 1.0 - (best_distance / settings.PHASH_MATCH_THRESHOLD)
-            return (
-                best_match,
-                MatchType.PERCEPTUAL,
-                None,
-                best_distance,
-                max(0.4, confidence),
-            )
-
-    return None, MatchType.NONE, None, None, 0.0
+    # 2. Try perceptual matching: PDQ first, then the pHash fallback
+    return await _find_perceptual(db, pdq_hash, phash)
 
 
-async def _build_response(
-    asset: Asset | None,
+def _build_response(
+    asset: AssetInfo | None,
     match_type: MatchType,
     pdq_distance: int | None,
     phash_distance: int | None,
     confidence: float,
-    db: AsyncSession,
 ) -> VerificationResponse:
     if asset:
-        party_result = await db.execute(
-            select(Party).where(Party.id == asset.party_id)
-        )
-        party = party_result.scalar_one_or_none()
         return VerificationResponse(
             verified=True,
             result=VerificationResult.VERIFIED,
             match_type=match_type,
             confidence=confidence,
             party={
-                "name": party.name if party else "Unknown",
-                "short_name": party.short_name if party else "Unknown",
+                "name": asset.party_name or "Unknown",
+                "short_name": asset.party_short_name or "Unknown",
             },
             asset_id=asset.id,
             verification_id=asset.verification_id,
@@ -158,28 +221,32 @@ async def _record_geo_stat(request: Request, db: AsyncSession) -> None:
             return
 
         region, country = await resolve_location(client_ip)
-        today = date.today()
-
-        result = await db.execute(
-            select(VerificationGeoStat).where(
-                VerificationGeoStat.date == today,
-                VerificationGeoStat.region == region,
-                VerificationGeoStat.country == country,
-            )
-        )
-        stat = result.scalar_one_or_none()
-        if stat:
-            stat.verification_count += 1
-        else:
-            stat = VerificationGeoStat(
-                date=today,
-                region=region,
-                country=country,
-                verification_count=1,
-            )
-            db.add(stat)
+        await geo_counters.record(db, region, country)
     except Exception:
-        logger.debug("Geo stat recording failed (non-fatal)")
+        logger.warning("Geo stat recording failed (non-fatal)", exc_info=True)
+
+
+async def _record_verification(
+    request: Request, db: AsyncSession, response: VerificationResponse
+) -> None:
+    """Record geo stats and the verification log entry for a response."""
+    # Record geographic stats (privacy-first: only aggregate counts)
+    await _record_geo_stat(request, db)
+
+    # Log the verification attempt; written behind the response by the log
+    # sink when it is running, otherwise inline
+    row = {
+        "asset_id": response.asset_id,
+        "match_type": response.match_type,
+        "pdq_distance": response.pdq_distance,
+        "phash_distance": response.phash_distance,
+        "source_ip_hash": _hash_ip(request),
+        "result": response.result,
+        "created_at": datetime.now(timezone.utc),
+    }
+    if not log_sink.submit(row):
+        db.add(VerificationLog(**row))
+    await db.commit()
 
 
 @router.post("/image", response_model=VerificationResponse)
@@ -189,8 +256,11 @@ async def verify_image(
     db: AsyncSession = Depends(get_db),
 ):
     """Upload an image to check if it's registered by any party."""
-    image_bytes = await file.read()
-    if len(image_bytes) == 0:
+    # The upload is hashed in chunks; its bytes are only loaded if the
+    # cache and the exact tier both miss and the image must be decoded
+    try:
+        upload = await ingest_upload(file, RASTER_IMAGE_TYPES)
+    except EmptyUpload:
         return VerificationResponse(
             verified=False,
             result=VerificationResult.ERROR,
@@ -198,67 +268,96 @@ async def verify_image(
             confidence=0.0,
         )
 
-    hashes = compute_all_hashes(image_bytes)
-    asset, match_type, pdq_dist, phash_dist, confidence = await _find_match(
-        db,
-        sha256=hashes["sha256"],
-        pdq_hash=hashes["pdq_hash"],
-        phash=hashes["phash"],
+    sha256 = upload.sha256
+    response = verification_cache.get(image_key(sha256))
+    if response is None:
+        # Concurrent uploads of the same bytes share one computation
+        computed = []
+
+        async def verify_once() -> VerificationResponse:
+            computed.append(True)
+            return await _verify_upload(db, upload)
+
+        response = await verification_flight.do(
+            sha256, lambda: _verify_across_workers(sha256, verify_once)
+        )
+        if not computed:
+            verification_stats.record_upload(decoded=False)
+    else:
+        verification_stats.record_upload(decoded=False)
+
+    await _record_verification(request, db, response)
+    return response
+
+
+async def _verify_across_workers(
+    sha256: str, verify: Callable[[], Awaitable[VerificationResponse]]
+) -> VerificationResponse:
+    """Run ``verify`` once per image across this host's workers."""
+    if not (
+        settings.VERIFY_COALESCE_ACROSS_WORKERS
+        and verification_worker_flight.available
+    ):
+        return await verify()
+    return await verification_worker_flight.do(
+        sha256,
+        verify,
+        dump=VerificationResponse.model_dump_json,
+        load=VerificationResponse.model_validate_json,
     )
 
-    # OCR-based promoter detection (only when hash matching fails)
+
+async def _verify_upload(db: AsyncSession, upload: IngestedUpload) -> VerificationResponse:
+    """Match an uploaded image and build (and cache) its response."""
+    cache_generation = verification_cache.generation
+    sha256 = upload.sha256
+
+    # Tiered matching: the upload is only read, decoded and perceptually
+    # hashed when the exact SHA-256 lookup misses
+    match = await _find_exact(db, sha256)
+    if match:
+        verification_stats.record_tier("exact")
+    else:
+        image_bytes = await upload.read()
+        hashes = await image_executor.run(
+            "hash", compute_perceptual_hashes, image_bytes
+        )
+        match = await _find_perceptual(db, hashes["pdq_hash"], hashes["phash"])
+    verification_stats.record_upload(decoded=match[1] != MatchType.EXACT)
+    asset, match_type, pdq_dist, phash_dist, confidence = match
+
+    # OCR-based promoter detection (only when hash matching fails), on the
+    # OCR pool and deferred past the response if it overruns its budget
     promoter_detected = False
     promoter_party_name = None
+    promoter_check_id = None
+    ocr_failed = False
     if not asset:
         try:
-            from app.services.ocr import find_promoter_across_parties
-
-            party_result = await db.execute(
-                select(Party).where(Party.promoter_statement.isnot(None))
-            )
-            parties_with_statements = [
-                (str(p.id), p.name, p.promoter_statement)
-                for p in party_result.scalars().all()
-            ]
-            if parties_with_statements:
-                ocr_result = await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    find_promoter_across_parties,
-                    image_bytes,
-                    parties_with_statements,
+            indexed = await promoter_index.snapshot(db)
+            if indexed:
+                ocr_result, promoter_check_id = await promoter_checks.run(
+                    await upload.read(), indexed.parties, indexed.statements
                 )
-                if ocr_result.get("found"):
+                if ocr_result and ocr_result.get("found"):
                     promoter_detected = True
                     promoter_party_name = ocr_result.get("party_name")
         except Exception:
-            pass  # OCR failure is non-fatal
+            ocr_failed = True  # OCR failure is non-fatal
 
-    # Record geographic stats (privacy-first: only aggregate counts)
-    await _record_geo_stat(request, db)
-
-    # Log the verification attempt
-    log_entry = VerificationLog(
-        asset_id=asset.id if asset else None,
-        match_type=match_type,
-        pdq_distance=pdq_dist,
-        phash_distance=phash_dist,
-        source_ip_hash=_hash_ip(request),
-        result=(
-            VerificationResult.VERIFIED if asset else VerificationResult.UNVERIFIED
-        ),
-    )
-    db.add(log_entry)
-    await db.commit()
-
-    response = await _build_response(
-        asset, match_type, pdq_dist, phash_dist, confidence, db
-    )
+    response = _build_response(asset, match_type, pdq_dist, phash_dist, confidence)
 
     # Augment response with OCR data
     if promoter_detected and not asset:
         response.promoter_detected = True
         response.promoter_party_name = promoter_party_name
+    response.promoter_check_id = promoter_check_id
 
+    # Don't cache an outcome that a working OCR pass might change, nor one
+    # whose deferred check may still find a statement (repeat uploads would
+    # get "not detected" after the check found one)
+    if not ocr_failed and promoter_check_id is None:
+        verification_cache.put(image_key(sha256), response, cache_generation)
     return response
 
 
@@ -277,27 +376,29 @@ async def verify_hash(
             confidence=0.0,
         )
 
-    asset, match_type, pdq_dist, phash_dist, confidence = await _find_match(
-        db, sha256=body.sha256, pdq_hash=body.pdq, phash=body.phash
-    )
+    cache_key = hash_key(body.sha256, body.pdq, body.phash)
+    response = verification_cache.get(cache_key)
+    if response is None:
+        cache_generation = verification_cache.generation
+        asset, match_type, pdq_dist, phash_dist, confidence = await _find_match(
+            db, sha256=body.sha256, pdq_hash=body.pdq, phash=body.phash
+        )
+        response = _build_response(
+            asset, match_type, pdq_dist, phash_dist, confidence
+        )
+        verification_cache.put(cache_key, response, cache_generation)
 
-    # Record geographic stats
-    await _record_geo_stat(request, db)
+    await _record_verification(request, db, response)
+    return response
 
-    log_entry = VerificationLog(
-        asset_id=asset.id if asset else None,
-        match_type=match_type,
-        pdq_distance=pdq_dist,
-        phash_distance=phash_dist,
-        source_ip_hash=_hash_ip(request),
-        result=(
-            VerificationResult.VERIFIED if asset else VerificationResult.UNVERIFIED
-        ),
-    )
-    db.add(log_entry)
-    await db.commit()
 
-    return await _build_response(asset, match_type, pdq_dist, phash_dist, confidence, db)
+@router.get("/promoter-check/{check_id}", response_model=PromoterCheckResponse)
+async def get_promoter_check(check_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    """Outcome of an OCR promoter check deferred by /verify/image."""
+    check = await db.get(PromoterCheck, check_id)
+    if not check:
+        raise HTTPException(status_code=404, detail="Promoter check not found")
+    return PromoterCheckResponse.model_validate(check, from_attributes=True)
 
 
 @router.get("/{verification_id}", response_model=VerificationByIdResponse)
@@ -306,10 +407,7 @@ async def verify_by_id(
     db: AsyncSession = Depends(get_db),
 ):
     """Look up a verification by its short ID (from QR code scan)."""
-    result = await db.execute(
-        select(Asset).where(Asset.verification_id == verification_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await asset_metadata.get_by_verification_id(db, verification_id)
 
     if not asset or asset.status != AssetStatus.ACTIVE:
         return VerificationByIdResponse(
@@ -318,13 +416,10 @@ async def verify_by_id(
             status="not_found" if not asset else asset.status.value,
         )
 
-    party_result = await db.execute(select(Party).where(Party.id == asset.party_id))
-    party = party_result.scalar_one_or_none()
-
     return VerificationByIdResponse(
         verified=True,
-        party_name=party.name if party else None,
-        party_short_name=party.short_name if party else None,
+        party_name=asset.party_name,
+        party_short_name=asset.party_short_name,
         registered_date=asset.created_at,
         status=asset.status.value,
         verification_id=verification_id,
@@ -25,10 +25,81 @@ class Settings(BaseSettings):
     S3_ACCESS_KEY: str = ""
     S3_SECRET_KEY: str = ""
 
+    # Uploads are read, sniffed and hashed in chunks of UPLOAD_CHUNK_SIZE
+    MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+
     # Verification
     PDQ_MATCH_THRESHOLD: int = 31
     PHASH_MATCH_THRESHOLD: int = 10
+    # "memory" (per-worker PDQ index), "bands" (indexed LSH band columns,
+    # stateless across nodes) or "database" (full server-side bit_count scan)
+    PDQ_MATCH_BACKEND: str = "memory"
+    PDQ_INDEX_ENGINE: str = "mih"  # "mih" (multi-index hashing) or "packed"
+    PDQ_INDEX_REFRESH_SECONDS: int = 30
+    # Relaxed pHash bound used to prune rows before the PDQ stage of the
+    # cascade; only the "packed" engine cascades ("mih" ignores it). Lossy:
+    # a PDQ match more than this many pHash bits away is missed. On the
+    # edited copies in benchmarks/bench_cascade.py no PDQ match was lost at
+    # 16-32 (widest pHash distance among matches: 14) while 24 skips 97% of
+    # unrelated rows. 64 disables pruning
+    PHASH_CASCADE_PRUNE_DISTANCE: int = 24
     VERIFICATION_BASE_URL: str = "http://localhost:3000/verify"
+    # Hash a reduced decode (JPEG DCT scaling / box reduce) instead of the
+    # full-resolution image; shorter side is kept >= HASH_DECODE_SIZE
+    HASH_FAST_DECODE: bool = True
+    HASH_DECODE_SIZE: int = 512
+    # Per-worker cache of verification outcomes (0 disables)
+    VERIFICATION_CACHE_SIZE: int = 10000
+    VERIFICATION_CACHE_TTL_SECONDS: int = 60
+    # Per-worker cache of matched assets' party name, status and dates
+    ASSET_METADATA_CACHE_SIZE: int = 50000
+    ASSET_METADATA_TTL_SECONDS: int = 60
+    # Coalesce identical concurrent /verify/image work across the workers
+    # on a host via lock files in VERIFY_LOCK_DIR (default: system temp dir)
+    VERIFY_COALESCE_ACROSS_WORKERS: bool = True
+    VERIFY_LOCK_DIR: str = ""
+    VERIFY_LOCK_TIMEOUT_SECONDS: float = 30.0
+    # Also record the PDQ of generated badge/promoter files (SHA-256 always).
+    # Verification only looks derivatives up by SHA-256 and they are not in
+    # pdq_index, so this costs a decode per file for data nothing reads yet
+    REGISTER_DERIVATIVE_PDQ: bool = False
+
+    # Image processing executor: hashing, OCR, overlays and thumbnails run
+    # off the event loop in a "process" or "thread" pool
+    IMAGE_EXECUTOR_MODE: str = "process"
+    IMAGE_EXECUTOR_WORKERS: int = 2
+    # Tasks in flight (running or waiting) before new work is rejected (503)
+    IMAGE_EXECUTOR_MAX_QUEUE: int = 32
+    # Max concurrent tasks per task type; unlisted types are only bounded
+    # by the pool size. Submission stages ("submission.badge", ...) share
+    # the one "submission.stages" limit, across all submissions; keep it
+    # below IMAGE_EXECUTOR_WORKERS to leave workers for verification
+    IMAGE_TASK_LIMITS: dict[str, int] = {
+        "submission": 1,
+        "submission.stages": 1,
+        "overlay": 1,
+    }
+    # Run the submission stages (OCR check, badge, hashes with thumbnail
+    # and QR code) as up to three executor tasks, each decoding the upload
+    # and holding a queue slot, instead of one task with a single decode.
+    # Only worth enabling with "submission.stages" raised above 1
+    SUBMISSION_PARALLEL_STAGES: bool = False
+
+    # Write-behind VerificationLog inserts: flushed every N rows or M ms
+    LOG_SINK_BATCH_SIZE: int = 500
+    LOG_SINK_FLUSH_INTERVAL_MS: int = 500
+    LOG_SINK_MAX_QUEUE: int = 10000
+
+    # Per-worker geo stat counts are upserted on this interval
+    GEO_STATS_FLUSH_SECONDS: int = 10
+
+    # Offline IP-range geolocation (GeoLite2-style CSV); ip-api.com is used
+    # when GEOIP_DATABASE_PATH is unset. The file is reloaded when it changes.
+    GEOIP_DATABASE_PATH: str = ""
+    GEOIP_LOCATIONS_PATH: str = ""  # default: *-Locations-en.csv beside it
+    GEOIP_CACHE_SIZE: int = 100000
+    GEOIP_RELOAD_CHECK_SECONDS: int = 60
 
     # Badge
     BADGE_MAX_AREA_PERCENT: float = 5.0
@@ -38,6 +109,42 @@ class Settings(BaseSettings):
     PROMOTER_MIN_FONT_SIZE: int = 12
     PROMOTER_WCAG_CONTRAST_RATIO: float = 4.5
     PROMOTER_OCR_MATCH_THRESHOLD: float = 0.8
+    # Per-worker index of party and candidate statements is reloaded from
+    # the database this often (local changes apply immediately)
+    PROMOTER_INDEX_REFRESH_SECONDS: int = 60
+    # Public verification OCRs unmatched images on a separate pool. A result
+    # not ready within PROMOTER_OCR_BUDGET_MS is deferred: the response
+    # carries a promoter_check_id to fetch it from /verify/promoter-check/
+    PROMOTER_OCR_BUDGET_MS: int = 300
+    OCR_EXECUTOR_WORKERS: int = 1
+    OCR_EXECUTOR_MAX_QUEUE: int = 16
+    PROMOTER_CHECK_RETENTION_HOURS: int = 24
+    # Promoter OCR reads the corner/edge bands where statements are placed
+    # before falling back to the full image; bands are scaled so the
+    # smallest statement text expected is about OCR_ROI_TEXT_HEIGHT px tall
+    OCR_ROI_ENABLED: bool = True
+    OCR_ROI_TEXT_HEIGHT: int = 24
+    # Public verification skips OCR when ocr.text_score (longest line of
+    # small text found in the bands, in text heights) is below this; 0 = off
+    OCR_TEXT_SCORE_CUTOFF: float = 4.0
+    # "tesserocr" (engines kept loaded in each OCR worker process; needs
+    # requirements-ocr.txt), "pytesseract" (a tesseract process per call)
+    # or "auto"
+    OCR_BACKEND: str = "auto"
+    # Engines per process (threads beyond this wait); each is recycled
+    # after OCR_ENGINE_MAX_USES images
+    OCR_ENGINE_POOL_SIZE: int = 2
+    OCR_ENGINE_MAX_USES: int = 500
+    # OCR text cached by image SHA-256 and region in an SQLite file shared
+    # by all workers (default LOCAL_STORAGE_PATH/ocr_cache.sqlite3), least
+    # recently used entries evicted beyond OCR_CACHE_MAX_BYTES. The text is
+    # NOT encrypted, and includes posters not yet published: it is deleted
+    # OCR_CACHE_MAX_AGE_SECONDS after being stored (0 = kept until evicted),
+    # and the file should be on storage only the server can read
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_PATH: str = ""
+    OCR_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    OCR_CACHE_MAX_AGE_SECONDS: int = 7 * 24 * 3600
 
     # Email Processing
     EMAIL_PROCESSING_ENABLED: bool = False
@@ -18,7 +18,10 @@ import asyncio
 import logging
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import async_session, init_db
+from app.services.image_executor import ExecutorBusy, image_executor, ocr_executor
+from app.services.ocr import close_backend as close_ocr_backend
+from app.services.upload import UploadRejected
 from app.api import auth, parties, assets, verification, email_processing, downloads, ec_dashboard, ec_user_management, party_admin
 
 # Import models so SQLAlchemy creates their tables
@@ -33,6 +36,23 @@ async def lifespan(app: FastAPI):
     # Create tables on startup (use Alembic migrations in production)
     await init_db()
 
+    # Load the in-memory PDQ index of active assets
+    from app.services.pdq_index import pdq_index
+    async with async_session() as db:
+        await pdq_index.load(db)
+
+    # Write verification log rows behind the response, in batches
+    from app.services.log_sink import log_sink
+    log_sink.start(async_session)
+
+    # Aggregate geo stats in memory, upserted periodically
+    from app.services.geo_counters import geo_counters
+    geo_counters.start(async_session)
+
+    # Let OCR promoter checks that overrun their budget finish in the background
+    from app.services.promoter_checks import promoter_checks
+    promoter_checks.start(async_session)
+
     # Start email polling if enabled
     email_task = None
     if settings.EMAIL_PROCESSING_ENABLED:
@@ -50,6 +70,14 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
 
+    # Drain queued verification log rows before exiting
+    await log_sink.stop()
+    await geo_counters.stop()
+    await promoter_checks.stop()
+    image_executor.shutdown()
+    ocr_executor.shutdown()
+    close_ocr_backend()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -91,6 +119,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request: Request, exc: ExecutorBusy):
+    """Shed load when the image executor's queue is full."""
+    logger.warning(f"Image executor busy on {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy processing images, please retry shortly"},
+        headers={"Retry-After": "5"},
+    )
+
+
+@app.exception_handler(UploadRejected)
+async def upload_rejected_handler(request: Request, exc: UploadRejected):
+    """Uploads that are empty, too large or not a supported file type."""
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Catch unhandled exceptions so CORS headers are still included."""
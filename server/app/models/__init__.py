@@ -1,9 +1,11 @@
 from app.models.party import Party, PartyUser, PartyStatus, UserRole  # noqa: F401
-from app.models.asset import Asset, AssetStatus  # noqa: F401
+from app.models.asset import Asset, AssetDerivative, AssetStatus  # noqa: F401
 from app.models.verification import (  # noqa: F401
     VerificationLog,
     AuditLog,
     MatchType,
+    PromoterCheck,
+    PromoterCheckStatus,
     VerificationResult,
 )
 from app.models.email_job import EmailProcessingJob, EmailJobStatus  # noqa: F401
@@ -2,9 +2,19 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum as PyEnum
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text, JSON
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    JSON,
+)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from app.core.database import Base
 
@@ -40,6 +50,30 @@ class Asset(Base):
     pdq_quality: Mapped[int] = mapped_column(Integer, nullable=False)
     phash: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
 
+    # Binary copies of the perceptual hashes for database-side Hamming
+    # filtering. Kept in sync with the hex columns by the validators below.
+    pdq_hash_bin: Mapped[bytes | None] = mapped_column(LargeBinary(32), nullable=True)
+    phash_int: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+    # PDQ split into 16-bit LSH bands, each btree-indexed, for stateless
+    # candidate retrieval across app servers (see hashing.pdq_bands)
+    pdq_band_00: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_01: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_02: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_03: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_04: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_05: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_06: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_07: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_08: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_09: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_10: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_11: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_12: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_13: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_14: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    pdq_band_15: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+
     # Encrypted storage reference
     encrypted_storage_key: Mapped[str] = mapped_column(String(500), nullable=False)
     encryption_iv: Mapped[str] = mapped_column(String(32), nullable=False)
@@ -68,8 +102,52 @@ class Asset(Base):
         DateTime(timezone=True), nullable=True
     )
 
+    @validates("pdq_hash")
+    def _sync_pdq_hash_bin(self, key: str, value: str) -> str:
+        from app.services.hashing import pdq_bands
+
+        self.pdq_hash_bin = bytes.fromhex(value)
+        for i, band in enumerate(pdq_bands(value)):
+            setattr(self, f"pdq_band_{i:02d}", band)
+        return value
+
+    @validates("phash")
+    def _sync_phash_int(self, key: str, value: str) -> str:
+        # Signed so the full 64 bits fit a PostgreSQL BIGINT
+        self.phash_int = int.from_bytes(bytes.fromhex(value), "big", signed=True)
+        return value
+
     party: Mapped["Party"] = relationship(back_populates="assets")
     submitter: Mapped["PartyUser"] = relationship()
     verification_logs: Mapped[list["VerificationLog"]] = relationship(
         back_populates="asset"
     )
+    derivatives: Mapped[list["AssetDerivative"]] = relationship(
+        back_populates="asset"
+    )
+
+
+class AssetDerivative(Base):
+    """Hashes of a generated version of an asset (badge, promoter-stamped).
+
+    These are the files parties actually distribute, so they are registered
+    for exact SHA-256 matching alongside the original.
+    """
+
+    __tablename__ = "asset_derivatives"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    asset_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("assets.id"), nullable=False, index=True
+    )
+    # "badge" or "promoter"
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    sha256_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    pdq_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    asset: Mapped["Asset"] = relationship(back_populates="derivatives")
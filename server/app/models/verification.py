@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum as PyEnum
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, Enum, Float, ForeignKey, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -22,6 +22,12 @@ class VerificationResult(str, PyEnum):
     ERROR = "error"
 
 
+class PromoterCheckStatus(str, PyEnum):
+    PENDING = "pending"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+
 class VerificationLog(Base):
     __tablename__ = "verification_logs"
 
@@ -45,6 +51,28 @@ class VerificationLog(Base):
     asset: Mapped["Asset | None"] = relationship(back_populates="verification_logs")
 
 
+class PromoterCheck(Base):
+    """Outcome of a deferred OCR promoter-statement check of an upload."""
+
+    __tablename__ = "promoter_checks"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    status: Mapped[PromoterCheckStatus] = mapped_column(
+        Enum(PromoterCheckStatus), nullable=False
+    )
+    promoter_detected: Mapped[bool] = mapped_column(Boolean, default=False)
+    promoter_party_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
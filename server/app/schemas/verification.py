@@ -3,7 +3,7 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
-from app.models.verification import MatchType, VerificationResult
+from app.models.verification import MatchType, PromoterCheckStatus, VerificationResult
 
 
 class VerificationResponse(BaseModel):
@@ -20,6 +20,18 @@ class VerificationResponse(BaseModel):
     # OCR-detected promoter info (when image is unverified but has promoter text)
     promoter_detected: bool = False
     promoter_party_name: str | None = None
+    # Set when OCR did not finish within the time budget; fetch the outcome
+    # from /verify/promoter-check/{promoter_check_id}
+    promoter_check_id: uuid.UUID | None = None
+
+
+class PromoterCheckResponse(BaseModel):
+    id: uuid.UUID
+    status: PromoterCheckStatus
+    promoter_detected: bool = False
+    promoter_party_name: str | None = None
+    confidence: float | None = None
+    completed_at: datetime | None = None
 
 
 class VerificationByIdResponse(BaseModel):
@@ -0,0 +1,210 @@
+"""
+Per-process cache of the asset and party fields that verification returns.
+
+Every verified response (and every QR-code lookup by verification_id) used
+to load the matched asset's party, and verify_by_id loaded the asset too.
+These fields rarely change, so each worker keeps compact ``__slots__``
+records of them: assets keyed by id and by verification_id, and parties by
+id. Building a verified response after a match then needs no queries, and a
+cached verify_by_id is a dict lookup.
+
+Lookups that find nothing are not cached, so a newly registered asset is
+visible immediately. Revoking an asset drops its entry and changing a party
+drops the party and its assets in this worker; other workers converge
+within ASSET_METADATA_TTL_SECONDS, as with the verification cache.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.asset import Asset, AssetStatus
+from app.models.party import Party
+
+
+class PartyInfo:
+    __slots__ = ("name", "short_name", "expires_at")
+
+    def __init__(self, name: str, short_name: str, expires_at: float):
+        self.name = name
+        self.short_name = short_name
+        self.expires_at = expires_at
+
+
+class AssetInfo:
+    """The fields of an Asset (and its party) used by verification.
+
+    Attribute names match Asset's so match results can carry either.
+    """
+
+    __slots__ = (
+        "id",
+        "party_id",
+        "verification_id",
+        "status",
+        "created_at",
+        "party_name",
+        "party_short_name",
+        "expires_at",
+    )
+
+    def __init__(
+        self,
+        id: uuid.UUID,
+        party_id: uuid.UUID,
+        verification_id: str,
+        status: AssetStatus,
+        created_at: datetime,
+        party_name: str | None,
+        party_short_name: str | None,
+        expires_at: float,
+    ):
+        self.id = id
+        self.party_id = party_id
+        self.verification_id = verification_id
+        self.status = status
+        self.created_at = created_at
+        self.party_name = party_name
+        self.party_short_name = party_short_name
+        self.expires_at = expires_at
+
+
+class AssetMetadataCache:
+    """Bounded LRU of AssetInfo with a per-entry TTL, plus a party cache."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._assets: OrderedDict[uuid.UUID, AssetInfo] = OrderedDict()
+        self._by_verification_id: dict[str, AssetInfo] = {}
+        self._parties: dict[uuid.UUID, PartyInfo] = {}
+        # Bumped on invalidation so rows loaded before it are not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def _fresh(self, entry: AssetInfo | PartyInfo | None) -> bool:
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    async def _party(self, db: AsyncSession, party_id: uuid.UUID) -> PartyInfo | None:
+        party = self._parties.get(party_id)
+        if self._fresh(party):
+            return party
+        generation = self.generation
+        row = (
+            await db.execute(
+                select(Party.name, Party.short_name).where(Party.id == party_id)
+            )
+        ).one_or_none()
+        if row is None:
+            return None
+        party = PartyInfo(row.name, row.short_name, time.monotonic() + self.ttl_seconds)
+        if generation == self.generation:
+            self._parties[party_id] = party
+        return party
+
+    async def from_asset(self, db: AsyncSession, asset: Asset) -> AssetInfo:
+        """Cache and return the metadata of a loaded Asset row."""
+        generation = self.generation
+        party = await self._party(db, asset.party_id)
+        info = AssetInfo(
+            id=asset.id,
+            party_id=asset.party_id,
+            verification_id=asset.verification_id,
+            status=asset.status,
+            created_at=asset.created_at,
+            party_name=party.name if party else None,
+            party_short_name=party.short_name if party else None,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        if generation == self.generation and self.max_size > 0:
+            self._store(info)
+        return info
+
+    def _store(self, info: AssetInfo) -> None:
+        self._drop(info.id)
+        self._assets[info.id] = info
+        self._by_verification_id[info.verification_id] = info
+        while len(self._assets) > self.max_size:
+            _, evicted = self._assets.popitem(last=False)
+            self._by_verification_id.pop(evicted.verification_id, None)
+
+    def _drop(self, asset_id: uuid.UUID) -> None:
+        info = self._assets.pop(asset_id, None)
+        if info is not None:
+            self._by_verification_id.pop(info.verification_id, None)
+
+    def _cached(self, info: AssetInfo | None) -> AssetInfo | None:
+        if not self._fresh(info):
+            if info is not None:
+                self._drop(info.id)
+            self.misses += 1
+            return None
+        self._assets.move_to_end(info.id)
+        self.hits += 1
+        return info
+
+    async def get(self, db: AsyncSession, asset_id: uuid.UUID) -> AssetInfo | None:
+        info = self._cached(self._assets.get(asset_id))
+        if info is None:
+            asset = await db.get(Asset, asset_id)
+            if asset is not None:
+                info = await self.from_asset(db, asset)
+        return info
+
+    async def get_by_verification_id(
+        self, db: AsyncSession, verification_id: str
+    ) -> AssetInfo | None:
+        info = self._cached(self._by_verification_id.get(verification_id))
+        if info is None:
+            result = await db.execute(
+                select(Asset).where(Asset.verification_id == verification_id)
+            )
+            asset = result.scalar_one_or_none()
+            if asset is not None:
+                info = await self.from_asset(db, asset)
+        return info
+
+    def discard_asset(self, asset_id: uuid.UUID) -> None:
+        """Forget an asset whose status changed."""
+        self._drop(asset_id)
+        self.generation += 1
+
+    def discard_party(self, party_id: uuid.UUID) -> None:
+        """Forget a party whose name changed, and the assets that embed it."""
+        self._parties.pop(party_id, None)
+        for info in [i for i in self._assets.values() if i.party_id == party_id]:
+            self._drop(info.id)
+        self.generation += 1
+
+    def reset(self) -> None:
+        self._assets.clear()
+        self._by_verification_id.clear()
+        self._parties.clear()
+        self.generation += 1
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "assets": len(self._assets),
+            "parties": len(self._parties),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+asset_metadata = AssetMetadataCache(
+    max_size=settings.ASSET_METADATA_CACHE_SIZE,
+    ttl_seconds=settings.ASSET_METADATA_TTL_SECONDS,
+)
@@ -13,6 +13,7 @@ import qrcode
 from PIL import Image, ImageDraw, ImageFont
 
 from app.core.config import settings
+from app.services.image_context import ImageContext
 
 
 def generate_qr_code(verification_id: str, size: int = 200) -> bytes:
@@ -34,7 +35,7 @@ def generate_qr_code(verification_id: str, size: int = 200) -> bytes:
 
 
 def generate_badge_overlay(
-    original_bytes: bytes,
+    original: bytes | ImageContext,
     verification_id: str,
     party_name: str,
     position: str | None = None,
@@ -45,7 +46,7 @@ def generate_badge_overlay(
     It is sized to be <= BADGE_MAX_AREA_PERCENT of the total image area.
     """
     position = position or settings.BADGE_DEFAULT_POSITION
-    img = Image.open(io.BytesIO(original_bytes)).convert("RGBA")
+    img = ImageContext.of(original).rgb.convert("RGBA")
     img_w, img_h = img.size
 
     # Calculate badge dimensions (max 5% of image area)
@@ -21,6 +21,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.services.encryption import decrypt_string, encrypt_data, generate_dek, encrypt_dek
+from app.services.image_executor import image_executor
 from app.services.promoter_overlay import overlay_promoter_statement
 from app.services.storage import store_blob, retrieve_blob
 
@@ -154,7 +155,9 @@ async def process_verified_job(job_id: UUID, db: AsyncSession) -> None:
 
         # Apply promoter statement
         if job.add_promoter:
-            processed_bytes = overlay_promoter_statement(
+            processed_bytes = await image_executor.run(
+                "overlay",
+                overlay_promoter_statement,
                 image_bytes,
                 party.promoter_statement,
                 position=job.position,
@@ -0,0 +1,221 @@
+"""
+Fuzzy substring search for promoter statements in OCR text.
+
+The original matcher scored every window of 40 lengths around the statement
+length at every offset of the text with SequenceMatcher.ratio(), which is
+O(n * 40 * m^2) per statement. Here the candidate locations come from
+Myers' bit-parallel edit-distance algorithm in its search (semi-global)
+form, which finds the substrings closest to each statement in O(n) steps
+of integer bit operations:
+
+- all statements are packed into one bit-vector (one lane per statement,
+  with SWAR additions and shifts that keep carries inside their lane), so
+  the OCR text is scanned once however many statements there are;
+- for the best end positions of each statement, the start is recovered by
+  running the same search over the reversed text and statement;
+- only the few windows around each located substring are then scored with
+  SequenceMatcher.ratio(), so results keep the original ratio semantics
+  (lower-cased, window length within 20 characters of the statement);
+- a statement whose edit distance already rules out the caller's minimum
+  ratio is not scored at all.
+
+Text and statements are compared in normalised form (see normalise()).
+StatementSet holds a prebuilt searcher for a fixed set of statements, such
+as the promoter statement index.
+"""
+
+from difflib import SequenceMatcher
+
+# Window lengths considered are within this many characters of the target
+WINDOW_SLACK = 20
+# Windows scored around each located substring (start/end +- this)
+REFINE_RADIUS = 2
+# Distinct best-distance locations refined per statement
+MAX_CANDIDATES = 8
+
+
+class MultiPatternSearcher:
+    """Myers' algorithm for several patterns at once, one lane each."""
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = patterns
+        self._lanes: list[tuple[int, int]] = []  # (offset, length)
+        self._peq: dict[str, int] = {}
+        offset = 0
+        for pattern in patterns:
+            for i, char in enumerate(pattern):
+                self._peq[char] = self._peq.get(char, 0) | (1 << (offset + i))
+            self._lanes.append((offset, len(pattern)))
+            offset += len(pattern)
+        self._full = (1 << offset) - 1
+        # Lowest and highest bit of each non-empty lane
+        self._low = sum(1 << o for o, m in self._lanes if m)
+        self._high = sum(1 << (o + m - 1) for o, m in self._lanes if m)
+
+    def search(self, text: str) -> list[tuple[int, list[int]]]:
+        """Per pattern: (minimum edit distance to any substring of
+        ``text``, the exclusive end indices where it is reached)."""
+        full, low, high = self._full, self._low, self._high
+        lanes = [(1 << (o + m - 1), i) for i, (o, m) in enumerate(self._lanes) if m]
+        scores = [m for _, m in self._lanes]
+        best = [(m, [0]) for m in scores]
+        pv, mv = full, 0
+        for j, char in enumerate(text, start=1):
+            eq = self._peq.get(char, 0)
+            xv = eq | mv
+            x = eq & pv
+            # Per-lane (x + pv) without carries crossing into the next lane
+            total = ((x & ~high) + (pv & ~high)) ^ ((x ^ pv) & high)
+            xh = ((total & full) ^ pv) | eq
+            ph = mv | (~(xh | pv) & full)
+            mh = pv & xh
+            for top, i in lanes:
+                if ph & top:
+                    scores[i] += 1
+                elif mh & top:
+                    scores[i] -= 1
+                score = scores[i]
+                if score < best[i][0]:
+                    best[i] = (score, [j])
+                elif score == best[i][0]:
+                    best[i][1].append(j)
+            # Search mode: row 0 is all zeros, so nothing enters each lane
+            ph = (ph << 1) & full & ~low
+            mh = (mh << 1) & full & ~low
+            pv = mh | (~(xv | ph) & full)
+            mv = ph & xv
+        return best
+
+
+def _candidate_ends(ends: list[int]) -> list[int]:
+    """First and last end of each run of consecutive ends, capped."""
+    picked = []
+    run_start = previous = ends[0]
+    for end in ends[1:] + [None]:
+        if end is not None and end == previous + 1:
+            previous = end
+            continue
+        picked.append(run_start)
+        if previous != run_start:
+            picked.append(previous)
+        if end is not None:
+            run_start = previous = end
+    return picked[:MAX_CANDIDATES]
+
+
+def _start_for(text: str, pattern: str, end: int) -> int:
+    """Start of the closest match of ``pattern`` ending at ``end``."""
+    lo = max(0, end - len(pattern) - WINDOW_SLACK)
+    reversed_window = text[lo:end][::-1]
+    _, rev_ends = MultiPatternSearcher([pattern[::-1]]).search(reversed_window)[0]
+    # The longest of the equally close matches
+    return end - max(rev_ends)
+
+
+def _refine(
+    text: str, text_lower: str, pattern: str, start: int, end: int
+) -> tuple[str, float]:
+    min_len = max(1, len(pattern) - WINDOW_SLACK)
+    max_len = len(pattern) + WINDOW_SLACK
+    best_match, best_ratio = "", 0.0
+    matcher = SequenceMatcher(None, "", pattern)
+    for s in range(max(0, start - REFINE_RADIUS), start + REFINE_RADIUS + 1):
+        for e in range(end - REFINE_RADIUS, min(len(text), end + REFINE_RADIUS) + 1):
+            if not min_len <= e - s < max_len:
+                continue
+            matcher.set_seq1(text_lower[s:e])
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best_match, best_ratio = text[s:e], ratio
+    return best_match, best_ratio
+
+
+_NORMALISE = str.maketrans(
+    {"\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"', "\u2013": "-", "\u2014": "-"}
+)
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.translate(_NORMALISE).split())
+
+
+def normalise(text: str) -> str:
+    """Lower-case, straighten quotes and dashes, and collapse whitespace."""
+    return _clean(text).lower()
+
+
+def max_distance_for(length: int, min_ratio: float) -> int:
+    """Largest semi-global edit distance compatible with ``min_ratio``.
+
+    A window of length w scoring ratio r against a statement of length m
+    is within (m + w) * (1 - r) insertions and deletions of it, and
+    w < m + WINDOW_SLACK.
+    """
+    return int((2 * length + WINDOW_SLACK - 1) * (1 - min_ratio) + 1e-9)
+
+
+class StatementSet:
+    """Statements normalised and packed for searching, built once.
+
+    Picklable, so a prebuilt set can be sent to the OCR worker processes.
+    """
+
+    def __init__(self, statements: list[str]):
+        self.statements = list(statements)
+        self.normalised = [normalise(s) for s in self.statements]
+        self._searchable = [i for i, s in enumerate(self.normalised) if s]
+        self._searcher = MultiPatternSearcher(
+            [self.normalised[i] for i in self._searchable]
+        )
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def best_matches(
+        self, text: str, min_ratio: float | None = None
+    ) -> list[tuple[str, float]]:
+        """For each statement, the substring of ``text`` that best matches it.
+
+        Returns (best_matching_substring, SequenceMatcher ratio) per
+        statement, with the statement itself and 1.0 for an exact match.
+        With ``min_ratio``, statements that cannot reach it are reported as
+        ("", 0.0) without being scored.
+        """
+        text_clean = _clean(text)
+        text_norm = text_clean.lower()
+        if len(text_norm) != len(text_clean):
+            text_clean = text_norm
+        results = [("", 0.0)] * len(self.statements)
+        to_refine = set()
+        for i in self._searchable:
+            pattern = self.normalised[i]
+            if len(text_norm) < max(1, len(pattern) - WINDOW_SLACK):
+                continue
+            if pattern in text_norm:
+                results[i] = (self.statements[i], 1.0)
+            else:
+                to_refine.add(i)
+        if not to_refine:
+            return results
+
+        located = self._searcher.search(text_norm)
+        for i, (distance, ends) in zip(self._searchable, located):
+            pattern = self.normalised[i]
+            if i not in to_refine or (
+                min_ratio is not None
+                and distance > max_distance_for(len(pattern), min_ratio)
+            ):
+                continue
+            best = ("", 0.0)
+            for end in _candidate_ends(ends):
+                start = _start_for(text_norm, pattern, end)
+                match = _refine(text_clean, text_norm, pattern, start, end)
+                if match[1] > best[1]:
+                    best = match
+            results[i] = best
+        return results
+
+
+def best_substring_matches(text: str, targets: list[str]) -> list[tuple[str, float]]:
+    """For each target, the substring of ``text`` that best matches it."""
+    return StatementSet(targets).best_matches(text)
@@ -0,0 +1,134 @@
+"""
+In-memory aggregation of verification geo stats.
+
+Recording a geo stat used to cost a SELECT plus an UPDATE or INSERT per
+verification, and concurrent first requests for the same (date, region,
+country) raced on uq_geo_stat_date_region_country. Each worker now counts
+in memory and periodically adds its counts to the table with a single
+INSERT ... ON CONFLICT DO UPDATE, which is atomic and exact under load.
+
+When the flusher is not running (tests) each count is upserted inline on
+the request's session instead. Counts from the last GEO_STATS_FLUSH_SECONDS
+are lost if a worker crashes.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from datetime import date
+from typing import Callable
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.geo_stats import VerificationGeoStat
+
+logger = logging.getLogger(__name__)
+
+GeoKey = tuple[date, str, str]
+
+
+async def upsert_geo_counts(db: AsyncSession, counts: dict[GeoKey, int]) -> None:
+    """Atomically add ``counts`` to the stored totals (no commit)."""
+    if not counts:
+        return
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(VerificationGeoStat).values(
+        [
+            {
+                "id": uuid.uuid4(),
+                "date": day,
+                "region": region,
+                "country": country,
+                "verification_count": count,
+            }
+            for (day, region, country), count in counts.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["date", "region", "country"],
+        set_={
+            "verification_count": VerificationGeoStat.verification_count
+            + stmt.excluded.verification_count
+        },
+    )
+    await db.execute(stmt)
+
+
+class GeoStatCounters:
+    """Per-worker geo counts flushed to the database on an interval."""
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._counts: Counter[GeoKey] = Counter()
+        self._task: asyncio.Task | None = None
+        self._stopping: asyncio.Event | None = None
+        self._session_factory: Callable[[], AsyncSession] | None = None
+        self.recorded = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        if self.running:
+            return
+        self._session_factory = session_factory
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def record(self, db: AsyncSession, region: str, country: str) -> None:
+        """Count one verification; upserted inline if the flusher isn't running."""
+        key = (date.today(), region, country)
+        self.recorded += 1
+        if self.running:
+            self._counts[key] += 1
+        else:
+            await upsert_geo_counts(db, {key: 1})
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self) -> None:
+        counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+        try:
+            async with self._session_factory() as db:
+                await upsert_geo_counts(db, counts)
+                await db.commit()
+            self.flushes += 1
+        except Exception:
+            # Keep the counts for the next attempt
+            self.failed_flushes += 1
+            self._counts.update(counts)
+            logger.exception("Geo stat flush failed")
+
+    async def stop(self) -> None:
+        """Stop the flusher and write any remaining counts."""
+        if not self.running:
+            return
+        self._stopping.set()
+        await self._task
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "recorded": self.recorded,
+            "pending_keys": len(self._counts),
+            "pending_count": sum(self._counts.values()),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+geo_counters = GeoStatCounters(flush_interval=settings.GEO_STATS_FLUSH_SECONDS)
@@ -3,42 +3,254 @@
 Resolves IP addresses to region/country in memory only.
 Only aggregated counts are persisted -- individual IPs are NEVER stored.
 
-Uses the free ip-api.com service for the test environment.
-For production, replace with MaxMind GeoLite2 offline database.
+When GEOIP_DATABASE_PATH points at a local IP-range CSV, lookups are served
+offline: the ranges are loaded into sorted integer arrays and searched with
+bisect. The file is re-read in a background thread when its mtime changes,
+so the dataset can be updated without a restart. Two CSV layouts are
+accepted:
+
+- MaxMind GeoLite2 City/Country blocks (``network,geoname_id,...``) with the
+  matching ``*-Locations-en.csv`` next to it (or at GEOIP_LOCATIONS_PATH);
+- a single table with ``network`` (CIDR) or ``start_ip,end_ip`` columns plus
+  ``country_code`` and ``region`` (or ``country_name``).
+
+Without a dataset the free ip-api.com service is used (test environment).
+Either way, results go through a size-bounded LRU cache.
 """
 
+import asyncio
+import bisect
+import csv
+import ipaddress
 import logging
+import os
+import time
+from array import array
+from collections import OrderedDict
 
 import httpx
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
-# In-memory cache to reduce API calls (IP -> (region, country))
-_cache: dict[str, tuple[str, str]] = {}
-_CACHE_MAX_SIZE = 1000
+UNKNOWN = ("Unknown", "XX")
 
 
-def _evict_cache() -> None:
-    """Simple cache eviction: clear when too large."""
-    global _cache
-    if len(_cache) > _CACHE_MAX_SIZE:
-        _cache = {}
+class LRUCache:
+    """Size-bounded least-recently-used mapping of IP -> (region, country)."""
 
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
-async def resolve_location(ip: str) -> tuple[str, str]:
-    """Resolve an IP address to (region, country_code).
+    def __len__(self) -> int:
+        return len(self._data)
 
-    Returns ("Unknown", "XX") if resolution fails.
-    The IP address is NOT stored or logged.
+    def get(self, key: str) -> tuple[str, str] | None:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: tuple[str, str]) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+def _region_for(country: str, subdivision: str, country_name: str) -> tuple[str, str]:
+    # For NZ, use region name; for others, use country name (as ip-api did)
+    if not country:
+        return UNKNOWN
+    if country == "NZ":
+        return (subdivision or "Unknown", country)
+    return (country_name or country, country)
+
+
+def _read_locations(path: str) -> dict[str, tuple[str, str]]:
+    """geoname_id -> (region, country) from a GeoLite2 locations CSV."""
+    locations = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            locations[row["geoname_id"]] = _region_for(
+                row.get("country_iso_code", ""),
+                row.get("subdivision_1_name", ""),
+                row.get("country_name", ""),
+            )
+    return locations
+
+
+def _locations_path_for(blocks_path: str) -> str:
+    if settings.GEOIP_LOCATIONS_PATH:
+        return settings.GEOIP_LOCATIONS_PATH
+    directory, name = os.path.split(blocks_path)
+    for blocks in ("Blocks-IPv4", "Blocks-IPv6"):
+        if blocks in name:
+            return os.path.join(directory, name.replace(blocks, "Locations-en"))
+    raise ValueError(f"Cannot locate GeoLite2 locations file for {blocks_path}")
+
+
+class IPRangeDatabase:
+    """Sorted, non-overlapping IP ranges searched with bisect.
+
+    IPv4 bounds are kept in compact unsigned arrays; IPv6 bounds exceed 64
+    bits and are kept in Python lists. Each range maps to an index into a
+    deduplicated list of (region, country) values.
     """
-    # Skip private/localhost IPs
-    if ip in ("127.0.0.1", "::1", "localhost") or ip.startswith("192.168.") or ip.startswith("10."):
-        return ("Local", "NZ")
 
-    # Check cache
-    if ip in _cache:
-        return _cache[ip]
+    def __init__(self):
+        self._starts = {4: array("I"), 6: []}
+        self._ends = {4: array("I"), 6: []}
+        self._values_idx = {4: array("I"), 6: array("I")}
+        self._values: list[tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._starts[4]) + len(self._starts[6])
+
+    @classmethod
+    def from_ranges(
+        cls, ranges: list[tuple[int, int, int, tuple[str, str]]]
+    ) -> "IPRangeDatabase":
+        """Build from (version, start, end, (region, country)) tuples."""
+        db = cls()
+        value_ids: dict[tuple[str, str], int] = {}
+        for version, start, end, value in sorted(ranges, key=lambda r: (r[0], r[1])):
+            value_id = value_ids.setdefault(value, len(value_ids))
+            db._starts[version].append(start)
+            db._ends[version].append(end)
+            db._values_idx[version].append(value_id)
+        db._values = list(value_ids)
+        return db
+
+    @classmethod
+    def load_csv(cls, path: str) -> "IPRangeDatabase":
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            fields = set(reader.fieldnames or ())
+            locations = (
+                _read_locations(_locations_path_for(path))
+                if "geoname_id" in fields
+                else None
+            )
+            ranges = []
+            for row in reader:
+                if locations is not None:
+                    geoname = row.get("geoname_id") or row.get(
+                        "registered_country_geoname_id"
+                    )
+                    value = locations.get(geoname)
+                    if value is None:
+                        continue
+                else:
+                    value = _region_for(
+                        row.get("country_code", ""),
+                        row.get("region", ""),
+                        row.get("country_name", ""),
+                    )
+                if row.get("network"):
+                    network = ipaddress.ip_network(row["network"], strict=False)
+                    version = network.version
+                    start = int(network.network_address)
+                    end = int(network.broadcast_address)
+                else:
+                    first = ipaddress.ip_address(row["start_ip"])
+                    version = first.version
+                    start = int(first)
+                    end = int(ipaddress.ip_address(row["end_ip"]))
+                ranges.append((version, start, end, value))
+        return cls.from_ranges(ranges)
+
+    def lookup(self, ip: str) -> tuple[str, str] | None:
+        address = ipaddress.ip_address(ip)
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        version = address.version
+        value = int(address)
+        i = bisect.bisect_right(self._starts[version], value) - 1
+        if i >= 0 and value <= self._ends[version][i]:
+            return self._values[self._values_idx[version][i]]
+        return None
 
+
+class OfflineGeoResolver:
+    """IP-range database from a CSV file, reloaded when the file changes."""
+
+    def __init__(self, path: str, check_interval: float):
+        self.path = path
+        self.check_interval = check_interval
+        self.database: IPRangeDatabase | None = None
+        self._mtime: float | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.reloads = 0
+
+    async def ensure_current(self) -> None:
+        """Load the dataset, or reload it if the file has changed."""
+        now = time.monotonic()
+        if self.database is not None and now - self._checked_at < self.check_interval:
+            return
+        async with self._lock:
+            if (
+                self.database is not None
+                and time.monotonic() - self._checked_at < self.check_interval
+            ):
+                return
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                logger.warning("GeoIP database %s is not readable", self.path)
+                return
+            if mtime == self._mtime:
+                return
+            started = time.monotonic()
+            # Parsing a full GeoLite2 file takes seconds: keep it off the loop
+            database = await asyncio.to_thread(IPRangeDatabase.load_csv, self.path)
+            self.database, self._mtime = database, mtime
+            self.reloads += 1
+            _cache.clear()
+            logger.info(
+                "GeoIP database loaded: %d ranges in %.1fs",
+                len(database),
+                time.monotonic() - started,
+            )
+
+    def lookup(self, ip: str) -> tuple[str, str]:
+        if self.database is None:
+            return UNKNOWN
+        return self.database.lookup(ip) or UNKNOWN
+
+
+# In-memory LRU cache of resolved IPs (IP -> (region, country))
+_cache = LRUCache(settings.GEOIP_CACHE_SIZE)
+_offline: OfflineGeoResolver | None = (
+    OfflineGeoResolver(settings.GEOIP_DATABASE_PATH, settings.GEOIP_RELOAD_CHECK_SECONDS)
+    if settings.GEOIP_DATABASE_PATH
+    else None
+)
+
+
+def _is_local(ip: str) -> bool:
+    if ip == "localhost":
+        return True
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return address.is_private or address.is_loopback
+
+
+async def _resolve_online(ip: str) -> tuple[str, str] | None:
     try:
         async with httpx.AsyncClient(timeout=3.0) as client:
             # ip-api.com free tier: 45 req/min, no API key needed
@@ -49,18 +261,53 @@ async def resolve_location(ip: str) -> tuple[str, str]:
             if resp.status_code == 200:
                 data = resp.json()
                 if data.get("status") == "success":
-                    country = data.get("countryCode", "XX")
-                    # For NZ, use region name; for others, use country name
-                    if country == "NZ":
-                        region = data.get("regionName", "Unknown")
-                    else:
-                        region = data.get("country", "Unknown")
-
-                    result = (region, country)
-                    _evict_cache()
-                    _cache[ip] = result
-                    return result
+                    return _region_for(
+                        data.get("countryCode", "XX"),
+                        data.get("regionName", "Unknown"),
+                        data.get("country", "Unknown"),
+                    )
     except Exception:
         logger.debug("Geolocation lookup failed for request (IP not logged)")
+    return None
+
+
+async def resolve_location(ip: str) -> tuple[str, str]:
+    """Resolve an IP address to (region, country_code).
+
+    Returns ("Unknown", "XX") if resolution fails.
+    The IP address is NOT stored or logged.
+    """
+    # Skip private/localhost IPs
+    if _is_local(ip):
+        return ("Local", "NZ")
+
+    if _offline is not None:
+        await _offline.ensure_current()
+
+    # Check cache
+    cached = _cache.get(ip)
+    if cached is not None:
+        return cached
+
+    if _offline is not None:
+        try:
+            result = _offline.lookup(ip)
+        except ValueError:
+            return UNKNOWN
+    else:
+        result = await _resolve_online(ip)
+        if result is None:
+            return UNKNOWN
+    _cache.put(ip, result)
+    return result
+
 
-    return ("Unknown", "XX")
+def geolocation_stats() -> dict:
+    lookups = _cache.hits + _cache.misses
+    return {
+        "backend": "offline" if _offline is not None else "ip-api",
+        "ranges": len(_offline.database or ()) if _offline is not None else None,
+        "reloads": _offline.reloads if _offline is not None else 0,
+        "cache_size": len(_cache),
+        "cache_hit_ratio": round(_cache.hits / lookups, 3) if lookups else 0.0,
+    }
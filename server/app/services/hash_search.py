@@ -0,0 +1,160 @@
+"""
+Database-side perceptual hash search.
+
+On PostgreSQL (14+) the Hamming distance is computed by the server with
+bit_count() over the XOR of the binary hash columns, so only the best row
+within the threshold is returned to the app worker.
+
+Other dialects (SQLite in tests) fall back to fetching just the id and
+binary hash columns and computing distances in Python.
+
+find_closest_pdq_banded avoids the full scan entirely: it retrieves
+candidates through the indexed 16-bit PDQ band columns and verifies the
+exact distance only on those rows.
+"""
+
+import uuid
+
+from sqlalchemy import Select, cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import Asset, AssetStatus
+from app.services.hashing import (
+    PDQ_BAND_BITS,
+    PDQ_BAND_COUNT,
+    chunk_flip_masks,
+    pdq_bands,
+)
+
+_UINT64_MASK = (1 << 64) - 1
+
+
+def phash_hex_to_int(phash_hex: str) -> int:
+    """Convert a pHash hex string to the signed value stored in phash_int."""
+    return int.from_bytes(bytes.fromhex(phash_hex), "big", signed=True)
+
+
+def _is_postgres(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "postgresql"
+
+
+def pdq_distance_query(pdq_hex: str, threshold: int) -> Select:
+    """PostgreSQL query for the closest active asset by PDQ distance."""
+    stored = cast(literal("x").concat(func.encode(Asset.pdq_hash_bin, "hex")), BIT(256))
+    query = cast(literal("x" + pdq_hex), BIT(256))
+    distance = func.bit_count(stored.op("#")(query)).label("distance")
+    return (
+        select(Asset, distance)
+        .where(Asset.status == AssetStatus.ACTIVE, distance <= threshold)
+        .order_by(distance)
+        .limit(1)
+    )
+
+
+def phash_distance_query(phash_hex: str, threshold: int) -> Select:
+    """PostgreSQL query for the closest active asset by pHash distance."""
+    query = literal(phash_hex_to_int(phash_hex))
+    distance = func.bit_count(cast(Asset.phash_int.op("#")(query), BIT(64))).label(
+        "distance"
+    )
+    return (
+        select(Asset, distance)
+        .where(Asset.status == AssetStatus.ACTIVE, distance <= threshold)
+        .order_by(distance)
+        .limit(1)
+    )
+
+
+async def find_closest_pdq(
+    db: AsyncSession, pdq_hex: str, threshold: int
+) -> tuple[Asset, int] | None:
+    """Return (asset, distance) of the closest active asset by PDQ."""
+    if _is_postgres(db):
+        row = (await db.execute(pdq_distance_query(pdq_hex, threshold))).first()
+        return (row[0], int(row[1])) if row else None
+
+    target = int(pdq_hex, 16)
+    result = await db.execute(
+        select(Asset.id, Asset.pdq_hash_bin).where(Asset.status == AssetStatus.ACTIVE)
+    )
+    best = _closest(
+        ((asset_id, int.from_bytes(value, "big")) for asset_id, value in result.all()
+         if value is not None),
+        target,
+        threshold,
+    )
+    return await _load_best(db, best)
+
+
+async def find_closest_phash(
+    db: AsyncSession, phash_hex: str, threshold: int
+) -> tuple[Asset, int] | None:
+    """Return (asset, distance) of the closest active asset by pHash."""
+    if _is_postgres(db):
+        row = (await db.execute(phash_distance_query(phash_hex, threshold))).first()
+        return (row[0], int(row[1])) if row else None
+
+    target = phash_hex_to_int(phash_hex) & _UINT64_MASK
+    result = await db.execute(
+        select(Asset.id, Asset.phash_int).where(Asset.status == AssetStatus.ACTIVE)
+    )
+    best = _closest(
+        ((asset_id, value & _UINT64_MASK) for asset_id, value in result.all()
+         if value is not None),
+        target,
+        threshold,
+    )
+    return await _load_best(db, best)
+
+
+def pdq_band_candidates_query(pdq_hex: str, threshold: int) -> Select:
+    """Query active assets sharing at least one near-identical PDQ band.
+
+    By the pigeonhole principle a hash within ``threshold`` bits has some
+    band within threshold // 16 bits of the query's band, so each band is
+    matched against the query band and its near neighbours (17 values per
+    band at the default threshold of 31). Every lookup hits a btree index.
+    """
+    masks = chunk_flip_masks(PDQ_BAND_BITS, threshold // PDQ_BAND_COUNT)
+    conditions = [
+        getattr(Asset, f"pdq_band_{i:02d}").in_(sorted({band ^ m for m in masks}))
+        for i, band in enumerate(pdq_bands(pdq_hex))
+    ]
+    return select(Asset.id, Asset.pdq_hash_bin).where(
+        Asset.status == AssetStatus.ACTIVE, or_(*conditions)
+    )
+
+
+async def find_closest_pdq_banded(
+    db: AsyncSession, pdq_hex: str, threshold: int
+) -> tuple[Asset, int] | None:
+    """Return (asset, distance) of the closest active asset by PDQ, using
+    the band index for candidate retrieval."""
+    result = await db.execute(pdq_band_candidates_query(pdq_hex, threshold))
+    best = _closest(
+        ((asset_id, int.from_bytes(value, "big")) for asset_id, value in result.all()
+         if value is not None),
+        int(pdq_hex, 16),
+        threshold,
+    )
+    return await _load_best(db, best)
+
+
+def _closest(rows, target: int, threshold: int) -> tuple[uuid.UUID, int] | None:
+    best_id = None
+    best_distance = threshold + 1
+    for asset_id, value in rows:
+        distance = (value ^ target).bit_count()
+        if distance < best_distance:
+            best_id, best_distance = asset_id, distance
+    return (best_id, best_distance) if best_id is not None else None
+
+
+async def _load_best(
+    db: AsyncSession, best: tuple[uuid.UUID, int] | None
+) -> tuple[Asset, int] | None:
+    if best is None:
+        return None
+    asset = await db.get(Asset, best[0])
+    return (asset, best[1]) if asset else None
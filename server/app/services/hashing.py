@@ -5,17 +5,24 @@ PDQ is Meta's open-source perceptual hash - 256-bit, tolerant of overlays,
 compression, and resizing. Hamming distance <= 31 indicates a match.
 
 pHash is a secondary perceptual hash for fallback matching.
+
+Two interchangeable PDQ index engines are provided for registry lookups:
+PackedPDQIndex compares a query against every hash in one vectorised pass
+(with a pHash -> PDQ cascade), and MultiIndexPDQIndex uses multi-index
+hashing for sub-linear lookups.
 """
 
 import hashlib
-import io
+from functools import lru_cache
+from itertools import combinations
+from typing import Hashable, NamedTuple, Protocol
 
 import imagehash
 import pdqhash
 import numpy as np
-from PIL import Image
 
 from app.core.config import settings
+from app.services.image_context import ImageContext
 
 
 def compute_sha256(image_bytes: bytes) -> str:
@@ -23,36 +30,66 @@ def compute_sha256(image_bytes: bytes) -> str:
     return hashlib.sha256(image_bytes).hexdigest()
 
 
-def compute_pdq(image_bytes: bytes) -> tuple[str, int]:
+def compute_pdq(image: bytes | ImageContext) -> tuple[str, int]:
     """Compute PDQ perceptual hash. Returns (hash_hex, quality_score)."""
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    arr = np.array(img)
+    arr = ImageContext.of(image).hash_array
     hash_vector, quality = pdqhash.compute(arr)
     # Convert boolean array to hex string
     hash_hex = _bool_array_to_hex(hash_vector)
     return hash_hex, int(quality)
 
 
-def compute_phash(image_bytes: bytes) -> str:
+def compute_phash(image: bytes | ImageContext) -> str:
     """Compute pHash perceptual hash. Returns hex string."""
-    img = Image.open(io.BytesIO(image_bytes))
-    h = imagehash.phash(img)
+    h = imagehash.phash(ImageContext.of(image).phash_image)
     return str(h)
 
 
-def compute_all_hashes(image_bytes: bytes) -> dict:
-    """Compute all hashes for an image. Returns dict with all hash values."""
-    sha256 = compute_sha256(image_bytes)
-    pdq_hash, pdq_quality = compute_pdq(image_bytes)
-    phash = compute_phash(image_bytes)
+def compute_perceptual_hashes(image: bytes | ImageContext) -> dict:
+    """Compute the PDQ and pHash hashes, the only hashes needing a decode."""
+    ctx = ImageContext.of(image)
+    pdq_hash, pdq_quality = compute_pdq(ctx)
     return {
-        "sha256": sha256,
         "pdq_hash": pdq_hash,
         "pdq_quality": pdq_quality,
-        "phash": phash,
+        "pdq_bands": pdq_bands(pdq_hash),
+        "phash": compute_phash(ctx),
     }
 
 
+def compute_all_hashes(image: bytes | ImageContext) -> dict:
+    """Compute all hashes for an image. Returns dict with all hash values."""
+    ctx = ImageContext.of(image)
+    return {"sha256": compute_sha256(ctx.image_bytes), **compute_perceptual_hashes(ctx)}
+
+
+PDQ_BAND_COUNT = 16
+PDQ_BAND_BITS = 256 // PDQ_BAND_COUNT
+
+
+def pdq_bands(pdq_hex: str) -> list[int]:
+    """Split a PDQ hash into 16-bit LSH bands, most significant first.
+
+    Stored as indexed columns on Asset so candidates can be found with
+    band equality lookups (see hash_search.find_closest_pdq_banded).
+    """
+    width = PDQ_BAND_BITS // 4
+    return [int(pdq_hex[i : i + width], 16) for i in range(0, 64, width)]
+
+
+@lru_cache(maxsize=None)
+def chunk_flip_masks(bits: int, radius: int) -> tuple[int, ...]:
+    """All XOR masks over a ``bits``-wide chunk with at most ``radius`` bits set."""
+    masks = [0]
+    for r in range(1, radius + 1):
+        for positions in combinations(range(bits), r):
+            mask = 0
+            for b in positions:
+                mask |= 1 << b
+            masks.append(mask)
+    return tuple(masks)
+
+
 def hamming_distance_hex(hash1: str, hash2: str) -> int:
     """Compute Hamming distance between two hex-encoded hashes."""
     b1 = int(hash1, 16)
@@ -77,6 +114,330 @@ def phash_match(hash1: str, hash2: str) -> tuple[bool, int]:
     return distance <= settings.PHASH_MATCH_THRESHOLD, distance
 
 
+def pdq_hex_to_words(hash_hex: str) -> np.ndarray:
+    """Pack a 64-char PDQ hex string into four big-endian uint64 words."""
+    return np.frombuffer(bytes.fromhex(hash_hex), dtype=">u8").astype(np.uint64)
+
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Population count of each row of a uint64 matrix."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    # NumPy < 2.0: unpack the bytes and count set bits
+    return np.unpackbits(words.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
+
+
+class PerceptualMatch(NamedTuple):
+    """Result of an index lookup: exactly one of the distances is set,
+    depending on whether PDQ or the pHash fallback produced the match."""
+
+    key: Hashable
+    pdq_distance: int | None
+    phash_distance: int | None
+
+
+def phash_hex_to_uint64(phash_hex: str) -> int:
+    """Convert a 16-char pHash hex string to an unsigned 64-bit integer."""
+    return int(phash_hex, 16)
+
+
+class PackedPDQIndex:
+    """Brute-force PDQ index over a packed uint64[N, 4] matrix.
+
+    Each row holds one 256-bit PDQ hash; the parallel ``_keys`` list holds
+    the caller's identifier (an asset id) for that row. A search is a single
+    vectorised XOR + popcount over every row.
+
+    An optional 64-bit pHash per row is held in a parallel uint64 array,
+    which lets match() run a two-stage cascade: the cheap pHash distance
+    prunes rows first and the 256-bit PDQ distance is computed only on the
+    survivors. The same pHash distances then serve the pHash fallback.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._words = np.zeros((capacity, 4), dtype=np.uint64)
+        self._phash = np.zeros(capacity, dtype=np.uint64)
+        self._has_phash = np.zeros(capacity, dtype=bool)
+        self._keys: list = []
+        self._positions: dict = {}
+        # Rows that reached the PDQ stage in the last match() (for metrics)
+        self.last_survivors = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._positions
+
+    def clear(self) -> None:
+        self._keys = []
+        self._positions = {}
+
+    def _grow(self, size: int) -> None:
+        capacity = max(1024, size * 2)
+        words = np.zeros((capacity, 4), dtype=np.uint64)
+        words[:size] = self._words[:size]
+        phash = np.zeros(capacity, dtype=np.uint64)
+        phash[:size] = self._phash[:size]
+        has_phash = np.zeros(capacity, dtype=bool)
+        has_phash[:size] = self._has_phash[:size]
+        self._words, self._phash, self._has_phash = words, phash, has_phash
+
+    def add(self, key, pdq_hex: str, phash_hex: str | None = None) -> None:
+        """Add or replace the hashes stored for ``key``."""
+        pos = self._positions.get(key)
+        if pos is None:
+            pos = len(self._keys)
+            if pos == len(self._words):
+                self._grow(pos)
+            self._keys.append(key)
+            self._positions[key] = pos
+        self._words[pos] = pdq_hex_to_words(pdq_hex)
+        self._phash[pos] = phash_hex_to_uint64(phash_hex) if phash_hex else 0
+        self._has_phash[pos] = phash_hex is not None
+
+    def remove(self, key) -> None:
+        """Remove ``key`` if present (swaps the last row into its slot)."""
+        pos = self._positions.pop(key, None)
+        if pos is None:
+            return
+        last = len(self._keys) - 1
+        if pos != last:
+            last_key = self._keys[last]
+            self._words[pos] = self._words[last]
+            self._phash[pos] = self._phash[last]
+            self._has_phash[pos] = self._has_phash[last]
+            self._keys[pos] = last_key
+            self._positions[last_key] = pos
+        self._keys.pop()
+
+    def _pdq_distances(self, pdq_hex: str, rows=slice(None)) -> np.ndarray:
+        words = self._words[: len(self._keys)][rows]
+        return _popcount_rows(np.bitwise_xor(words, pdq_hex_to_words(pdq_hex)))
+
+    def _phash_distances(self, phash_hex: str) -> np.ndarray:
+        """pHash distances for every row; rows without a pHash get 65."""
+        size = len(self._keys)
+        query = np.uint64(phash_hex_to_uint64(phash_hex))
+        xor = np.bitwise_xor(self._phash[:size], query)
+        distances = _popcount_rows(xor[:, None])
+        return np.where(self._has_phash[:size], distances, 65)
+
+    def search(self, pdq_hex: str, threshold: int) -> tuple[object, int] | None:
+        """Return (key, distance) of the closest hash within threshold."""
+        if not self._keys:
+            return None
+        distances = self._pdq_distances(pdq_hex)
+        best = int(np.argmin(distances))
+        distance = int(distances[best])
+        if distance > threshold:
+            return None
+        return self._keys[best], distance
+
+    def phash_search(self, phash_hex: str, threshold: int) -> tuple[object, int] | None:
+        """Return (key, distance) of the closest pHash within threshold."""
+        if not self._keys:
+            return None
+        distances = self._phash_distances(phash_hex)
+        best = int(np.argmin(distances))
+        distance = int(distances[best])
+        if distance > threshold:
+            return None
+        return self._keys[best], distance
+
+    def match(
+        self,
+        pdq_hex: str | None,
+        phash_hex: str | None,
+        pdq_threshold: int,
+        phash_threshold: int,
+        prune_distance: int = 64,
+    ) -> PerceptualMatch | None:
+        """Cascade match: pHash prune, PDQ on survivors, pHash fallback.
+
+        Rows whose pHash is more than ``prune_distance`` from the query are
+        skipped by the PDQ stage (rows without a stored pHash always
+        survive). If no PDQ match is found, the best pHash within
+        ``phash_threshold`` is returned from the distances already computed.
+        """
+        if not self._keys:
+            return None
+        phash_distances = None
+        if phash_hex:
+            phash_distances = self._phash_distances(phash_hex)
+
+        if pdq_hex:
+            if phash_distances is not None and prune_distance < 64:
+                rows = np.flatnonzero(
+                    (phash_distances <= prune_distance)
+                    | ~self._has_phash[: len(self._keys)]
+                )
+            else:
+                rows = np.arange(len(self._keys))
+            self.last_survivors = len(rows)
+            if len(rows):
+                distances = self._pdq_distances(pdq_hex, rows)
+                best = int(np.argmin(distances))
+                if distances[best] <= pdq_threshold:
+                    key = self._keys[rows[best]]
+                    return PerceptualMatch(key, int(distances[best]), None)
+
+        if phash_distances is not None:
+            best = int(np.argmin(phash_distances))
+            if phash_distances[best] <= phash_threshold:
+                key = self._keys[best]
+                return PerceptualMatch(key, None, int(phash_distances[best]))
+        return None
+
+
+class PDQIndexEngine(Protocol):
+    """Interface shared by the PDQ index engines."""
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, key: Hashable) -> bool: ...
+
+    def clear(self) -> None: ...
+
+    def add(self, key: Hashable, pdq_hex: str, phash_hex: str | None = None) -> None: ...
+
+    def remove(self, key: Hashable) -> None: ...
+
+    def search(self, pdq_hex: str, threshold: int) -> tuple[Hashable, int] | None: ...
+
+    def match(
+        self,
+        pdq_hex: str | None,
+        phash_hex: str | None,
+        pdq_threshold: int,
+        phash_threshold: int,
+        prune_distance: int = 64,
+    ) -> PerceptualMatch | None: ...
+
+
+class MultiIndexPDQIndex:
+    """Multi-index hashing (MIH) over 256-bit PDQ hashes.
+
+    The hash is split into ``substrings`` equal chunks, each with its own
+    hash table from chunk value to keys. By the pigeonhole principle, any
+    hash within distance r of the query has at least one chunk within
+    distance floor(r / substrings) of the matching query chunk, so probing
+    each table with the query chunk and its few near neighbours retrieves
+    every true match. Candidates are then verified with an exact distance.
+
+    With PDQ_MATCH_THRESHOLD=31 and 16 substrings each table is probed with
+    17 values (the chunk itself plus its 16 single-bit flips), independent
+    of how many hashes are stored. pHash fallback lookups use a packed row
+    store, since 64-bit comparisons are cheap enough to vectorise.
+    """
+
+    def __init__(self, substrings: int = 16):
+        if 256 % substrings:
+            raise ValueError("substrings must divide 256")
+        self.substrings = substrings
+        self._chunk_bits = 256 // substrings
+        self._chunk_mask = (1 << self._chunk_bits) - 1
+        self._tables: list[dict[int, set]] = [{} for _ in range(substrings)]
+        self._hashes: dict = {}
+        self._rows = PackedPDQIndex()
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, key) -> bool:
+        return key in self._hashes
+
+    def clear(self) -> None:
+        self._tables = [{} for _ in range(self.substrings)]
+        self._hashes = {}
+        self._rows.clear()
+
+    def _chunks(self, value: int) -> list[int]:
+        bits = self._chunk_bits
+        mask = self._chunk_mask
+        return [(value >> (i * bits)) & mask for i in range(self.substrings)]
+
+    def add(self, key, pdq_hex: str, phash_hex: str | None = None) -> None:
+        """Add or replace the hashes stored for ``key``."""
+        if key in self._hashes:
+            self.remove(key)
+        value = int(pdq_hex, 16)
+        self._hashes[key] = value
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            table.setdefault(chunk, set()).add(key)
+        self._rows.add(key, pdq_hex, phash_hex)
+
+    def remove(self, key) -> None:
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            bucket = table.get(chunk)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[chunk]
+        self._rows.remove(key)
+
+    def candidates(self, pdq_hex: str, threshold: int) -> set:
+        """Keys sharing at least one near-identical chunk with the query."""
+        masks = chunk_flip_masks(self._chunk_bits, threshold // self.substrings)
+        found: set = set()
+        for table, chunk in zip(self._tables, self._chunks(int(pdq_hex, 16))):
+            for mask in masks:
+                bucket = table.get(chunk ^ mask)
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def search(self, pdq_hex: str, threshold: int) -> tuple[object, int] | None:
+        """Return (key, distance) of the closest hash within threshold."""
+        if not self._hashes:
+            return None
+        query = int(pdq_hex, 16)
+        best_key = None
+        best_distance = threshold + 1
+        for key in self.candidates(pdq_hex, threshold):
+            distance = (query ^ self._hashes[key]).bit_count()
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        if best_key is None:
+            return None
+        return best_key, best_distance
+
+    def match(
+        self,
+        pdq_hex: str | None,
+        phash_hex: str | None,
+        pdq_threshold: int,
+        phash_threshold: int,
+        prune_distance: int = 64,
+    ) -> PerceptualMatch | None:
+        """PDQ lookup via MIH, then the pHash fallback over the row store.
+
+        MIH candidate retrieval is already sub-linear, so no pHash pruning
+        is applied and ``prune_distance`` is ignored.
+        """
+        if pdq_hex:
+            hit = self.search(pdq_hex, pdq_threshold)
+            if hit:
+                return PerceptualMatch(hit[0], hit[1], None)
+        if phash_hex:
+            hit = self._rows.phash_search(phash_hex, phash_threshold)
+            if hit:
+                return PerceptualMatch(hit[0], None, hit[1])
+        return None
+
+
+def create_pdq_index(engine: str) -> PDQIndexEngine:
+    """Create a PDQ index engine by name ("packed" or "mih")."""
+    if engine == "packed":
+        return PackedPDQIndex()
+    if engine == "mih":
+        return MultiIndexPDQIndex()
+    raise ValueError(f"Unknown PDQ index engine: {engine}")
+
+
 def _bool_array_to_hex(arr: np.ndarray) -> str:
     """Convert a boolean/bit array to a hex string."""
     flat = arr.flatten()
@@ -0,0 +1,120 @@
+"""
+Decoded image context shared by hashing, OCR and derivative generation.
+
+A single asset submission used to decode the same upload once per service
+(PDQ, pHash, OCR, promoter overlay, badge, thumbnail). ImageContext decodes
+the bytes once and lazily caches the views those services need, so the
+services accept either raw bytes or an ImageContext.
+
+Perceptual hashes only need a small image, so hashing uses hash_image: with
+HASH_FAST_DECODE enabled, JPEGs are decoded straight to a reduced size using
+DCT-domain scaling (Image.draft) and other formats are box-reduced, instead
+of hashing the full-resolution decode.
+
+Cached images must be treated as read-only: copy before mutating.
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+
+# pHash input size: imagehash.phash(hash_size=8, highfreq_factor=4)
+PHASH_IMAGE_SIZE = 32
+
+
+class ImageContext:
+    """Lazily decoded views of one image, each computed at most once."""
+
+    def __init__(self, image_bytes: bytes):
+        self.image_bytes = image_bytes
+        self._rgb: Image.Image | None = None
+        self._gray: Image.Image | None = None
+        self._hash_image: Image.Image | None = None
+        self._hash_array: np.ndarray | None = None
+        self._phash_image: Image.Image | None = None
+        self._thumbnails: dict[tuple[int, int], Image.Image] = {}
+
+    @classmethod
+    def of(cls, image: "bytes | ImageContext") -> "ImageContext":
+        """Wrap raw bytes in a context; pass an existing context through."""
+        if isinstance(image, ImageContext):
+            return image
+        return cls(image)
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.rgb.size
+
+    @property
+    def rgb(self) -> Image.Image:
+        """Full-resolution RGB image (the only full decode)."""
+        if self._rgb is None:
+            self._rgb = Image.open(io.BytesIO(self.image_bytes)).convert("RGB")
+        return self._rgb
+
+    @property
+    def gray(self) -> Image.Image:
+        """Full-resolution grayscale image (OCR preprocessing input)."""
+        if self._gray is None:
+            self._gray = self.rgb.convert("L")
+        return self._gray
+
+    @property
+    def hash_image(self) -> Image.Image:
+        """RGB image used for perceptual hashing.
+
+        The full decode when HASH_FAST_DECODE is off; otherwise a reduced
+        decode whose shorter side is at least HASH_DECODE_SIZE pixels.
+        """
+        if self._hash_image is None:
+            if settings.HASH_FAST_DECODE:
+                self._hash_image = self._decode_reduced(settings.HASH_DECODE_SIZE)
+            else:
+                self._hash_image = self.rgb
+        return self._hash_image
+
+    @property
+    def hash_array(self) -> np.ndarray:
+        """hash_image pixels as a uint8 array, as consumed by pdqhash."""
+        if self._hash_array is None:
+            self._hash_array = np.asarray(self.hash_image)
+        return self._hash_array
+
+    def _decode_reduced(self, size: int) -> Image.Image:
+        if self.image_bytes[:3] == b"\xff\xd8\xff":
+            # JPEG: let libjpeg scale by 1/2, 1/4 or 1/8 while decoding.
+            # Always taken for JPEGs (even if the full image is cached) so
+            # the hash does not depend on which service ran first.
+            source = Image.open(io.BytesIO(self.image_bytes))
+            source.draft("RGB", (size, size))
+            img = source.convert("RGB")
+        else:
+            img = self.rgb
+        factor = min(img.size) // size
+        if factor >= 2:
+            img = img.reduce(factor)
+        return img
+
+    @property
+    def phash_image(self) -> Image.Image:
+        """32x32 grayscale downscale used by pHash."""
+        if self._phash_image is None:
+            self._phash_image = self.hash_image.convert("L").resize(
+                (PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE), Image.LANCZOS
+            )
+        return self._phash_image
+
+    def thumbnail(self, size: tuple[int, int]) -> Image.Image:
+        """RGB downscale fitting within ``size``, preserving aspect ratio."""
+        thumb = self._thumbnails.get(size)
+        if thumb is None:
+            width, height = self.rgb.size
+            scale = min(size[0] / width, size[1] / height, 1.0)
+            target = (max(1, round(width * scale)), max(1, round(height * scale)))
+            # Resize directly rather than Image.thumbnail() on a full-size copy
+            thumb = self.rgb.resize(target, Image.LANCZOS, reducing_gap=2.0)
+            self._thumbnails[size] = thumb
+        return thumb
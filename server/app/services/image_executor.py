@@ -0,0 +1,215 @@
+"""
+Bounded executor for CPU-bound image work.
+
+Hashing, OCR, overlays, badges and thumbnails take hundreds of milliseconds
+per upload. Running them inside async handlers blocks the worker's event
+loop and stalls cheap requests such as QR-code lookups, so all image
+services are routed through an ImageExecutor instead:
+
+- work runs in a process pool (or a thread pool when
+  IMAGE_EXECUTOR_MODE=thread),
+- at most IMAGE_EXECUTOR_MAX_QUEUE tasks may be in flight; beyond that
+  ExecutorBusy is raised (mapped to HTTP 503) instead of queueing forever,
+- IMAGE_TASK_LIMITS caps concurrency per task type (e.g. "submission") so
+  one kind of work cannot occupy every worker; "family.stage" types
+  without their own entry share the single "family.stages" limit,
+- queue depth, wait time and run time are tracked per task type,
+- a pool left broken by a dead worker process (an OOM kill, a Tesseract
+  crash) is replaced, and the tasks it failed raise ExecutorBusy so the
+  client retries instead of every later task failing.
+
+Promoter-statement OCR for public verification runs on a second executor,
+ocr_executor, so slow Tesseract runs never queue ahead of hashing.
+
+Task functions must be module-level (picklable) and take plain arguments
+such as bytes; an ImageContext cannot cross the process boundary.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when the executor's queue is full or its pool broke."""
+
+
+@dataclass
+class _TaskStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    total_run: float = 0.0
+
+    def as_dict(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "avg_wait_ms": round(self.total_wait / finished * 1000, 2) if finished else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "avg_run_ms": round(self.total_run / finished * 1000, 2) if finished else 0.0,
+        }
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple[float, float, Any]:
+    """Run ``fn`` in the worker, returning (started, finished, result)."""
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result
+
+
+class ImageExecutor:
+    """Process pool with a bounded queue and per-task-type limits."""
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        max_queue: int,
+        limits: dict[str, int] | None = None,
+        mode: str = "process",
+    ):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.limits = dict(limits or {})
+        self.mode = mode
+        self._pool: Executor | None = None
+        self._in_flight = 0
+        self.pool_restarts = 0
+        self._stats: dict[str, _TaskStats] = {}
+        # asyncio primitives bind to a loop, so keep one set per loop
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "thread":
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"{self.name}-"
+                )
+            else:
+                # spawn: forking a process with running threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._pool
+
+    def _semaphore(self, task_type: str) -> asyncio.Semaphore | None:
+        key = task_type
+        if task_type not in self.limits and "." in task_type:
+            # Stages such as "submission.badge" share one "submission.stages"
+            # limit, across all submissions
+            key = f"{task_type.split('.', 1)[0]}.stages"
+        limit = self.limits.get(key)
+        if not limit:
+            return None
+        per_loop = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if key not in per_loop:
+            per_loop[key] = asyncio.Semaphore(limit)
+        return per_loop[key]
+
+    async def run(self, task_type: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the pool and await its result.
+
+        Raises:
+            ExecutorBusy: If IMAGE_EXECUTOR_MAX_QUEUE tasks are already in
+                flight, or a worker process died while the task was queued
+                or running.
+        """
+        stats = self._stats.setdefault(task_type, _TaskStats())
+        if self._in_flight >= self.max_queue:
+            stats.rejected += 1
+            raise ExecutorBusy(f"{self.name} executor queue is full")
+
+        self._in_flight += 1
+        stats.in_flight += 1
+        stats.submitted += 1
+        submitted = time.time()
+        try:
+            semaphore = self._semaphore(task_type)
+            if semaphore is None:
+                started, finished, result = await self._submit(fn, args, kwargs)
+            else:
+                async with semaphore:
+                    started, finished, result = await self._submit(fn, args, kwargs)
+        except Exception:
+            stats.failed += 1
+            stats.total_wait += time.time() - submitted
+            raise
+        finally:
+            self._in_flight -= 1
+            stats.in_flight -= 1
+
+        wait = max(0.0, started - submitted)
+        stats.completed += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        stats.total_run += finished - started
+        return result
+
+    async def _submit(self, fn: Callable, args: tuple, kwargs: dict):
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        try:
+            return await loop.run_in_executor(pool, _timed_call, fn, args, kwargs)
+        except BrokenProcessPool as exc:
+            # Every task in the pool fails with this, and so would every later
+            # one; the task that killed the worker is not known, so none is
+            # retried here
+            if self._pool is pool:
+                logger.error("%s executor pool broke, replacing it", self.name)
+                self._pool = None
+                self.pool_restarts += 1
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise ExecutorBusy(f"{self.name} executor worker died") from exc
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "pool_restarts": self.pool_restarts,
+            "queue_depth": max(0, self._in_flight - self.workers),
+            "tasks": {name: s.as_dict() for name, s in self._stats.items()},
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+image_executor = ImageExecutor(
+    "image",
+    workers=settings.IMAGE_EXECUTOR_WORKERS,
+    max_queue=settings.IMAGE_EXECUTOR_MAX_QUEUE,
+    limits=settings.IMAGE_TASK_LIMITS,
+    mode=settings.IMAGE_EXECUTOR_MODE,
+)
+
+ocr_executor = ImageExecutor(
+    "ocr",
+    workers=settings.OCR_EXECUTOR_WORKERS,
+    max_queue=settings.OCR_EXECUTOR_MAX_QUEUE,
+    mode=settings.IMAGE_EXECUTOR_MODE,
+)
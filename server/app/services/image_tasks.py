@@ -0,0 +1,122 @@
+"""
+CPU-bound image tasks run by the image executor.
+
+Each function takes plain arguments and returns plain data so it can run in
+a worker process. process_submission runs the whole submission pipeline in
+one task so the upload is still decoded only once (see ImageContext);
+submission.run_submission can instead run check_promoter, render_badge and
+hash_and_preview as separate tasks, in parallel.
+"""
+
+from app.core.config import settings
+from app.services.badge import generate_badge_overlay, generate_qr_code
+from app.services.hashing import compute_all_hashes, compute_pdq, compute_sha256
+from app.services.image_context import ImageContext
+from app.services.promoter_overlay import overlay_promoter_statement
+from app.services.thumbnail import generate_thumbnail
+
+
+def check_promoter(
+    image: bytes | ImageContext,
+    promoter_statement: str,
+    promoter_position: str = "bottom-left",
+) -> dict:
+    """OCR-check an image for a promoter statement, stamping it if missing.
+
+    Returns:
+        Dict with promoter_check, promoter_bytes (None when the statement
+        was found) and derivative_hashes (of promoter_bytes, or None).
+    """
+    from app.services.ocr import find_promoter_statement
+
+    image = ImageContext.of(image)
+    promoter_check = find_promoter_statement(image, promoter_statement)
+    promoter_bytes = None
+    if not promoter_check.get("found"):
+        promoter_bytes = overlay_promoter_statement(
+            image, promoter_statement, position=promoter_position
+        )
+    return {
+        "promoter_check": promoter_check,
+        "promoter_bytes": promoter_bytes,
+        "derivative_hashes": (
+            derivative_hashes_for(promoter_bytes) if promoter_bytes is not None else None
+        ),
+    }
+
+
+def render_badge(
+    image: bytes | ImageContext,
+    verification_id: str,
+    party_short_name: str,
+    badge_position: str | None = None,
+) -> dict:
+    """Badge an image. Returns badge_bytes and their derivative_hashes."""
+    badge_bytes = generate_badge_overlay(
+        image, verification_id, party_short_name, badge_position
+    )
+    return {
+        "badge_bytes": badge_bytes,
+        "derivative_hashes": derivative_hashes_for(badge_bytes),
+    }
+
+
+def hash_and_preview(image: bytes | ImageContext, verification_id: str) -> dict:
+    """Hash an image and make its thumbnail and QR code, with one decode.
+
+    Returns:
+        Dict with hashes, thumbnail_bytes and qr_bytes.
+    """
+    image = ImageContext.of(image)
+    return {
+        "hashes": compute_all_hashes(image),
+        "thumbnail_bytes": generate_thumbnail(image),
+        "qr_bytes": generate_qr_code(verification_id),
+    }
+
+
+def process_submission(
+    image_bytes: bytes,
+    verification_id: str,
+    party_short_name: str,
+    badge_position: str | None = None,
+    promoter_statement: str | None = None,
+    promoter_position: str = "bottom-left",
+) -> dict:
+    """Hash, OCR-check, overlay, badge and thumbnail an uploaded asset.
+
+    When a promoter statement is given, the image is OCR-checked for it and
+    a promoter-stamped copy is produced if it is missing.
+
+    Returns:
+        Dict with hashes, promoter_check (or None), promoter_bytes (or None),
+        qr_bytes, badge_bytes, thumbnail_bytes and derivative_hashes (hashes
+        of the badge and promoter files keyed by kind).
+    """
+    image = ImageContext(image_bytes)
+
+    promoter = None
+    if promoter_statement:
+        promoter = check_promoter(image, promoter_statement, promoter_position)
+
+    badge = render_badge(image, verification_id, party_short_name, badge_position)
+    derivative_hashes = {"badge": badge["derivative_hashes"]}
+    if promoter and promoter["promoter_bytes"] is not None:
+        derivative_hashes["promoter"] = promoter["derivative_hashes"]
+
+    # Hashes are computed on the original image (before any badge overlay)
+    return {
+        "hashes": compute_all_hashes(image),
+        "promoter_check": promoter["promoter_check"] if promoter else None,
+        "promoter_bytes": promoter["promoter_bytes"] if promoter else None,
+        "qr_bytes": generate_qr_code(verification_id),
+        "badge_bytes": badge["badge_bytes"],
+        "thumbnail_bytes": generate_thumbnail(image),
+        "derivative_hashes": derivative_hashes,
+    }
+
+
+def derivative_hashes_for(data: bytes) -> dict:
+    """SHA-256 (and PDQ if REGISTER_DERIVATIVE_PDQ) of a generated file."""
+    pdq_hash = compute_pdq(data)[0] if settings.REGISTER_DERIVATIVE_PDQ else None
+    return {"sha256": compute_sha256(data), "pdq_hash": pdq_hash}
@@ -0,0 +1,263 @@
+"""
+Write-behind sink for VerificationLog rows.
+
+Public verification used to insert and commit its log row on the request
+path, so every response waited on a database write. Once started (in the
+application lifespan), the sink queues rows in memory and a background task
+inserts them in bulk every LOG_SINK_BATCH_SIZE rows or
+LOG_SINK_FLUSH_INTERVAL_MS milliseconds, whichever comes first.
+
+- The queue is bounded by LOG_SINK_MAX_QUEUE; when it is full (or the sink
+  is not running, as in tests) submit() returns False and the caller writes
+  the row inline instead. A batch is only dropped (and counted) after
+  repeated insert failures.
+- stop() drains the queue on shutdown.
+- Loss accounting: each worker keeps a small checkpoint file with its
+  enqueued and flushed counts. A worker that starts up and finds the
+  checkpoint of a process that no longer exists logs and reports the
+  difference as rows lost in a crash (a lower bound, since rows enqueued
+  after the last checkpoint are not counted).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Callable
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.verification import VerificationLog
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class VerificationLogSink:
+    """Bounded in-memory queue of log rows flushed in batches."""
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        checkpoint_dir: str,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.checkpoint_dir = checkpoint_dir
+        self._queue: asyncio.Queue | None = None
+        self._batch_ready: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._session_factory: Callable[[], AsyncSession] | None = None
+        self.enqueued = 0
+        self.flushed = 0
+        self.rejected = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self.lost_in_crashes = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self.checkpoint_dir, f"log_sink-{os.getpid()}.json")
+
+    def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Start the background flusher on the running event loop."""
+        if self.running:
+            return
+        self._session_factory = session_factory
+        self._queue = asyncio.Queue()
+        self._batch_ready = asyncio.Event()
+        self._account_previous_losses()
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, row: dict) -> bool:
+        """Queue a VerificationLog row (column dict) for a later bulk insert.
+
+        Returns False if the row was not queued and must be written inline.
+        """
+        if not self.running or self._queue.qsize() >= self.max_queue:
+            self.rejected += 1
+            return False
+        self._queue.put_nowait(row)
+        self.enqueued += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything queued, then stop the flusher."""
+        if not self.running:
+            return
+        self._queue.put_nowait(_STOP)
+        self._batch_ready.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                "Verification log sink did not drain within %.0fs; %d rows lost",
+                timeout,
+                self.enqueued - self.flushed - self.dropped,
+            )
+            return
+        # Clean shutdown: nothing to account for on the next start
+        try:
+            os.remove(self._checkpoint_path)
+        except OSError:
+            pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            rows = []
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            rows.append(first)
+            deadline = loop.time() + self.flush_interval
+            while True:
+                stopping = self._take(rows)
+                remaining = deadline - loop.time()
+                if stopping or len(rows) >= self.batch_size or remaining <= 0:
+                    break
+                # Sleep until the interval ends or a full batch is queued
+                self._batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush(rows)
+
+        # Drain whatever is still queued
+        while True:
+            rows = []
+            self._take(rows)
+            if not rows:
+                break
+            await self._flush(rows)
+
+    def _take(self, rows: list[dict]) -> bool:
+        """Move queued rows into ``rows`` up to a batch; True on the stop marker."""
+        while len(rows) < self.batch_size and not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is _STOP:
+                return True
+            rows.append(row)
+        return False
+
+    async def _flush(self, rows: list[dict]) -> None:
+        self._write_checkpoint()
+        started = time.monotonic()
+        for attempt in range(3):
+            try:
+                async with self._session_factory() as db:
+                    await db.execute(insert(VerificationLog), rows)
+                    await db.commit()
+                break
+            except Exception:
+                self.failed_flushes += 1
+                logger.exception(
+                    "Verification log flush of %d rows failed (attempt %d)",
+                    len(rows),
+                    attempt + 1,
+                )
+                await asyncio.sleep(0.5 * (attempt + 1))
+        else:
+            logger.error("Dropping %d verification log rows", len(rows))
+            self.dropped += len(rows)
+            self._write_checkpoint()
+            return
+        self.flushed += len(rows)
+        self.last_flush_ms = round((time.monotonic() - started) * 1000, 2)
+        self._write_checkpoint()
+
+    def _write_checkpoint(self) -> None:
+        try:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            tmp = self._checkpoint_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "enqueued": self.enqueued,
+                        "flushed": self.flushed,
+                        "dropped": self.dropped,
+                    },
+                    f,
+                )
+            os.replace(tmp, self._checkpoint_path)
+        except OSError:
+            logger.debug("Could not write log sink checkpoint")
+
+    def _account_previous_losses(self) -> None:
+        """Report rows left unflushed by worker processes that died."""
+        if not os.path.isdir(self.checkpoint_dir):
+            return
+        for entry in os.scandir(self.checkpoint_dir):
+            if not (entry.name.startswith("log_sink-") and entry.name.endswith(".json")):
+                continue
+            try:
+                pid = int(entry.name[len("log_sink-") : -len(".json")])
+            except ValueError:
+                continue
+            if pid == os.getpid() or _pid_alive(pid):
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    checkpoint = json.load(f)
+                os.remove(entry.path)
+            except (OSError, ValueError):
+                continue  # another worker claimed it first
+            lost = (
+                checkpoint.get("enqueued", 0)
+                - checkpoint.get("flushed", 0)
+                - checkpoint.get("dropped", 0)
+            )
+            if lost > 0:
+                self.lost_in_crashes += lost
+                logger.warning(
+                    "Worker %d exited with at least %d unflushed verification log rows",
+                    pid,
+                    lost,
+                )
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "written_inline": self.rejected,
+            "failed_flushes": self.failed_flushes,
+            "dropped_after_retries": self.dropped,
+            "lost_in_crashes": self.lost_in_crashes,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+log_sink = VerificationLogSink(
+    batch_size=settings.LOG_SINK_BATCH_SIZE,
+    flush_interval=settings.LOG_SINK_FLUSH_INTERVAL_MS / 1000,
+    max_queue=settings.LOG_SINK_MAX_QUEUE,
+    checkpoint_dir=os.path.join(settings.LOCAL_STORAGE_PATH, "log_sink"),
+)
@@ -3,165 +3,573 @@ OCR service for promoter statement detection.
 
 Uses Tesseract OCR to extract text from political campaign images and
 fuzzy-matches against the party's registered promoter statement.
+
+Promoter statements sit in the corners (or, on portrait images, along the
+top or bottom edge) - see promoter_overlay. With OCR_ROI_ENABLED the
+promoter checks OCR those bands first, in priority order, each cropped and
+scaled so the smallest expected statement text is OCR_ROI_TEXT_HEIGHT
+pixels tall, and stop at the first band with a confident match. Only when
+no band matches is the full-resolution image read.
+
+Most unmatched uploads in public verification are photos with no small
+print at all, so find_promoter_across_parties first scores the bands with
+a cheap NumPy edge-density detector (text_score) and skips Tesseract when
+the score is below OCR_TEXT_SCORE_CUTOFF.
+
+Tesseract itself runs behind an OcrBackend chosen by OCR_BACKEND.
+pytesseract starts a tesseract process per call, writing the image to a
+temporary file and reloading the traineddata each time. TesseractEnginePool
+instead keeps up to OCR_ENGINE_POOL_SIZE engines initialised in each OCR
+worker process (through tesserocr's C API bindings) and hands them images
+in memory; engines are health-checked on checkout and recycled after
+OCR_ENGINE_MAX_USES images or any error.
+
+Text read from each band (and the full image) is kept in ocr_cache, keyed
+by the image's SHA-256, so an image OCR'd at submission is not OCR'd again
+when it is verified or resubmitted, by any worker.
 """
 
-import io
-from difflib import SequenceMatcher
+import logging
+import math
+import threading
+from typing import Any, Callable, Protocol
 
+import numpy as np
 from PIL import Image, ImageEnhance
 
 from app.core.config import settings
+from app.services.fuzzy_match import StatementSet, best_substring_matches
+from app.services.image_context import ImageContext
+from app.services.ocr_cache import ocr_cache
+from app.services.promoter_overlay import detect_orientation
 
 try:
     import pytesseract
 except ImportError:
     pytesseract = None  # type: ignore[assignment]
 
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+OCR_LANG = "eng"
+
+# Bands as (name, (left, top, right, bottom)) fractions of the image, in the
+# order they are read. Landscape statement boxes are at most 45% of the
+# width; portrait ones up to 90%, so portrait images are read in strips.
+ROI_BANDS = {
+    "landscape": (
+        ("bottom-left", (0.0, 0.7, 0.55, 1.0)),
+        ("bottom-right", (0.45, 0.7, 1.0, 1.0)),
+        ("top-left", (0.0, 0.0, 0.55, 0.3)),
+        ("top-right", (0.45, 0.0, 1.0, 0.3)),
+    ),
+    "portrait": (
+        ("bottom", (0.0, 0.7, 1.0, 1.0)),
+        ("top", (0.0, 0.0, 1.0, 0.3)),
+    ),
+}
+# Smallest statement text relative to the image height (the min_height_ratio
+# of promoter_overlay.calculate_font_size)
+_MIN_TEXT_HEIGHT_RATIO = 0.015
+
+# Small-text detector (text_score): tile size in px once the smallest text
+# is scaled to one tile, the grey-level step counted as an edge, and the
+# edge densities of a text-like tile
+_TEXT_TILE = 12
+_EDGE_CONTRAST = 40
+_MIN_STEP_DENSITY_X = 0.06
+_MIN_STEP_DENSITY_Y = 0.03
+_MAX_STEP_DENSITY = 0.5
+
+
+def _enhance(gray: Image.Image) -> Image.Image:
+    # Increase contrast
+    enhancer = ImageEnhance.Contrast(gray)
+    enhanced = enhancer.enhance(2.0)
+
+    # Increase sharpness
+    enhancer = ImageEnhance.Sharpness(enhanced)
+    enhanced = enhancer.enhance(2.0)
+
+    return enhanced
+
 
-def _preprocess_image(image_bytes: bytes) -> Image.Image:
+def _preprocess_image(image: bytes | ImageContext) -> Image.Image:
     """Pre-process image for better OCR accuracy.
 
     Converts to grayscale and increases contrast to help Tesseract
     extract text from varied backgrounds.
     """
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    # Grayscale view of the (shared) decoded image
+    return _enhance(ImageContext.of(image).gray)
+
+
+def _scaled_band_sources(gray: Image.Image, text_height: int, resample: int):
+    """(name, make_band) for each ROI band, in priority order; make_band()
+    crops and scales the band so the smallest statement text expected is
+    ``text_height`` px tall."""
+    w, h = gray.size
+    min_text = max(settings.PROMOTER_MIN_FONT_SIZE, h * _MIN_TEXT_HEIGHT_RATIO)
+    scale = min(1.0, text_height / min_text)
+
+    def source(left: float, top: float, right: float, bottom: float):
+        def make_band() -> Image.Image:
+            box = (round(left * w), round(top * h), round(right * w), round(bottom * h))
+            band = gray.crop(box)
+            if scale < 1.0:
+                size = (
+                    max(1, round(band.width * scale)),
+                    max(1, round(band.height * scale)),
+                )
+                band = band.resize(size, resample, reducing_gap=2.0)
+            return band
+
+        return make_band
+
+    return [
+        (name, source(*bounds))
+        for name, bounds in ROI_BANDS[detect_orientation(gray)]
+    ]
+
+
+def _scaled_bands(gray: Image.Image, text_height: int, resample: int):
+    """Yield (name, band) for each ROI band, in priority order, scaled down
+    so the smallest statement text expected is ``text_height`` px tall."""
+    for name, make_band in _scaled_band_sources(gray, text_height, resample):
+        yield name, make_band()
+
+
+def _band_sources(image: bytes | ImageContext):
+    """(name, make_image) for each ROI band, in priority order;
+    make_image() returns the preprocessed band."""
+    gray = ImageContext.of(image).gray
+    return [
+        (name, lambda make_band=make_band: _enhance(make_band()))
+        for name, make_band in _scaled_band_sources(
+            gray, settings.OCR_ROI_TEXT_HEIGHT, Image.Resampling.LANCZOS
+        )
+    ]
 
-    # Convert to grayscale
-    gray = img.convert("L")
 
-    # Increase contrast
-    enhancer = ImageEnhance.Contrast(gray)
-    enhanced = enhancer.enhance(2.0)
+def _band_images(image: bytes | ImageContext):
+    """Yield (name, preprocessed band) for each ROI band, in priority order."""
+    for name, make_image in _band_sources(image):
+        yield name, make_image()
 
-    # Increase sharpness
-    enhancer = ImageEnhance.Sharpness(enhanced)
-    enhanced = enhancer.enhance(2.0)
 
-    return enhanced
+def _longest_run(mask: np.ndarray) -> int:
+    """Longest run of True along any row of a 2-D boolean array."""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    steps = np.diff(padded, axis=1)
+    # Row-major order pairs each run's start with its end
+    starts = np.nonzero(steps == 1)[1]
+    ends = np.nonzero(steps == -1)[1]
+    return int((ends - starts).max()) if starts.size else 0
+
+
+def text_score(image: bytes | ImageContext) -> float:
+    """Cheap estimate of whether small text is present in the ROI bands.
+
+    Each band is box-downsampled so the smallest statement text allowed is
+    one tile (_TEXT_TILE px) tall, and split into tiles (rows overlapping
+    by half a tile). A tile is text-like when its densities of strong
+    horizontal and vertical intensity steps are in the range glyph strokes
+    produce; flat areas, gradients and smooth photo detail have too few.
+    Returns the longest horizontal run of text-like tiles in any band, in
+    text heights - roughly the length of the longest line of small text.
+    A band too small to tile scores infinity (never skipped).
+    """
+    gray = ImageContext.of(image).gray
+    best = 0.0
+    for _, band in _scaled_bands(gray, _TEXT_TILE, Image.Resampling.BOX):
+        pixels = np.asarray(band, dtype=np.int16)
+        tiles_across = (pixels.shape[1] - 1) // _TEXT_TILE
+        if pixels.shape[0] - 1 < _TEXT_TILE or tiles_across < 1:
+            return math.inf
+        width = tiles_across * _TEXT_TILE
+        steps_x = np.abs(np.diff(pixels, axis=1))[:-1, :width] > _EDGE_CONTRAST
+        steps_y = np.abs(np.diff(pixels, axis=0))[:, :width] > _EDGE_CONTRAST
+
+        tops = np.arange(0, steps_x.shape[0] - _TEXT_TILE + 1, _TEXT_TILE // 2)
+        densities = []
+        for steps in (steps_x, steps_y):
+            rows = np.zeros((steps.shape[0] + 1, width), dtype=np.int32)
+            np.cumsum(steps, axis=0, out=rows[1:])
+            windows = rows[tops + _TEXT_TILE] - rows[tops]
+            per_tile = windows.reshape(len(tops), tiles_across, _TEXT_TILE).sum(axis=2)
+            densities.append(per_tile / (_TEXT_TILE * _TEXT_TILE))
+        density_x, density_y = densities
+        text_like = (
+            (density_x >= _MIN_STEP_DENSITY_X)
+            & (density_x <= _MAX_STEP_DENSITY)
+            & (density_y >= _MIN_STEP_DENSITY_Y)
+        )
+        best = max(best, _longest_run(text_like))
+    return best
+
+
+class OcrBackend(Protocol):
+    """Interface shared by the Tesseract backends."""
+
+    name: str
+
+    def image_to_string(self, image: Image.Image) -> str: ...
+
+    def close(self) -> None: ...
+
+    def stats(self) -> dict: ...
+
+
+class PytesseractBackend:
+    """A tesseract process per call, via pytesseract."""
+
+    name = "pytesseract"
+
+    def __init__(self):
+        self.calls = 0
+
+    def image_to_string(self, image: Image.Image) -> str:
+        if pytesseract is None:
+            raise RuntimeError(
+                "pytesseract is not installed. Install with: pip install pytesseract"
+            )
+        self.calls += 1
+        try:
+            return pytesseract.image_to_string(image, lang=OCR_LANG)
+        except pytesseract.TesseractNotFoundError as exc:
+            raise RuntimeError(str(exc)) from exc
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "calls": self.calls}
+
+
+class _Engine:
+    __slots__ = ("api", "uses")
+
+    def __init__(self, api):
+        self.api = api
+        self.uses = 0
+
+
+class TesseractEnginePool:
+    """Long-lived Tesseract engines, one checked out per call.
+
+    Engines are created on demand up to ``size`` (callers beyond that wait
+    for one to be returned), so the traineddata is loaded once per engine
+    rather than once per image.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, size: int, max_uses: int, lang: str = OCR_LANG):
+        if tesserocr is None:
+            raise RuntimeError(
+                "tesserocr is not installed. Install with: "
+                "pip install -r requirements-ocr.txt"
+            )
+        self.size = size
+        self.max_uses = max_uses
+        self.lang = lang
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: list[_Engine] = []
+        self.calls = 0
+        self.created = 0
+        self.recycled = 0
+        self.failed_health_checks = 0
+        self.errors = 0
+
+    def _create(self) -> _Engine:
+        api = tesserocr.PyTessBaseAPI(lang=self.lang)
+        engine = _Engine(api)
+        if not self._healthy(engine):
+            api.End()
+            raise RuntimeError(f"Tesseract engine could not load {self.lang!r}")
+        self.created += 1
+        return engine
+
+    def _healthy(self, engine: _Engine) -> bool:
+        try:
+            return engine.api.GetInitLanguagesAsString() == self.lang
+        except Exception:
+            return False
+
+    def _retire(self, engine: _Engine) -> None:
+        try:
+            engine.api.End()
+        except Exception:
+            logger.warning("Could not shut down Tesseract engine", exc_info=True)
+
+    def _checkout(self) -> _Engine:
+        with self._lock:
+            while self._idle:
+                engine = self._idle.pop()
+                if self._healthy(engine):
+                    return engine
+                self.failed_health_checks += 1
+                self._retire(engine)
+        return self._create()
+
+    def _checkin(self, engine: _Engine, failed: bool) -> None:
+        if failed or engine.uses >= self.max_uses:
+            self.recycled += 1
+            self._retire(engine)
+            return
+        engine.api.Clear()
+        with self._lock:
+            self._idle.append(engine)
+
+    def image_to_string(self, image: Image.Image) -> str:
+        with self._slots:
+            engine = self._checkout()
+            failed = True
+            try:
+                engine.api.SetImage(image)
+                text = engine.api.GetUTF8Text()
+                failed = False
+            except Exception as exc:
+                self.errors += 1
+                raise RuntimeError(f"Tesseract engine failed: {exc}") from exc
+            finally:
+                engine.uses += 1
+                self.calls += 1
+                self._checkin(engine, failed)
+        return text
+
+    def close(self) -> None:
+        """End the idle engines (engines in use are ended on return)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for engine in idle:
+            self._retire(engine)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "calls": self.calls,
+            "pool_size": self.size,
+            "idle": len(self._idle),
+            "created": self.created,
+            "recycled": self.recycled,
+            "failed_health_checks": self.failed_health_checks,
+            "errors": self.errors,
+        }
+
+
+def create_backend(name: str) -> OcrBackend:
+    """Create an OCR backend by name ("tesserocr", "pytesseract" or "auto").
+
+    "auto" uses the engine pool when tesserocr is installed.
+    """
+    if name == "auto":
+        name = "tesserocr" if tesserocr is not None else "pytesseract"
+    if name == "tesserocr":
+        return TesseractEnginePool(
+            settings.OCR_ENGINE_POOL_SIZE, settings.OCR_ENGINE_MAX_USES
+        )
+    if name == "pytesseract":
+        return PytesseractBackend()
+    raise ValueError(f"Unknown OCR backend: {name}")
+
+
+_backend: OcrBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> OcrBackend:
+    """This process's OCR backend, created on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(settings.OCR_BACKEND)
+                logger.info("OCR backend: %s", _backend.name)
+    return _backend
+
+
+def close_backend() -> None:
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
 
 
-def extract_text_from_image(image_bytes: bytes) -> str:
+def _run_tesseract(image: Image.Image) -> str:
+    return get_backend().image_to_string(image).strip()
+
+
+def _cache_key(image: ImageContext) -> str | None:
+    return ocr_cache.key_for(image) if settings.OCR_CACHE_ENABLED else None
+
+
+def _ocr_region(
+    key: str | None, region: str, make_image: Callable[[], Image.Image]
+) -> tuple[str, bool]:
+    """(text, from_cache) for one region of the image cached under ``key``.
+
+    The region is only cropped and preprocessed on a cache miss. Failures
+    are not cached; empty text is.
+    """
+    if key is not None:
+        text = ocr_cache.get(key, region)
+        if text is not None:
+            return text, True
+    text = _run_tesseract(make_image())
+    if key is not None:
+        ocr_cache.put(key, region, text)
+    return text, False
+
+
+def extract_text_from_image(image: bytes | ImageContext) -> str:
     """Run Tesseract OCR on an image and return all extracted text.
 
     Args:
-        image_bytes: Image file bytes.
+        image: Image file bytes or a decoded ImageContext.
 
     Returns:
         Extracted text as a single string.
 
     Raises:
-        RuntimeError: If pytesseract is not installed.
+        RuntimeError: If Tesseract is not available or fails.
     """
-    if pytesseract is None:
-        raise RuntimeError(
-            "pytesseract is not installed. Install with: pip install pytesseract"
-        )
+    image = ImageContext.of(image)
+    return _ocr_region(_cache_key(image), "full", lambda: _preprocess_image(image))[0]
+
+
+def _read_until_match(
+    image: bytes | ImageContext, match: Callable[[str], tuple[float, Any]]
+) -> tuple[str, str, tuple[float, Any] | None, bool]:
+    """OCR the ROI bands, then the full image, until ``match`` is confident.
+
+    ``match`` scores OCR text as (ratio, details). Returns (text, region,
+    match(text), cached) for the first band whose ratio reaches
+    PROMOTER_OCR_MATCH_THRESHOLD, else for the full image (region "full";
+    the match is None if no text was found). ``cached`` is True when every
+    region read came from the OCR cache.
 
-    processed = _preprocess_image(image_bytes)
-    text = pytesseract.image_to_string(processed, lang="eng")
-    return text.strip()
+    Raises:
+        RuntimeError: If Tesseract is not available or fails.
+    """
+    image = ImageContext.of(image)
+    key = _cache_key(image)
+    cached = True
+    if settings.OCR_ROI_ENABLED:
+        # Cached per text height, which changes what Tesseract is given
+        height = settings.OCR_ROI_TEXT_HEIGHT
+        for name, make_image in _band_sources(image):
+            text, hit = _ocr_region(key, f"{name}@{height}", make_image)
+            cached = cached and hit
+            if text:
+                result = match(text)
+                if result[0] >= settings.PROMOTER_OCR_MATCH_THRESHOLD:
+                    return text, name, result, cached
+    text, hit = _ocr_region(key, "full", lambda: _preprocess_image(image))
+    return text, "full", match(text) if text else None, cached and hit
 
 
 def _best_substring_match(text: str, target: str) -> tuple[str, float]:
     """Find the substring of text that best matches the target string.
 
-    Uses a sliding window approach with SequenceMatcher for fuzzy matching.
-
     Returns:
         (best_matching_substring, match_ratio)
     """
-    text_lower = text.lower()
-    target_lower = target.lower()
-
-    # Try exact substring first
-    if target_lower in text_lower:
-        return target, 1.0
-
-    # Sliding window fuzzy match
-    target_len = len(target_lower)
-    best_match = ""
-    best_ratio = 0.0
-
-    # Try windows of varying sizes around the target length
-    for window_size in range(
-        max(1, target_len - 20), target_len + 20
-    ):
-        if window_size > len(text_lower):
-            continue
-        for start in range(0, len(text_lower) - window_size + 1):
-            window = text_lower[start : start + window_size]
-            ratio = SequenceMatcher(None, window, target_lower).ratio()
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_match = text[start : start + window_size]
-
-    return best_match, best_ratio
+    return best_substring_matches(text, [target])[0]
 
 
 def find_promoter_across_parties(
-    image_bytes: bytes,
+    image: bytes | ImageContext,
     parties: list[tuple[str, str, str]],
+    statements: StatementSet | None = None,
 ) -> dict:
     """OCR an image and search for ANY party's promoter statement.
 
     Args:
-        image_bytes: Image file bytes.
+        image: Image file bytes or a decoded ImageContext.
         parties: List of (party_id, party_name, promoter_statement) tuples.
+        statements: Prebuilt StatementSet of the parties' statements, in the
+            same order (see promoter_index); built here when omitted.
 
     Returns:
-        dict with: found, party_id, party_name, confidence, extracted_text
-    """
-    try:
-        extracted_text = extract_text_from_image(image_bytes)
-    except RuntimeError:
-        return {
-            "found": False,
-            "party_id": None,
-            "party_name": None,
-            "confidence": 0.0,
-            "extracted_text": "",
-        }
+        dict with: found, party_id, party_name, confidence, extracted_text,
+        region (the ROI band the text was read from, or "full") and
+        ocr_cached (no Tesseract run: all text came from ocr_cache); or, when
+        the text prefilter skipped OCR, ocr_skipped and text_score instead
+        of region
 
-    if not extracted_text:
+    Raises:
+        RuntimeError: If Tesseract is not available or fails, so callers can
+            tell a failed check from one that found no statement.
+    """
+    threshold = settings.PROMOTER_OCR_MATCH_THRESHOLD
+    if statements is None:
+        statements = StatementSet([p[2] or "" for p in parties])
+
+    def best_party(text: str) -> tuple[float, tuple[str, str] | None]:
+        # One scan of the OCR text covers every party's statement
+        best_ratio, best = 0.0, None
+        matches = statements.best_matches(text, min_ratio=threshold)
+        for (party_id, party_name, _), (_, ratio) in zip(parties, matches):
+            if ratio > best_ratio:
+                best_ratio, best = ratio, (party_id, party_name)
+        return best_ratio, best
+
+    cutoff = settings.OCR_TEXT_SCORE_CUTOFF
+    if cutoff > 0:
+        image = ImageContext.of(image)
+        score = text_score(image)
+        if score < cutoff:
+            return {
+                "found": False,
+                "party_id": None,
+                "party_name": None,
+                "confidence": 0.0,
+                "extracted_text": "",
+                "ocr_skipped": True,
+                "text_score": score,
+            }
+
+    extracted_text, region, match, cached = _read_until_match(image, best_party)
+    if match is None:
         return {
             "found": False,
             "party_id": None,
             "party_name": None,
             "confidence": 0.0,
             "extracted_text": "",
+            "region": region,
+            "ocr_cached": cached,
         }
 
-    best_party_id = None
-    best_party_name = None
-    best_ratio = 0.0
-
-    for party_id, party_name, statement in parties:
-        if not statement:
-            continue
-        _, ratio = _best_substring_match(extracted_text, statement)
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_party_id = party_id
-            best_party_name = party_name
-
-    threshold = settings.PROMOTER_OCR_MATCH_THRESHOLD
+    best_ratio, best = match
+    found = best_ratio >= threshold
     return {
-        "found": best_ratio >= threshold,
-        "party_id": best_party_id if best_ratio >= threshold else None,
-        "party_name": best_party_name if best_ratio >= threshold else None,
+        "found": found,
+        "party_id": best[0] if found else None,
+        "party_name": best[1] if found else None,
         "confidence": round(best_ratio, 3),
         "extracted_text": extracted_text,
+        "region": region,
+        "ocr_cached": cached,
     }
 
 
 def find_promoter_statement(
-    image_bytes: bytes,
+    image: bytes | ImageContext,
     expected_statement: str,
 ) -> dict:
     """OCR an image and search for the expected promoter statement.
 
     Args:
-        image_bytes: Image file bytes.
+        image: Image file bytes or a decoded ImageContext.
         expected_statement: The promoter statement text to search for.
 
     Returns:
@@ -171,9 +579,15 @@ def find_promoter_statement(
             extracted_text: str - raw OCR text
             best_match: str | None - closest matching substring
             match_ratio: float - fuzzy match ratio
+            region: str - ROI band the text was read from, or "full"
+            ocr_cached: bool - all text came from ocr_cache
     """
+    def match(text: str) -> tuple[float, str]:
+        best_match, match_ratio = _best_substring_match(text, expected_statement)
+        return match_ratio, best_match
+
     try:
-        extracted_text = extract_text_from_image(image_bytes)
+        extracted_text, region, result, cached = _read_until_match(image, match)
     except RuntimeError:
         return {
             "found": False,
@@ -184,16 +598,18 @@ def find_promoter_statement(
             "error": "OCR engine not available",
         }
 
-    if not extracted_text:
+    if result is None:
         return {
             "found": False,
             "confidence": 0.0,
             "extracted_text": "",
             "best_match": None,
             "match_ratio": 0.0,
+            "region": region,
+            "ocr_cached": cached,
         }
 
-    best_match, match_ratio = _best_substring_match(extracted_text, expected_statement)
+    match_ratio, best_match = result
 
     threshold = settings.PROMOTER_OCR_MATCH_THRESHOLD
     found = match_ratio >= threshold
@@ -204,4 +620,6 @@ def find_promoter_statement(
         "extracted_text": extracted_text,
         "best_match": best_match if match_ratio > 0.3 else None,
         "match_ratio": round(match_ratio, 3),
+        "region": region,
+        "ocr_cached": cached,
     }
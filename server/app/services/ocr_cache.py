@@ -0,0 +1,214 @@
+"""
+On-disk cache of OCR text, shared by every worker on a host.
+
+The same poster is OCR'd at submission and again on each unmatched public
+verification. Tesseract output for an image depends only on its content and
+the region read, so it is stored in an SQLite file (OCR_CACHE_PATH, by
+default under LOCAL_STORAGE_PATH) keyed by (image SHA-256, region). SQLite
+in WAL mode lets the API and OCR worker processes share it; each process
+and thread opens its own connection.
+
+Only exact copies share text. Reusing a near-duplicate's text (by PDQ
+distance) is unsafe here: a promoter-stamped copy and its unstamped
+original are near-duplicates, and would answer each other's promoter check.
+
+The text is stored in plaintext, including that of posters submitted
+before publication, so entries expire OCR_CACHE_MAX_AGE_SECONDS after they
+were stored: expired entries are never read, and are deleted with the
+eviction check a process runs every EVICT_CHECK_EVERY writes (or
+EVICT_CHECK_SECONDS, whichever comes first). That check also drops the
+least recently used entries until the rest fit in OCR_CACHE_MAX_BYTES.
+stats() reports the file's contents, so every worker shows the same figures.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+from app.services.hashing import compute_sha256
+from app.services.image_context import ImageContext
+
+logger = logging.getLogger(__name__)
+
+EVICT_CHECK_EVERY = 100
+EVICT_CHECK_SECONDS = 600.0
+# last_used is only rewritten on a hit when older than this (seconds)
+_TOUCH_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_text (
+    sha256 TEXT NOT NULL,
+    region TEXT NOT NULL,
+    text TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (sha256, region)
+);
+CREATE INDEX IF NOT EXISTS ix_ocr_text_last_used ON ocr_text (last_used);
+CREATE INDEX IF NOT EXISTS ix_ocr_text_stored_at ON ocr_text (stored_at);
+DROP TABLE IF EXISTS ocr_pdq;
+"""
+
+
+class OcrCache:
+    """(image SHA-256, region) -> OCR text, in a shared SQLite file."""
+
+    def __init__(self, path: str, max_bytes: int, max_age: float = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Seconds an entry is kept after it was stored; 0 keeps it until evicted
+        self.max_age = max_age
+        self._local = threading.local()
+        # Bumped by reset() so every thread reopens its connection
+        self._generation = 0
+        self._writes = 0
+        self._evict_checked = time.monotonic()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, reopened in forked worker processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.key != (os.getpid(), self._generation):
+            if conn is not None and self._local.key[0] == os.getpid():
+                conn.close()
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.key = (os.getpid(), self._generation)
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection (others close with their thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def reset(self) -> None:
+        """Close connections (the file may have moved)."""
+        self.close()
+        self._generation += 1
+        self._writes = 0
+        self._evict_checked = time.monotonic()
+
+    def _cutoff(self, now: float) -> float:
+        """Entries stored at or before this have expired."""
+        return now - self.max_age if self.max_age else float("-inf")
+
+    def key_for(self, image: ImageContext) -> str:
+        """The key to read and store ``image``'s text under: its SHA-256."""
+        return compute_sha256(image.image_bytes)
+
+    def get(self, key: str, region: str) -> str | None:
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT text, last_used FROM ocr_text "
+                "WHERE sha256 = ? AND region = ? AND stored_at > ?",
+                (key, region, self._cutoff(now)),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > _TOUCH_INTERVAL:
+                conn.execute(
+                    "UPDATE ocr_text SET last_used = ? WHERE sha256 = ? AND region = ?",
+                    (now, key, region),
+                )
+        except sqlite3.Error:
+            logger.warning("OCR cache read failed", exc_info=True)
+            return None
+        return row[0]
+
+    def put(self, key: str, region: str, text: str) -> None:
+        try:
+            conn = self._connection()
+            # Sized with its key, so entries with no text still count
+            size = len(key) + len(region) + len(text.encode())
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_text "
+                "(sha256, region, text, bytes, stored_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, region, text, size, now, now),
+            )
+            self._writes += 1
+            if (
+                self._writes % EVICT_CHECK_EVERY == 0
+                or time.monotonic() - self._evict_checked >= EVICT_CHECK_SECONDS
+            ):
+                self.evict(conn)
+        except sqlite3.Error:
+            logger.warning("OCR cache write failed", exc_info=True)
+
+    def evict(self, conn: sqlite3.Connection | None = None) -> int:
+        """Drop expired entries, then least recently used ones beyond max_bytes.
+
+        Returns the number of entries deleted.
+        """
+        conn = conn or self._connection()
+        self._evict_checked = time.monotonic()
+        cutoff = self._cutoff(time.time())
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(bytes), 0) FROM ocr_text WHERE stored_at > ?",
+            (cutoff,),
+        ).fetchone()
+        excess = total - self.max_bytes
+        doomed = []
+        if excess > 0:
+            # Free a little more than needed so eviction does not run every time
+            excess += self.max_bytes // 10
+            for rowid, size in conn.execute(
+                "SELECT rowid, bytes FROM ocr_text WHERE stored_at > ? "
+                "ORDER BY last_used",
+                (cutoff,),
+            ):
+                doomed.append((rowid,))
+                excess -= size
+                if excess <= 0:
+                    break
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = conn.execute(
+                "DELETE FROM ocr_text WHERE stored_at <= ?", (cutoff,)
+            ).rowcount
+            conn.executemany("DELETE FROM ocr_text WHERE rowid = ?", doomed)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        return expired + len(doomed)
+
+    def stats(self) -> dict:
+        """Entries in the file (shared by every worker), read from SQLite."""
+        try:
+            entries, size, oldest = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0), MIN(stored_at) "
+                "FROM ocr_text"
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning("OCR cache stats failed", exc_info=True)
+            entries = size = oldest = None
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "oldest_age_seconds": (
+                round(time.time() - oldest) if oldest is not None else None
+            ),
+            "max_age_seconds": self.max_age,
+        }
+
+
+ocr_cache = OcrCache(
+    path=settings.OCR_CACHE_PATH
+    or os.path.join(settings.LOCAL_STORAGE_PATH, "ocr_cache.sqlite3"),
+    max_bytes=settings.OCR_CACHE_MAX_BYTES,
+    max_age=settings.OCR_CACHE_MAX_AGE_SECONDS,
+)
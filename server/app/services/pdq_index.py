@@ -0,0 +1,124 @@
+"""
+Process-local PDQ registry index.
+
+Keeps the PDQ hashes of all ACTIVE assets in memory so perceptual matching
+does not need to load every asset row from the database per request. The
+lookup structure is chosen by PDQ_INDEX_ENGINE (see hashing.create_pdq_index).
+
+The index is loaded at startup, updated in place when this worker registers
+or revokes an asset, and re-synced incrementally from the database every
+PDQ_INDEX_REFRESH_SECONDS so changes made by other workers are picked up.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.asset import Asset, AssetStatus
+from app.services.hashing import PerceptualMatch, create_pdq_index
+
+logger = logging.getLogger(__name__)
+
+# Overlap applied to incremental syncs so rows committed by another worker
+# just before our last sync are not missed.
+_SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class PDQRegistryIndex:
+    """In-memory PDQ index of the active asset registry."""
+
+    def __init__(self):
+        self.index = create_pdq_index(settings.PDQ_INDEX_ENGINE)
+        self._loaded = False
+        self._synced_at: datetime | None = None
+        self._synced_monotonic = 0.0
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def reset(self) -> None:
+        """Drop all entries; the next sync() reloads from the database."""
+        self.index.clear()
+        self._loaded = False
+        self._synced_at = None
+        self._synced_monotonic = 0.0
+
+    def add(self, asset_id: uuid.UUID, pdq_hash: str, phash: str | None = None) -> None:
+        self.index.add(asset_id, pdq_hash, phash)
+
+    def remove(self, asset_id: uuid.UUID) -> None:
+        self.index.remove(asset_id)
+
+    def search(self, pdq_hash: str, threshold: int) -> tuple[uuid.UUID, int] | None:
+        return self.index.search(pdq_hash, threshold)
+
+    def match(self, pdq_hash: str | None, phash: str | None) -> PerceptualMatch | None:
+        """PDQ match with pHash fallback in a single pass over the index."""
+        return self.index.match(
+            pdq_hash,
+            phash,
+            settings.PDQ_MATCH_THRESHOLD,
+            settings.PHASH_MATCH_THRESHOLD,
+            settings.PHASH_CASCADE_PRUNE_DISTANCE,
+        )
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)build the index from every ACTIVE asset."""
+        started = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(Asset.id, Asset.pdq_hash, Asset.phash).where(
+                Asset.status == AssetStatus.ACTIVE
+            )
+        )
+        self.index.clear()
+        for asset_id, pdq_hash, phash in result.all():
+            self.index.add(asset_id, pdq_hash, phash)
+        self._loaded = True
+        self._synced_at = started
+        self._synced_monotonic = time.monotonic()
+        logger.info("PDQ index loaded with %d active assets", len(self.index))
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Load the index if needed, or apply changes since the last sync."""
+        if self._loaded and (
+            time.monotonic() - self._synced_monotonic
+            < settings.PDQ_INDEX_REFRESH_SECONDS
+        ):
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.load(db)
+                return
+            if (
+                time.monotonic() - self._synced_monotonic
+                < settings.PDQ_INDEX_REFRESH_SECONDS
+            ):
+                return
+            started = datetime.now(timezone.utc)
+            since = self._synced_at - _SYNC_OVERLAP
+            result = await db.execute(
+                select(Asset.id, Asset.pdq_hash, Asset.phash, Asset.status).where(
+                    or_(Asset.created_at >= since, Asset.revoked_at >= since)
+                )
+            )
+            for asset_id, pdq_hash, phash, status in result.all():
+                if status == AssetStatus.ACTIVE:
+                    self.index.add(asset_id, pdq_hash, phash)
+                else:
+                    self.index.remove(asset_id)
+            self._synced_at = started
+            self._synced_monotonic = time.monotonic()
+
+
+pdq_index = PDQRegistryIndex()
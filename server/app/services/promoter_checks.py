@@ -0,0 +1,171 @@
+"""
+Deferred OCR promoter-statement checks for public verification.
+
+An unmatched upload is OCR'd for any party's promoter statement. Tesseract
+takes far longer than the rest of verification, so the check runs on the
+dedicated ocr_executor and the request waits at most PROMOTER_OCR_BUDGET_MS
+for it. If it is not done by then, the response goes out with a
+promoter_check_id; the check carries on in the background and its outcome
+is written to the promoter_checks table for GET /verify/promoter-check/{id}.
+Rows older than PROMOTER_CHECK_RETENTION_HOURS are pruned.
+
+Until start() is called (in the application lifespan; not in tests) every
+check is awaited to completion, as before.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.verification import PromoterCheck, PromoterCheckStatus
+from app.services.fuzzy_match import StatementSet
+from app.services.image_executor import ocr_executor
+
+logger = logging.getLogger(__name__)
+
+
+class PromoterChecks:
+    """Runs OCR promoter checks under a time budget, deferring slow ones."""
+
+    def __init__(self, budget: float, retention: timedelta):
+        self.budget = budget
+        self.retention = retention
+        self._session_factory: Callable[[], AsyncSession] | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.checks = 0
+        self.ocr_skipped = 0
+        self.ocr_cached = 0
+        self.within_budget = 0
+        self.deferred = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._session_factory is not None
+
+    def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        self._session_factory = session_factory
+
+    async def run(
+        self,
+        image_bytes: bytes,
+        parties: list[tuple[str, str, str]],
+        statements: StatementSet | None = None,
+    ) -> tuple[dict | None, uuid.UUID | None]:
+        """OCR ``image_bytes`` for any of ``parties``' statements.
+
+        Returns (result, None) when the check finishes within the budget,
+        otherwise (None, check_id). Raises if OCR fails within the budget.
+        """
+        from app.services.ocr import find_promoter_across_parties
+
+        self.checks += 1
+        task = asyncio.ensure_future(
+            ocr_executor.run(
+                "promoter",
+                find_promoter_across_parties,
+                image_bytes,
+                parties,
+                statements,
+            )
+        )
+        task.add_done_callback(self._count_result)
+        if not self.running:
+            return await task, None
+
+        done, _ = await asyncio.wait({task}, timeout=self.budget)
+        if done:
+            self.within_budget += 1
+            return task.result(), None
+
+        self.deferred += 1
+        check_id = uuid.uuid4()
+        try:
+            async with self._session_factory() as db:
+                db.add(PromoterCheck(id=check_id, status=PromoterCheckStatus.PENDING))
+                await db.commit()
+        except Exception:
+            logger.warning("Could not record pending promoter check", exc_info=True)
+        follow_up = asyncio.create_task(self._complete(check_id, task))
+        self._tasks.add(follow_up)
+        follow_up.add_done_callback(self._tasks.discard)
+        return None, check_id
+
+    def _count_result(self, task: asyncio.Future) -> None:
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result.get("ocr_skipped"):
+            self.ocr_skipped += 1
+        elif result.get("ocr_cached"):
+            self.ocr_cached += 1
+
+    async def _complete(self, check_id: uuid.UUID, task: asyncio.Future) -> None:
+        values = {}
+        try:
+            result = await task
+        except Exception:
+            logger.warning("Deferred promoter check failed", exc_info=True)
+            self.failed += 1
+            values["status"] = PromoterCheckStatus.FAILED
+        else:
+            self.completed += 1
+            values.update(
+                status=PromoterCheckStatus.COMPLETE,
+                promoter_detected=bool(result.get("found")),
+                promoter_party_name=result.get("party_name"),
+                confidence=result.get("confidence"),
+            )
+        values["completed_at"] = datetime.now(timezone.utc)
+        try:
+            async with self._session_factory() as db:
+                await db.execute(
+                    update(PromoterCheck)
+                    .where(PromoterCheck.id == check_id)
+                    .values(**values)
+                )
+                if (self.completed + self.failed) % 100 == 0:
+                    await db.execute(
+                        delete(PromoterCheck).where(
+                            PromoterCheck.created_at
+                            < datetime.now(timezone.utc) - self.retention
+                        )
+                    )
+                await db.commit()
+        except Exception:
+            logger.exception("Could not record promoter check outcome")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let deferred checks finish (up to ``timeout``), then stop."""
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+        self._session_factory = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "budget_ms": round(self.budget * 1000),
+            "checks": self.checks,
+            "ocr_skipped": self.ocr_skipped,
+            "ocr_cached": self.ocr_cached,
+            "within_budget": self.within_budget,
+            "deferred": self.deferred,
+            "deferred_in_flight": len(self._tasks),
+            "deferred_completed": self.completed,
+            "deferred_failed": self.failed,
+        }
+
+
+promoter_checks = PromoterChecks(
+    budget=settings.PROMOTER_OCR_BUDGET_MS / 1000,
+    retention=timedelta(hours=settings.PROMOTER_CHECK_RETENTION_HOURS),
+)
@@ -0,0 +1,177 @@
+"""
+Process-local index of every registered promoter statement.
+
+OCR promoter detection used to query Party.promoter_statement on each
+unmatched /verify/image and re-lowercase every statement, and ignored the
+statements candidates set for themselves (PartyUser.promoter_statement).
+This index holds both, normalised and packed once into a
+fuzzy_match.StatementSet, so a check sends one prebuilt structure to the
+OCR pool and scans the OCR text once for all of them.
+
+Only active candidates' statements are indexed. Statements are loaded on
+first use, updated in place when this worker sets or clears a party or
+candidate statement, renames a party or (de)activates a candidate, and reloaded
+from the database every PROMOTER_INDEX_REFRESH_SECONDS so changes made by
+other workers are picked up. The StatementSet is only rebuilt when the
+statements actually changed.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.party import Party, PartyUser
+from app.services.fuzzy_match import StatementSet, normalise
+
+logger = logging.getLogger(__name__)
+
+
+class PromoterStatements(NamedTuple):
+    """(party_id, party_name, statement) per statement, and their StatementSet."""
+
+    parties: list[tuple[str, str, str]]
+    statements: StatementSet
+
+
+class PromoterStatementIndex:
+    """Party and candidate promoter statements, prebuilt for OCR matching."""
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        # ("party", party_id) or ("user", user_id) -> (party_id, statement)
+        self._entries: dict[tuple[str, uuid.UUID], tuple[uuid.UUID, str]] = {}
+        self._party_names: dict[uuid.UUID, str] = {}
+        self._snapshot: PromoterStatements | None = None
+        self._loaded = False
+        self._loaded_monotonic = 0.0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.builds = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def reset(self) -> None:
+        """Drop entries and counters; the next snapshot() reloads."""
+        self._entries.clear()
+        self._party_names.clear()
+        self._snapshot = None
+        self._loaded = False
+        self._loaded_monotonic = 0.0
+        self.loads = self.builds = 0
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)read every party and active candidate statement."""
+        parties = await db.execute(
+            select(Party.id, Party.name, Party.promoter_statement)
+        )
+        users = await db.execute(
+            select(
+                PartyUser.id, PartyUser.party_id, PartyUser.promoter_statement
+            ).where(
+                PartyUser.promoter_statement.isnot(None),
+                PartyUser.is_active.is_(True),
+            )
+        )
+        entries = {}
+        party_names = {}
+        for party_id, name, statement in parties.all():
+            party_names[party_id] = name
+            if statement:
+                entries[("party", party_id)] = (party_id, statement)
+        for user_id, party_id, statement in users.all():
+            if statement:
+                entries[("user", user_id)] = (party_id, statement)
+        if entries != self._entries or party_names != self._party_names:
+            self._entries = entries
+            self._party_names = party_names
+            self._snapshot = None
+        self._loaded = True
+        self._loaded_monotonic = time.monotonic()
+        self.loads += 1
+
+    async def snapshot(self, db: AsyncSession) -> PromoterStatements | None:
+        """The prebuilt statements, loading or refreshing them if due.
+
+        None when no statements are registered.
+        """
+        if not self._loaded or (
+            time.monotonic() - self._loaded_monotonic >= self.refresh_seconds
+        ):
+            async with self._lock:
+                if not self._loaded or (
+                    time.monotonic() - self._loaded_monotonic >= self.refresh_seconds
+                ):
+                    await self.load(db)
+        if self._snapshot is None and self._entries:
+            self._snapshot = self._build()
+        return self._snapshot
+
+    def _build(self) -> PromoterStatements:
+        parties = []
+        seen = set()
+        # Party statements first, so a candidate repeating their party's
+        # statement does not displace it
+        for key in sorted(self._entries, key=lambda key: key[0] != "party"):
+            party_id, statement = self._entries[key]
+            normalised = normalise(statement)
+            if not normalised or normalised in seen:
+                continue
+            seen.add(normalised)
+            parties.append(
+                (str(party_id), self._party_names.get(party_id, ""), statement)
+            )
+        self.builds += 1
+        logger.info("Promoter statement index built with %d statements", len(parties))
+        return PromoterStatements(parties, StatementSet([p[2] for p in parties]))
+
+    def _set(
+        self, key: tuple[str, uuid.UUID], party_id: uuid.UUID, statement: str | None
+    ) -> None:
+        if not self._loaded:
+            return  # picked up by the first load
+        if statement:
+            if self._entries.get(key) != (party_id, statement):
+                self._entries[key] = (party_id, statement)
+                self._snapshot = None
+        elif self._entries.pop(key, None) is not None:
+            self._snapshot = None
+
+    def set_party(self, party: Party) -> None:
+        """Apply a party's current name and statement."""
+        if self._loaded and self._party_names.get(party.id) != party.name:
+            self._party_names[party.id] = party.name
+            self._snapshot = None
+        self._set(("party", party.id), party.id, party.promoter_statement)
+
+    def set_user(self, user: PartyUser) -> None:
+        """Apply a candidate's current statement and active flag.
+
+        A cleared statement or a deactivated candidate removes the entry.
+        """
+        statement = user.promoter_statement if user.is_active else None
+        self._set(("user", user.id), user.party_id, statement)
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "statements": len(self._entries),
+            "indexed": len(self._snapshot.parties) if self._snapshot else None,
+            "loads": self.loads,
+            "builds": self.builds,
+        }
+
+
+promoter_index = PromoterStatementIndex(
+    refresh_seconds=settings.PROMOTER_INDEX_REFRESH_SECONDS
+)
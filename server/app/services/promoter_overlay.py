@@ -14,6 +14,7 @@ import textwrap
 from PIL import Image, ImageDraw, ImageFont
 
 from app.core.config import settings
+from app.services.image_context import ImageContext
 
 # Valid positions for the promoter statement overlay
 VALID_POSITIONS = ("top-left", "top-right", "bottom-left", "bottom-right")
@@ -178,7 +179,7 @@ def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[
 
 
 def overlay_promoter_statement(
-    image_bytes: bytes,
+    image: bytes | ImageContext,
     statement: str,
     position: str = "bottom-left",
     font_size: int | None = None,
@@ -189,7 +190,7 @@ def overlay_promoter_statement(
     using a semi-transparent backing rectangle where necessary for legibility.
 
     Args:
-        image_bytes: Original image as bytes.
+        image: Original image as bytes or a decoded ImageContext.
         statement: The promoter statement text to overlay.
         position: Corner placement - one of top-left, top-right,
                   bottom-left, bottom-right.
@@ -201,7 +202,7 @@ def overlay_promoter_statement(
     if position not in VALID_POSITIONS:
         position = "bottom-left"
 
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    img = ImageContext.of(image).rgb
     img_w, img_h = img.size
     orientation = detect_orientation(img)
 
@@ -0,0 +1,251 @@
+"""
+Coalescing of concurrent identical work ("single flight").
+
+When an image goes viral, many concurrent /verify/image requests carry the
+same bytes. SingleFlight lets the first request for a key do the work while
+the others in the same process await its result.
+
+CrossWorkerFlight extends this across the gunicorn workers on one host: the
+work for a key runs under that key's exclusive lock file (so uploads of
+different images never wait for each other), and the result is written
+next to it so workers that were waiting on the lock reuse it instead of
+repeating the decode, registry scan and OCR. Only results written while a
+caller was waiting are reused, so nothing outlives the requests that
+produced it and no invalidation is needed.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Per-process in-flight request coalescing keyed by an arbitrary key."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return ``await fn()``, sharing one call among concurrent callers.
+
+        Followers receive the leader's result or exception. If the leader is
+        cancelled (e.g. its client disconnected) a follower takes over.
+        """
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this follower itself was cancelled
+                # The leader was cancelled: retry, becoming leader if first
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+class CrossWorkerFlight:
+    """Run work for a key once across processes sharing ``directory``.
+
+    Each key has its own lock file, so only requests for the same image
+    wait for each other. Lock and result files older than ``result_ttl``
+    are pruned; file operations run in a thread, off the event loop.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        timeout: float = 30.0,
+        result_ttl: float = 60.0,
+    ):
+        self.directory = directory
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self._writes = 0
+        self.leaders = 0
+        self.shared = 0
+        self.lock_timeouts = 0
+
+    @property
+    def available(self) -> bool:
+        return fcntl is not None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _try_lock(self, key: str) -> int | None:
+        """Take the key's lock without blocking; None if another holds it."""
+        path = self._path(f"{key}.lock")
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        try:
+            # The file may have been pruned (and recreated) since it was
+            # opened; a lock on an unlinked file excludes nobody
+            if os.fstat(fd).st_ino == os.stat(path).st_ino:
+                os.utime(fd)
+                return fd
+        except OSError:
+            pass
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+        return None
+
+    async def _acquire(self, key: str) -> int | None:
+        """Poll for the key's lock; None if the timeout expires."""
+        deadline = time.monotonic() + self.timeout
+        delay = 0.01
+        while True:
+            attempt = asyncio.ensure_future(asyncio.to_thread(self._try_lock, key))
+            try:
+                fd = await asyncio.shield(attempt)
+            except asyncio.CancelledError:
+                # Release the lock if the attempt still takes it
+                attempt.add_done_callback(self._release_attempt)
+                raise
+            if fd is not None:
+                return fd
+            if time.monotonic() >= deadline:
+                self.lock_timeouts += 1
+                return None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+
+    @staticmethod
+    def _release(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def _release_attempt(self, attempt: asyncio.Future) -> None:
+        if not attempt.cancelled() and attempt.exception() is None:
+            if attempt.result() is not None:
+                self._release(attempt.result())
+
+    def _read_result(self, key: str, since: float) -> str | None:
+        path = self._path(f"{key}.json")
+        try:
+            if os.stat(path).st_mtime < since:
+                return None
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_result(self, key: str, data: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self._path(f"{key}.json"))
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+                if entry.name.endswith((".json", ".tmp")):
+                    os.remove(entry.path)
+                elif entry.name.endswith(".lock"):
+                    # Only unlink locks nobody holds, while holding them
+                    fd = os.open(entry.path, os.O_RDWR)
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        os.remove(entry.path)
+                    except BlockingIOError:
+                        pass
+                    finally:
+                        os.close(fd)
+            except OSError:
+                pass
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        dump: Callable[[Any], str],
+        load: Callable[[str], Any],
+    ) -> Any:
+        """Return ``await fn()`` or the result another worker just produced.
+
+        ``key`` must be filename-safe (e.g. a hex digest). Falls back to
+        running ``fn`` unlocked if the lock cannot be taken in time.
+        """
+        waiting_since = time.time()
+        fd = await self._acquire(key)
+        try:
+            shared = await asyncio.to_thread(self._read_result, key, waiting_since)
+            if shared is not None:
+                self.shared += 1
+                return load(shared)
+            self.leaders += 1
+            result = await fn()
+            try:
+                await asyncio.to_thread(self._write_result, key, dump(result))
+            except OSError:
+                logger.warning("Could not write shared verification result")
+            return result
+        finally:
+            if fd is not None:
+                await asyncio.to_thread(self._release, fd)
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "shared": self.shared,
+            "lock_timeouts": self.lock_timeouts,
+        }
+
+
+# Coalescing of /verify/image work keyed by the upload's SHA-256
+verification_flight = SingleFlight()
+verification_worker_flight = CrossWorkerFlight(
+    settings.VERIFY_LOCK_DIR or os.path.join(tempfile.gettempdir(), "pivs-verify"),
+    timeout=settings.VERIFY_LOCK_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,297 @@
+"""
+Asset submission pipeline: derivatives generated and stored concurrently.
+
+submit_asset used to run the OCR check, promoter overlay, hashing, badge,
+QR code and thumbnail as one executor task, then encrypt and await each
+store_blob in turn. Those stages only depend on the upload, so
+run_submission runs them as a small DAG:
+
+    upload -> promoter check (OCR, overlay if missing) -> store promoter
+           -> badge -> store badge
+           -> hashes, thumbnail, QR code -> store thumbnail, QR code
+           -> encrypt -> store original
+
+With SUBMISSION_PARALLEL_STAGES each CPU stage is its own image_executor
+task ("submission.promoter", "submission.badge", "submission.hashes"), so
+a slow OCR check no longer holds up the other stages, and each blob is
+written as soon as its stage finishes. The stages of every submission
+share the "submission.stages" entry of IMAGE_TASK_LIMITS, so submissions
+can never occupy more workers than that. Each task decodes the upload
+itself (an ImageContext cannot cross the process boundary) and holds an
+executor queue slot, trading CPU and queue space for latency. By default
+the stages run as the single process_submission task, and only the
+writes are concurrent.
+
+Only the original is encrypted. The badge is stored as generated, like the
+promoter copy, thumbnail and QR code: it is the file parties download and
+publish, and its SHA-256 is registered as a derivative for exact matching.
+
+If any stage or write fails, the blobs already written are deleted before
+the error is raised. The caller still owns the single database commit and
+calls Submission.discard if it fails, so a failed submission leaves no
+blobs behind. Per-stage timings are kept in submission_stats.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.services.encryption import encrypt_data, encrypt_dek, generate_dek
+from app.services.image_executor import image_executor
+from app.services.image_tasks import (
+    check_promoter,
+    hash_and_preview,
+    process_submission,
+    render_badge,
+)
+from app.services.storage import delete_blob, store_blob
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _StageStats:
+    completed: int = 0
+    failed: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def as_dict(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_ms": round(self.total / finished * 1000, 2) if finished else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class SubmissionStageStats:
+    """Wall time per submission stage, including executor queueing."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._stages: dict[str, _StageStats] = {}
+        self.rollbacks = 0
+
+    @contextmanager
+    def time(self, stage: str):
+        stats = self._stages.setdefault(stage, _StageStats())
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            stats.failed += 1
+            raise
+        else:
+            stats.completed += 1
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "parallel": settings.SUBMISSION_PARALLEL_STAGES,
+            "rollbacks": self.rollbacks,
+            "stages": {name: s.as_dict() for name, s in self._stages.items()},
+        }
+
+
+submission_stats = SubmissionStageStats()
+
+
+@dataclass
+class Submission:
+    """Hashes and OCR result of a submitted image, and its stored blobs."""
+
+    hashes: dict
+    promoter_check: dict | None
+    derivative_hashes: dict
+    storage_key: str
+    encrypted_dek: str
+    nonce: bytes
+    badge_storage_key: str
+    qr_storage_key: str
+    thumbnail_storage_key: str
+    promoter_storage_key: str | None = None
+
+    @property
+    def storage_keys(self) -> list[str]:
+        keys = [
+            self.storage_key,
+            self.badge_storage_key,
+            self.qr_storage_key,
+            self.thumbnail_storage_key,
+        ]
+        if self.promoter_storage_key:
+            keys.append(self.promoter_storage_key)
+        return keys
+
+    async def discard(self) -> None:
+        """Delete the stored blobs (when the asset could not be recorded)."""
+        await _delete_blobs(self.storage_keys)
+
+
+async def _delete_blobs(storage_keys: list[str]) -> None:
+    submission_stats.rollbacks += 1
+    results = await asyncio.gather(
+        *(delete_blob(key) for key in storage_keys), return_exceptions=True
+    )
+    for key, result in zip(storage_keys, results):
+        if isinstance(result, Exception):
+            logger.warning("Could not delete blob %s: %s", key, result)
+
+
+async def run_submission(
+    image_bytes: bytes,
+    verification_id: str,
+    party_short_name: str,
+    badge_position: str | None = None,
+    promoter_statement: str | None = None,
+    promoter_position: str = "bottom-left",
+) -> Submission:
+    """Generate and store an upload's derivatives, and hash it.
+
+    The promoter check (and promoter-stamped copy when the statement is
+    missing) only runs when a promoter statement is given.
+
+    Raises:
+        ExecutorBusy: If the image executor's queue is full.
+        Exception: Any stage or storage error, once written blobs are deleted.
+    """
+    stored: list[str] = []
+
+    if settings.SUBMISSION_PARALLEL_STAGES:
+
+        async def produce(stage: str, fn, *args):
+            with submission_stats.time(stage):
+                return await image_executor.run(f"submission.{stage}", fn, *args)
+
+    else:
+        with submission_stats.time("process"):
+            processed = await image_executor.run(
+                "submission",
+                process_submission,
+                image_bytes,
+                verification_id,
+                party_short_name,
+                badge_position,
+                promoter_statement,
+                promoter_position,
+            )
+        produced = {
+            "promoter": {
+                "promoter_check": processed["promoter_check"],
+                "promoter_bytes": processed["promoter_bytes"],
+                "derivative_hashes": processed["derivative_hashes"].get("promoter"),
+            },
+            "badge": {
+                "badge_bytes": processed["badge_bytes"],
+                "derivative_hashes": processed["derivative_hashes"]["badge"],
+            },
+            "hashes": {
+                "hashes": processed["hashes"],
+                "thumbnail_bytes": processed["thumbnail_bytes"],
+                "qr_bytes": processed["qr_bytes"],
+            },
+        }
+
+        async def produce(stage: str, fn, *args):
+            return produced[stage]
+
+    async def store(data: bytes, prefix: str) -> str:
+        with submission_stats.time("store"):
+            key = await store_blob(data, prefix=prefix)
+        stored.append(key)
+        return key
+
+    async def original():
+        with submission_stats.time("encrypt"):
+            dek = generate_dek()
+            encrypted, nonce = encrypt_data(image_bytes, dek)
+        return await store(encrypted, "assets"), encrypt_dek(dek), nonce
+
+    async def promoter():
+        if not promoter_statement:
+            return None
+        result = await produce(
+            "promoter", check_promoter, image_bytes, promoter_statement, promoter_position
+        )
+        key = None
+        if result["promoter_bytes"] is not None:
+            key = await store(result["promoter_bytes"], "promoter")
+        return result, key
+
+    async def badge():
+        result = await produce(
+            "badge",
+            render_badge,
+            image_bytes,
+            verification_id,
+            party_short_name,
+            badge_position,
+        )
+        return result, await store(result["badge_bytes"], "badges")
+
+    async def previews():
+        result = await produce(
+            "hashes", hash_and_preview, image_bytes, verification_id
+        )
+        # Both writes finish (and are recorded for rollback) before returning
+        keys = await asyncio.gather(
+            store(result["thumbnail_bytes"], "thumbnails"),
+            store(result["qr_bytes"], "qrcodes"),
+            return_exceptions=True,
+        )
+        for key in keys:
+            if isinstance(key, BaseException):
+                raise key
+        return result["hashes"], *keys
+
+    try:
+        # The executor stages are submitted before the original is encrypted
+        # on the event loop
+        results = await asyncio.gather(
+            promoter(),
+            badge(),
+            previews(),
+            original(),
+            return_exceptions=True,
+        )
+    except asyncio.CancelledError:
+        await _delete_blobs(stored)
+        raise
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        if stored:
+            await _delete_blobs(stored)
+        raise errors[0]
+
+    promoter_result, badge_result, previews_result, original_result = results
+    hashes, thumbnail_key, qr_key = previews_result
+    storage_key, encrypted_dek, nonce = original_result
+    badge_data, badge_key = badge_result
+    derivative_hashes = {"badge": badge_data["derivative_hashes"]}
+    submission = Submission(
+        hashes=hashes,
+        promoter_check=None,
+        derivative_hashes=derivative_hashes,
+        storage_key=storage_key,
+        encrypted_dek=encrypted_dek,
+        nonce=nonce,
+        badge_storage_key=badge_key,
+        qr_storage_key=qr_key,
+        thumbnail_storage_key=thumbnail_key,
+    )
+    if promoter_result is not None:
+        promoter_data, submission.promoter_storage_key = promoter_result
+        submission.promoter_check = promoter_data["promoter_check"]
+        if promoter_data["derivative_hashes"] is not None:
+            derivative_hashes["promoter"] = promoter_data["derivative_hashes"]
+    return submission
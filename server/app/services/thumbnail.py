@@ -2,7 +2,7 @@
 
 import io
 
-from PIL import Image
+from app.services.image_context import ImageContext
 
 THUMBNAIL_SIZE = (200, 200)
 THUMBNAIL_FORMAT = "JPEG"
@@ -10,19 +10,18 @@ THUMBNAIL_QUALITY = 85
 
 
 def generate_thumbnail(
-    image_bytes: bytes, size: tuple[int, int] = THUMBNAIL_SIZE
+    image: bytes | ImageContext, size: tuple[int, int] = THUMBNAIL_SIZE
 ) -> bytes:
     """Generate a thumbnail from image bytes.
 
     Args:
-        image_bytes: Original image as bytes.
+        image: Original image as bytes or a decoded ImageContext.
         size: Maximum (width, height) for the thumbnail.
 
     Returns:
         Thumbnail as JPEG bytes.
     """
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    img.thumbnail(size, Image.LANCZOS)
+    img = ImageContext.of(image).thumbnail(size)
     buf = io.BytesIO()
     img.save(buf, format=THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
     return buf.getvalue()
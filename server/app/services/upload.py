@@ -0,0 +1,150 @@
+"""
+Chunked ingestion of uploaded images.
+
+Upload handlers used to ``await file.read()`` the whole upload (up to
+MAX_UPLOAD_SIZE) before checking its size, and trusted the client's
+Content-Type. ingest_upload() instead reads the upload in
+UPLOAD_CHUNK_SIZE chunks:
+
+- the file type is sniffed from the magic bytes of the first chunk, so a
+  non-image is rejected before anything else is read;
+- the declared size (when known) and the running size are checked against
+  the cap, so an oversized file is rejected without hashing or decoding
+  the rest of it;
+- SHA-256 is updated per chunk, so the exact-match tier and the
+  verification cache can answer without the body ever being held in memory.
+
+The cap bounds what a handler reads, not what the server receives: by the
+time a handler runs, Starlette has parsed the whole multipart body into
+its spool (uploads over 1 MB roll over to a temporary file). The request
+body itself is limited by the reverse proxy (client_max_body_size in the
+nginx configs). The bytes are only read into memory by
+IngestedUpload.read() when a handler needs to decode the image.
+"""
+
+import hashlib
+import struct
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+
+class UploadRejected(Exception):
+    """An upload that fails validation; mapped to an HTTP error response."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class EmptyUpload(UploadRejected):
+    def __init__(self):
+        super().__init__(400, "Empty file")
+
+
+RASTER_IMAGE_TYPES = frozenset(
+    {"image/jpeg", "image/png", "image/webp", "image/gif", "image/bmp", "image/tiff"}
+)
+
+# BITMAPCOREHEADER, BITMAPINFOHEADER, the V2/V3 info headers, OS/2 2.x,
+# BITMAPV4HEADER and BITMAPV5HEADER
+_BMP_DIB_HEADER_SIZES = frozenset({12, 40, 52, 56, 64, 108, 124})
+
+
+def _is_bmp(head: bytes) -> bool:
+    """A "BM" file header followed by a known DIB header.
+
+    "BM" alone matches plenty of text, so the DIB header length must be
+    one Windows or OS/2 writes and the pixel data must start after it.
+    """
+    if len(head) < 18 or not head.startswith(b"BM"):
+        return False
+    pixel_offset, dib_size = struct.unpack_from("<II", head, 10)
+    return dib_size in _BMP_DIB_HEADER_SIZES and pixel_offset >= 14 + dib_size
+
+
+def sniff_mime_type(head: bytes) -> str | None:
+    """Identify a file type from its leading bytes; None if unrecognised."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if _is_bmp(head):
+        return "image/bmp"
+    if head.startswith((b"II*\x00", b"MM\x00*")):
+        return "image/tiff"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if text.startswith(b"<svg") or (
+        text.startswith((b"<?xml", b"<!DOCTYPE svg", b"<!--")) and b"<svg" in head
+    ):
+        return "image/svg+xml"
+    return None
+
+
+class IngestedUpload:
+    """A validated upload: its sniffed type, size and SHA-256."""
+
+    def __init__(self, file: UploadFile, mime_type: str, size: int, sha256: str):
+        self._file = file
+        self.mime_type = mime_type
+        self.size = size
+        self.sha256 = sha256
+        self._data: bytes | None = None
+
+    async def read(self) -> bytes:
+        """The upload's bytes, read from the spool on first use."""
+        if self._data is None:
+            await self._file.seek(0)
+            self._data = await self._file.read()
+        return self._data
+
+
+async def ingest_upload(
+    file: UploadFile,
+    allowed_types: set[str] | frozenset[str],
+    max_size: int | None = None,
+    chunk_size: int | None = None,
+) -> IngestedUpload:
+    """Validate and hash ``file`` in chunks.
+
+    Raises UploadRejected (EmptyUpload for an empty file) when the upload is
+    empty, too large or not one of ``allowed_types``.
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    too_large = UploadRejected(
+        413, f"File too large. Maximum size is {max_size // (1024 * 1024)}MB"
+    )
+    if file.size is not None and file.size > max_size:
+        raise too_large
+
+    await file.seek(0)
+    first = await file.read(chunk_size)
+    if not first:
+        raise EmptyUpload()
+    mime_type = sniff_mime_type(first)
+    if mime_type not in allowed_types:
+        raise UploadRejected(
+            400,
+            f"Unsupported file type: {mime_type or file.content_type}. "
+            f"Allowed: {sorted(allowed_types)}",
+        )
+
+    digest = hashlib.sha256(first)
+    size = len(first)
+    while chunk := await file.read(chunk_size):
+        size += len(chunk)
+        if size > max_size:
+            raise too_large
+        digest.update(chunk)
+    if size > max_size:
+        raise too_large
+    return IngestedUpload(file, mime_type, size, digest.hexdigest())
@@ -0,0 +1,111 @@
+"""
+Per-process cache of verification outcomes.
+
+Viral images are verified many times with byte-identical uploads, so the
+finished VerificationResponse is cached, keyed by the upload's SHA-256 for
+/verify/image and by the submitted hash values for /verify/hash. Misses
+(unverified results) are cached too, since those are the expensive ones:
+they run the full perceptual search and OCR.
+
+Entries expire after VERIFICATION_CACHE_TTL_SECONDS and the least recently
+used entry is evicted beyond VERIFICATION_CACHE_SIZE. Any change that can
+alter an outcome (asset registered or revoked, party name or promoter
+statement changed) clears the whole cache in this worker; other workers
+converge within the TTL, as with the PDQ index refresh.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from app.core.config import settings
+from app.schemas.verification import VerificationResponse
+
+
+def image_key(sha256: str) -> tuple:
+    return ("image", sha256)
+
+
+def hash_key(sha256: str | None, pdq: str | None, phash: str | None) -> tuple:
+    return ("hash", sha256, pdq.lower() if pdq else None, phash.lower() if phash else None)
+
+
+class VerificationCache:
+    """Bounded LRU cache with per-entry TTL."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, VerificationResponse]] = (
+            OrderedDict()
+        )
+        # Bumped by clear() so results computed before an invalidation are
+        # not stored after it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> VerificationResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response.model_copy()
+
+    def put(
+        self, key: Hashable, response: VerificationResponse, generation: int
+    ) -> None:
+        """Store ``response`` unless the cache was cleared since ``generation``."""
+        if self.max_size <= 0 or generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response.model_copy())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Invalidate every entry (registry or party data changed)."""
+        self._entries.clear()
+        self.generation += 1
+        self.invalidations += 1
+
+    def reset(self) -> None:
+        """Clear entries and counters."""
+        self.clear()
+        self.hits = self.misses = self.evictions = 0
+        self.expirations = self.invalidations = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+verification_cache = VerificationCache(
+    max_size=settings.VERIFICATION_CACHE_SIZE,
+    ttl_seconds=settings.VERIFICATION_CACHE_TTL_SECONDS,
+)
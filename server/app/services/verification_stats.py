@@ -0,0 +1,48 @@
+"""
+Per-process counters for the tiered verification pipeline.
+
+Verification runs in tiers of increasing cost: an exact SHA-256 lookup,
+then (only on a miss) an image decode with PDQ matching, then the pHash
+fallback. The counters record which tier resolved each request and how
+many image uploads never needed decoding.
+"""
+
+from collections import Counter
+
+# Outcomes recorded by record_tier, cheapest first
+TIERS = ("exact", "pdq", "phash", "none")
+
+
+class VerificationTierStats:
+    """Hit counts per matching tier and decode counts for image uploads."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.tiers: Counter[str] = Counter()
+        self.image_uploads = 0
+        self.decodes = 0
+
+    def record_tier(self, tier: str) -> None:
+        self.tiers[tier] += 1
+
+    def record_upload(self, decoded: bool) -> None:
+        self.image_uploads += 1
+        if decoded:
+            self.decodes += 1
+
+    def stats(self) -> dict:
+        avoided = self.image_uploads - self.decodes
+        return {
+            "tier_hits": {tier: self.tiers[tier] for tier in TIERS},
+            "image_uploads": self.image_uploads,
+            "decodes": self.decodes,
+            "decodes_avoided": avoided,
+            "decode_avoided_ratio": (
+                round(avoided / self.image_uploads, 3) if self.image_uploads else 0.0
+            ),
+        }
+
+
+verification_stats = VerificationTierStats()
@@ -0,0 +1,220 @@
+"""
+Benchmark: pHash -> PDQ cascade matcher vs the previous double scan.
+
+The previous _find_match scanned every active asset with pdq_match() and,
+on a miss, scanned them all again with phash_match(). The cascade prunes
+rows by pHash distance first and reuses those distances for the fallback.
+
+The prune is lossy: a registered image within PDQ_MATCH_THRESHOLD but
+more than PHASH_CASCADE_PRUNE_DISTANCE pHash bits from the query is never
+PDQ-compared. Recall is therefore measured on real hashes of synthetic
+posters and edited copies (re-encoded, resized, cropped, re-lit, stamped,
+rotated, bordered): for each prune bound, the PDQ matches of the full scan
+that the cascade loses. Timing uses a random registry, where pHash
+distances of unrelated images centre on 32 bits.
+
+Run from the server directory:
+    python -m benchmarks.bench_cascade [registry_size] [recall_images]
+"""
+
+import io
+import random
+import sys
+import time
+from collections import Counter
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
+
+from app.core.config import settings
+from app.services.hashing import (
+    PackedPDQIndex,
+    compute_perceptual_hashes,
+    hamming_distance_hex,
+    pdq_match,
+    phash_match,
+)
+
+PRUNE_BOUNDS = (16, 20, 24, 28, 32, 64)
+EDITS = (
+    "jpeg",
+    "resize",
+    "crop",
+    "brightness",
+    "contrast",
+    "stamp",
+    "rotate",
+    "border",
+    "combined",
+)
+
+
+def _flip(value: int, bits: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(bits), count):
+        value ^= 1 << bit
+    return value
+
+
+def _double_scan(registry, pdq_hex, phash_hex):
+    best = None
+    best_distance = 256
+    for key, pdq, _ in registry:
+        is_match, distance = pdq_match(pdq_hex, pdq)
+        if is_match and distance < best_distance:
+            best, best_distance = key, distance
+    if best is not None:
+        return best
+    best_distance = 64
+    for key, _, phash in registry:
+        is_match, distance = phash_match(phash_hex, phash)
+        if is_match and distance < best_distance:
+            best, best_distance = key, distance
+    return best
+
+
+def _encode(img: Image.Image, format: str = "PNG", quality: int = 90) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=format, quality=quality)
+    return buf.getvalue()
+
+
+def _poster(rng: random.Random) -> Image.Image:
+    w, h = rng.choice([(800, 600), (600, 800), (700, 700)])
+    img = Image.new("RGB", (w, h), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(rng.randint(5, 30)):
+        x, y, r = rng.randrange(w), rng.randrange(h), rng.randrange(20, w // 3)
+        shape = draw.ellipse if rng.random() < 0.5 else draw.rectangle
+        fill = tuple(rng.randrange(256) for _ in range(3))
+        shape([x - r, y - r, x + r, y + r], fill=fill)
+    if rng.random() < 0.5:
+        img = img.filter(ImageFilter.GaussianBlur(rng.uniform(0, 4)))
+    return img
+
+
+def _edit(img: Image.Image, edit: str, rng: random.Random) -> bytes:
+    w, h = img.size
+    if edit == "jpeg":
+        return _encode(img, "JPEG", rng.randint(20, 60))
+    if edit == "resize":
+        return _encode(img.resize((w // 3, h // 3)))
+    if edit == "crop":
+        m = rng.uniform(0.03, 0.1)
+        box = (int(w * m), int(h * m), int(w * (1 - m)), int(h * (1 - m)))
+        return _encode(img.crop(box))
+    if edit == "brightness":
+        return _encode(ImageEnhance.Brightness(img).enhance(rng.uniform(0.6, 1.4)))
+    if edit == "contrast":
+        return _encode(ImageEnhance.Contrast(img).enhance(rng.uniform(0.6, 1.5)))
+    if edit == "stamp":
+        img = img.copy()
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([0, int(h * 0.85), w // 2, h], fill="white")
+        draw.text((5, int(h * 0.87)), "Authorised by J. Smith", fill="black")
+        return _encode(img)
+    if edit == "rotate":
+        return _encode(img.rotate(rng.uniform(-4, 4), fillcolor="white"))
+    if edit == "border":
+        framed = Image.new("RGB", (int(w * 1.1), int(h * 1.1)), "white")
+        framed.paste(img, (int(w * 0.05), int(h * 0.05)))
+        return _encode(framed)
+    smaller = ImageEnhance.Brightness(img.resize((w // 2, h // 2))).enhance(1.2)
+    return _encode(smaller, "JPEG", 40)
+
+
+def recall(images: int = 60) -> None:
+    """PDQ matches of the full scan lost by the cascade, per prune bound."""
+    rng = random.Random(3)
+    index = PackedPDQIndex()
+    phashes = []
+    queries = []
+    for i in range(images):
+        poster = _poster(rng)
+        hashes = compute_perceptual_hashes(_encode(poster))
+        index.add(i, hashes["pdq_hash"], hashes["phash"])
+        phashes.append(hashes["phash"])
+        for edit in EDITS:
+            copy = compute_perceptual_hashes(_edit(poster, edit, rng))
+            queries.append((i, edit, copy["pdq_hash"], copy["phash"]))
+
+    pdq_threshold = settings.PDQ_MATCH_THRESHOLD
+    phash_threshold = settings.PHASH_MATCH_THRESHOLD
+    full = {}
+    for i, edit, pdq, phash in queries:
+        match = index.match(pdq, phash, pdq_threshold, phash_threshold, 64)
+        if match is not None and match.pdq_distance is not None:
+            full[(i, edit)] = match.key
+    print(f"edited copies:         {len(queries)}")
+    print(f"full-scan PDQ matches: {len(full)}")
+    widest = max(
+        hamming_distance_hex(phash, phashes[full[(i, edit)]])
+        for i, edit, _, phash in queries
+        if (i, edit) in full
+    )
+    print(f"max pHash distance:    {widest} (among the full-scan PDQ matches)")
+    for bound in PRUNE_BOUNDS:
+        lost = Counter()
+        for i, edit, pdq, phash in queries:
+            if (i, edit) not in full:
+                continue
+            match = index.match(pdq, phash, pdq_threshold, phash_threshold, bound)
+            if match is None or match.pdq_distance is None:
+                lost[edit] += 1
+            elif match.key != full[(i, edit)]:
+                lost[edit] += 1
+        total = sum(lost.values())
+        detail = ", ".join(f"{edit} {n}" for edit, n in lost.most_common())
+        print(
+            f"prune {bound:2d}: recall {1 - total / len(full):.4f} "
+            f"({total} lost{': ' + detail if detail else ''})"
+        )
+
+
+def main(size: int = 20000, queries: int = 200) -> None:
+    rng = random.Random(7)
+    registry = [
+        (i, format(rng.getrandbits(256), "064x"), format(rng.getrandbits(64), "016x"))
+        for i in range(size)
+    ]
+    index = PackedPDQIndex()
+    for key, pdq, phash in registry:
+        index.add(key, pdq, phash)
+
+    # Half the queries are near-duplicates of registered assets, half misses
+    workload = []
+    for q in range(queries):
+        if q % 2 == 0:
+            _, pdq, phash = rng.choice(registry)
+            pdq = format(_flip(int(pdq, 16), 256, rng.randint(0, 20), rng), "064x")
+            phash = format(_flip(int(phash, 16), 64, rng.randint(0, 6), rng), "016x")
+        else:
+            pdq = format(rng.getrandbits(256), "064x")
+            phash = format(rng.getrandbits(64), "016x")
+        workload.append((pdq, phash))
+
+    prune = settings.PHASH_CASCADE_PRUNE_DISTANCE
+    survivors = 0
+    start = time.perf_counter()
+    for pdq, phash in workload:
+        index.match(
+            pdq, phash, settings.PDQ_MATCH_THRESHOLD, settings.PHASH_MATCH_THRESHOLD, prune
+        )
+        survivors += index.last_survivors
+    cascade_ms = (time.perf_counter() - start) * 1000 / len(workload)
+
+    scan_queries = workload[: max(1, len(workload) // 10)]
+    start = time.perf_counter()
+    for pdq, phash in scan_queries:
+        _double_scan(registry, pdq, phash)
+    scan_ms = (time.perf_counter() - start) * 1000 / len(scan_queries)
+
+    print(f"registry size:         {size}")
+    print(f"prune distance:        {prune}")
+    print(f"pruning ratio:         {1 - survivors / (size * len(workload)):.4f}")
+    print(f"cascade per query:     {cascade_ms:.3f} ms")
+    print(f"double scan per query: {scan_ms:.3f} ms")
+    print(f"speedup:               {scan_ms / cascade_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
+    recall(int(sys.argv[2]) if len(sys.argv) > 2 else 60)
@@ -0,0 +1,112 @@
+"""
+Benchmark: promoter statement fuzzy matching, sliding window vs Myers search.
+
+The previous ocr._best_substring_match scored every window of 40 lengths at
+every offset with SequenceMatcher.ratio(), once per party statement. The
+new matcher locates candidates for all statements in one bit-parallel
+edit-distance scan and scores only the windows around them.
+
+Synthetic OCR text is generated from poster-like words with a noisy copy
+of one statement embedded; both matchers are timed on the same inputs and
+their ratios compared.
+
+Run from the server directory:
+    python -m benchmarks.bench_fuzzy_match [text_words] [samples]
+"""
+
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+
+from app.core.config import settings
+from app.services.fuzzy_match import best_substring_matches
+
+WORDS = (
+    "vote for change on election day the party will build better roads "
+    "schools hospitals and homes for every new zealander enrol now"
+).split()
+
+STATEMENTS = [
+    "Authorised by J. Smith, 12 Main Street, Wellington",
+    "Promoted by A. Brown, Level 2, 1 Cuba Street, Wellington",
+    "Authorised by R. Jones, PO Box 123, Auckland",
+    "Authorised by M. Taylor, 50 Victoria Street, Hamilton",
+    "Promoted by K. Wilson, 8 George Street, Dunedin",
+    "Authorised by P. Ngata, 4 Marine Parade, Napier",
+    "Authorised by S. Lee, 77 Queen Street, Auckland",
+    "Promoted by T. Walker, 9 Riccarton Road, Christchurch",
+    "Authorised by H. King, 15 Devon Street, New Plymouth",
+]
+
+
+def _sliding_window(text: str, target: str) -> tuple[str, float]:
+    """The previous implementation, for comparison."""
+    text_lower = text.lower()
+    target_lower = target.lower()
+    if target_lower in text_lower:
+        return target, 1.0
+    target_len = len(target_lower)
+    best_match = ""
+    best_ratio = 0.0
+    for window_size in range(max(1, target_len - 20), target_len + 20):
+        if window_size > len(text_lower):
+            continue
+        for start in range(0, len(text_lower) - window_size + 1):
+            window = text_lower[start : start + window_size]
+            ratio = SequenceMatcher(None, window, target_lower).ratio()
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best_match = text[start : start + window_size]
+    return best_match, best_ratio
+
+
+def _ocr_noise(text: str, rng: random.Random) -> str:
+    out = []
+    for char in text:
+        r = rng.random()
+        if r < 0.04:
+            continue  # dropped character
+        if r < 0.08:
+            out.append(rng.choice("il1|.,o0 "))  # misread
+        elif r < 0.10:
+            out.extend((char, rng.choice("'. ")))  # speck
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def main(text_words: int = 60, samples: int = 5) -> None:
+    rng = random.Random(7)
+    threshold = settings.PROMOTER_OCR_MATCH_THRESHOLD
+    old_time = new_time = 0.0
+    max_gap = 0.0
+    disagreements = 0
+    for _ in range(samples):
+        body = " ".join(rng.choice(WORDS) for _ in range(text_words))
+        planted = rng.choice(STATEMENTS)
+        cut = len(body) // 2
+        text = f"{body[:cut]}\n{_ocr_noise(planted, rng)}\n{body[cut:]}"
+
+        start = time.perf_counter()
+        old = [_sliding_window(text, s)[1] for s in STATEMENTS]
+        old_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = [ratio for _, ratio in best_substring_matches(text, STATEMENTS)]
+        new_time += time.perf_counter() - start
+
+        for o, n in zip(old, new):
+            max_gap = max(max_gap, abs(o - n))
+            disagreements += (o >= threshold) != (n >= threshold)
+
+    print(f"OCR text length:         ~{len(text)} chars, {len(STATEMENTS)} statements")
+    print(f"sliding window / sample: {old_time / samples * 1000:.1f} ms")
+    print(f"Myers search / sample:   {new_time / samples * 1000:.2f} ms")
+    print(f"speedup:                 {old_time / new_time:.0f}x")
+    print(f"max ratio difference:    {max_gap:.3f}")
+    print(f"threshold disagreements: {disagreements} of {samples * len(STATEMENTS)}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,86 @@
+"""
+Benchmark: offline IP-range geolocation load time and lookup throughput.
+
+Generates a GeoLite2-sized table of non-overlapping IPv4 ranges, loads it
+with IPRangeDatabase.load_csv() and measures bisect lookups with and
+without the LRU cache in front.
+
+Run from the server directory:
+    python -m benchmarks.bench_geolocation [ranges]
+"""
+
+import csv
+import ipaddress
+import os
+import random
+import sys
+import tempfile
+import time
+
+from app.services.geolocation import UNKNOWN, IPRangeDatabase, LRUCache
+
+REGIONS = ["Auckland", "Wellington", "Canterbury", "Otago", "Waikato"]
+
+
+def _write_table(path: str, ranges: int, rng: random.Random) -> list[int]:
+    starts = sorted(rng.sample(range(1 << 24, (224 << 24) - 256), ranges))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["start_ip", "end_ip", "country_code", "region", "country_name"])
+        previous_end = -1
+        for start in starts:
+            start = max(start, previous_end + 1)
+            end = start + rng.randint(0, 255)
+            previous_end = end
+            if rng.random() < 0.7:
+                row = ["NZ", rng.choice(REGIONS), "New Zealand"]
+            else:
+                row = ["AU", "", "Australia"]
+            writer.writerow(
+                [str(ipaddress.IPv4Address(start)), str(ipaddress.IPv4Address(end)), *row]
+            )
+    return starts
+
+
+def main(ranges: int = 300000, queries: int = 200000) -> None:
+    rng = random.Random(7)
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        starts = _write_table(path, ranges, rng)
+        start = time.perf_counter()
+        db = IPRangeDatabase.load_csv(path)
+        load_s = time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+    # Most lookups fall inside a range; a few miss
+    workload = [
+        str(ipaddress.IPv4Address(rng.choice(starts) + rng.randint(0, 300)))
+        for _ in range(queries)
+    ]
+
+    start = time.perf_counter()
+    for ip in workload:
+        db.lookup(ip)
+    bisect_s = time.perf_counter() - start
+
+    # Repeat traffic from a small set of clients, as during a viral spike
+    hot = rng.sample(workload, 1000)
+    hot_workload = [rng.choice(hot) for _ in range(queries)]
+    cache = LRUCache(max_size=10000)
+    start = time.perf_counter()
+    for ip in hot_workload:
+        if cache.get(ip) is None:
+            cache.put(ip, db.lookup(ip) or UNKNOWN)
+    cached_s = time.perf_counter() - start
+
+    print(f"ranges:                 {len(db)}")
+    print(f"load time:              {load_s:.2f} s")
+    print(f"bisect lookups/sec:     {queries / bisect_s:,.0f}")
+    print(f"hot LRU lookups/sec:    {queries / cached_s:,.0f}")
+    print(f"hot LRU hit ratio:      {cache.hits / queries:.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300000)
@@ -0,0 +1,92 @@
+"""
+Benchmark: OCR throughput of the pytesseract and engine-pool backends.
+
+pytesseract starts a tesseract process per image, writes the image to a
+temporary file and reloads the traineddata; TesseractEnginePool keeps
+engines loaded and passes images in memory. Both OCR the same
+preprocessed promoter-statement bands (rendered by promoter_overlay) from
+``threads`` threads, as the OCR executor would in thread mode, and the
+texts they return are compared.
+
+Needs the tesseract binary (pytesseract) and tesserocr installed.
+
+Run from the server directory:
+    python -m benchmarks.bench_ocr_backends [images] [threads]
+"""
+
+import io
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services import ocr
+from app.services.image_context import ImageContext
+from app.services.promoter_overlay import VALID_POSITIONS, overlay_promoter_statement
+
+STATEMENTS = [
+    "Authorised by J. Smith, 12 Main Street, Wellington",
+    "Promoted by A. Brown, Level 2, 1 Cuba Street, Wellington",
+    "Authorised by R. Jones, PO Box 123, Auckland",
+]
+
+
+def _bands(count: int) -> list[Image.Image]:
+    bands = []
+    for i in range(count):
+        buf = io.BytesIO()
+        Image.new("RGB", (1600, 1000), (40, 110, 60)).save(buf, format="PNG")
+        position = VALID_POSITIONS[i % len(VALID_POSITIONS)]
+        poster = overlay_promoter_statement(
+            buf.getvalue(), STATEMENTS[i % len(STATEMENTS)], position=position
+        )
+        bands.extend(
+            band
+            for name, band in ocr._band_images(ImageContext(poster))
+            if name == position
+        )
+    return bands
+
+
+def _throughput(
+    backend: ocr.OcrBackend, bands: list[Image.Image], threads: int
+) -> tuple[float, list[str]]:
+    backend.image_to_string(bands[0])  # warm up (engine load)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        texts = list(pool.map(backend.image_to_string, bands))
+    return len(bands) / (time.perf_counter() - start), texts
+
+
+def main(images: int = 40, threads: int = 2) -> None:
+    if ocr.pytesseract is None or not shutil.which("tesseract"):
+        print("tesseract is not installed; nothing to compare")
+        return
+    if ocr.tesserocr is None:
+        print("tesserocr is not installed; nothing to compare")
+        return
+
+    settings.OCR_ENGINE_POOL_SIZE = threads
+    bands = _bands(images)
+    pool = ocr.create_backend("tesserocr")
+    try:
+        old = ocr.create_backend("pytesseract")
+        old_rate, old_texts = _throughput(old, bands, threads)
+        new_rate, new_texts = _throughput(pool, bands, threads)
+    finally:
+        pool.close()
+
+    same = sum(a.strip() == b.strip() for a, b in zip(old_texts, new_texts))
+    print(f"bands:             {len(bands)}, threads: {threads}")
+    print(f"pytesseract:       {old_rate:.1f} images/s")
+    print(f"engine pool:       {new_rate:.1f} images/s")
+    print(f"speedup:           {new_rate / old_rate:.1f}x")
+    print(f"identical texts:   {same} of {len(bands)}")
+    print(f"pool stats:        {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
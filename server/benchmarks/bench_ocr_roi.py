@@ -0,0 +1,102 @@
+"""
+Benchmark: region-of-interest promoter OCR vs full-image OCR.
+
+Posters are stamped by promoter_overlay with a statement in each corner in
+turn. For each, the full-image path (preprocess + Tesseract over every
+pixel) is compared with the ROI path (bands in priority order until one
+matches). Tesseract's run time grows with the pixels it reads, so those
+are reported next to the timings. Without Tesseract installed, a
+stand-in "reads" the statement from the band that holds it, and only the
+cropping, scaling and enhancement are timed.
+
+Run from the server directory:
+    python -m benchmarks.bench_ocr_roi [width] [height] [repeats]
+"""
+
+import io
+import shutil
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.services import ocr
+from app.services.image_context import ImageContext
+from app.services.promoter_overlay import VALID_POSITIONS, overlay_promoter_statement
+
+STATEMENT = "Authorised by J. Smith, 12 Main Street, Wellington"
+
+
+class _Tesseract:
+    """Counts the pixels sent to Tesseract; stands in when it is missing."""
+
+    def __init__(self, run):
+        self.run = run
+        self.pixels = 0
+        self.calls = 0
+        self.statement_at = 0  # call that "reads" the statement (stand-in)
+
+    def __call__(self, image: Image.Image) -> str:
+        self.pixels += image.width * image.height
+        self.calls += 1
+        if self.run is not None:
+            return self.run(image)
+        return STATEMENT if self.calls == self.statement_at else ""
+
+
+def _poster(width: int, height: int, position: str) -> bytes:
+    img = Image.new("RGB", (width, height), (30, 90, 160))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, width, 40):
+        draw.line([(x, 0), (width - x, height)], fill=(200, 60, 60), width=3)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return overlay_promoter_statement(buf.getvalue(), STATEMENT, position=position)
+
+
+def _run(
+    tesseract: _Tesseract, poster: bytes, roi: bool, statement_at: int, repeats: int
+) -> tuple[float, float]:
+    """Mean (seconds, pixels OCR'd) per check."""
+    settings.OCR_ROI_ENABLED = roi
+    elapsed = 0.0
+    tesseract.pixels = 0
+    for _ in range(repeats):
+        image = ImageContext(poster)
+        image.gray  # decoded once either way; not part of the comparison
+        tesseract.calls = 0
+        tesseract.statement_at = statement_at
+        start = time.perf_counter()
+        ocr.find_promoter_statement(image, STATEMENT)
+        elapsed += time.perf_counter() - start
+    return elapsed / repeats, tesseract.pixels / repeats
+
+
+def main(width: int = 3000, height: int = 2000, repeats: int = 3) -> None:
+    real = ocr._run_tesseract
+    installed = ocr.pytesseract is not None and shutil.which("tesseract")
+    tesseract = _Tesseract(real if installed else None)
+    bands = [name for name, _ in ocr.ROI_BANDS["landscape"]]
+    saved = settings.OCR_ROI_ENABLED
+    ocr._run_tesseract = tesseract
+    try:
+        print(f"poster: {width}x{height}, Tesseract: {tesseract.run is not None}")
+        for position in VALID_POSITIONS:
+            poster = _poster(width, height, position)
+            full_time, full_pixels = _run(tesseract, poster, False, 1, repeats)
+            roi_time, roi_pixels = _run(
+                tesseract, poster, True, bands.index(position) + 1, repeats
+            )
+            print(
+                f"{position + ':':<14} full {full_time * 1000:7.1f} ms "
+                f"{full_pixels / 1e6:5.2f} MP | roi {roi_time * 1000:7.1f} ms "
+                f"{roi_pixels / 1e6:5.2f} MP ({roi_pixels / full_pixels:.0%} of pixels)"
+            )
+    finally:
+        ocr._run_tesseract = real
+        settings.OCR_ROI_ENABLED = saved
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,87 @@
+"""
+Benchmark: parallel submission stages vs the single process_submission task.
+
+Submits the same poster ``repeats`` times through run_submission, with
+SUBMISSION_PARALLEL_STAGES off (one executor task, one decode, blobs
+written concurrently afterwards) and on (each stage its own task, each
+blob written when its stage finishes), and prints the mean latency and the
+per-stage timings from submission_stats. Blobs go to a temporary
+directory. The image executor runs as configured (IMAGE_EXECUTOR_MODE,
+IMAGE_EXECUTOR_WORKERS), with the "submission.stages" limit raised to the
+worker count for the parallel run. Stages only overlap with more than one
+worker and CPU core, and on a single core the parallel path is slower, as
+each stage decodes the upload. Without Tesseract the OCR check fails fast and the
+statement is stamped.
+
+Run from the server directory:
+    python -m benchmarks.bench_submission [width] [height] [repeats]
+"""
+
+import asyncio
+import io
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.services.image_executor import image_executor
+from app.services.submission import run_submission, submission_stats
+
+STATEMENT = "Authorised by J. Smith, 12 Main Street, Wellington"
+
+
+def _poster(width: int, height: int) -> bytes:
+    img = Image.new("RGB", (width, height), (30, 90, 160))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, width, 40):
+        draw.line([(x, 0), (width - x, height)], fill=(200, 60, 60), width=3)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+async def _run(poster: bytes, parallel: bool, repeats: int) -> float:
+    """Mean seconds per submission."""
+    settings.SUBMISSION_PARALLEL_STAGES = parallel
+    image_executor.limits["submission.stages"] = image_executor.workers
+    # Warm the pool so worker start-up is not timed
+    await run_submission(poster, "warmup", "Labour", None, STATEMENT)
+    submission_stats.reset()
+    start = time.perf_counter()
+    for i in range(repeats):
+        await run_submission(poster, f"bench{i}", "Labour", None, STATEMENT)
+    return (time.perf_counter() - start) / repeats
+
+
+async def _main(width: int, height: int, repeats: int) -> None:
+    poster = _poster(width, height)
+    print(
+        f"poster: {width}x{height}, executor: {image_executor.mode} "
+        f"x{image_executor.workers}"
+    )
+    for parallel in (False, True):
+        elapsed = await _run(poster, parallel, repeats)
+        label = "parallel" if parallel else "single"
+        print(f"{label + ':':<10} {elapsed * 1000:8.1f} ms per submission")
+        for stage, stats in submission_stats.stats()["stages"].items():
+            print(
+                f"    {stage + ':':<11} avg {stats['avg_ms']:8.1f} ms "
+                f"max {stats['max_ms']:8.1f} ms ({stats['completed']} runs)"
+            )
+
+
+def main(width: int = 3000, height: int = 2000, repeats: int = 5) -> None:
+    saved = settings.LOCAL_STORAGE_PATH, settings.SUBMISSION_PARALLEL_STAGES
+    try:
+        with tempfile.TemporaryDirectory() as storage:
+            settings.LOCAL_STORAGE_PATH = storage
+            asyncio.run(_main(width, height, repeats))
+    finally:
+        settings.LOCAL_STORAGE_PATH, settings.SUBMISSION_PARALLEL_STAGES = saved
+        image_executor.shutdown()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,13 @@
+-- Migration 004: Binary copies of the perceptual hashes for database-side matching
+-- Run against the pivs-db PostgreSQL database (bit_count requires PostgreSQL 14+)
+
+-- 1. Add the binary hash columns
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_hash_bin BYTEA;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS phash_int BIGINT;
+
+-- 2. Backfill existing rows from the hex columns
+UPDATE assets SET pdq_hash_bin = decode(pdq_hash, 'hex')
+WHERE pdq_hash_bin IS NULL;
+
+UPDATE assets SET phash_int = ('x' || lpad(phash, 16, '0'))::bit(64)::bigint
+WHERE phash_int IS NULL;
@@ -0,0 +1,58 @@
+-- Migration 005: Indexed 16-bit PDQ band columns for LSH candidate lookup
+-- Run against the pivs-db PostgreSQL database
+
+-- 1. Add one INTEGER column per 16-bit band (band 00 = most significant bits)
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_00 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_01 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_02 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_03 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_04 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_05 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_06 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_07 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_08 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_09 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_10 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_11 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_12 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_13 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_14 INTEGER;
+ALTER TABLE assets ADD COLUMN IF NOT EXISTS pdq_band_15 INTEGER;
+
+-- 2. Backfill from the hex PDQ hash (4 hex chars per band)
+UPDATE assets SET
+    pdq_band_00 = ('x' || substr(pdq_hash, 1, 4))::bit(16)::int,
+    pdq_band_01 = ('x' || substr(pdq_hash, 5, 4))::bit(16)::int,
+    pdq_band_02 = ('x' || substr(pdq_hash, 9, 4))::bit(16)::int,
+    pdq_band_03 = ('x' || substr(pdq_hash, 13, 4))::bit(16)::int,
+    pdq_band_04 = ('x' || substr(pdq_hash, 17, 4))::bit(16)::int,
+    pdq_band_05 = ('x' || substr(pdq_hash, 21, 4))::bit(16)::int,
+    pdq_band_06 = ('x' || substr(pdq_hash, 25, 4))::bit(16)::int,
+    pdq_band_07 = ('x' || substr(pdq_hash, 29, 4))::bit(16)::int,
+    pdq_band_08 = ('x' || substr(pdq_hash, 33, 4))::bit(16)::int,
+    pdq_band_09 = ('x' || substr(pdq_hash, 37, 4))::bit(16)::int,
+    pdq_band_10 = ('x' || substr(pdq_hash, 41, 4))::bit(16)::int,
+    pdq_band_11 = ('x' || substr(pdq_hash, 45, 4))::bit(16)::int,
+    pdq_band_12 = ('x' || substr(pdq_hash, 49, 4))::bit(16)::int,
+    pdq_band_13 = ('x' || substr(pdq_hash, 53, 4))::bit(16)::int,
+    pdq_band_14 = ('x' || substr(pdq_hash, 57, 4))::bit(16)::int,
+    pdq_band_15 = ('x' || substr(pdq_hash, 61, 4))::bit(16)::int
+WHERE pdq_band_00 IS NULL;
+
+-- 3. One btree index per band
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_00 ON assets (pdq_band_00);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_01 ON assets (pdq_band_01);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_02 ON assets (pdq_band_02);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_03 ON assets (pdq_band_03);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_04 ON assets (pdq_band_04);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_05 ON assets (pdq_band_05);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_06 ON assets (pdq_band_06);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_07 ON assets (pdq_band_07);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_08 ON assets (pdq_band_08);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_09 ON assets (pdq_band_09);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_10 ON assets (pdq_band_10);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_11 ON assets (pdq_band_11);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_12 ON assets (pdq_band_12);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_13 ON assets (pdq_band_13);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_14 ON assets (pdq_band_14);
+CREATE INDEX IF NOT EXISTS ix_assets_pdq_band_15 ON assets (pdq_band_15);
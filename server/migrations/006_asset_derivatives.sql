@@ -0,0 +1,19 @@
+-- Migration 006: Derivative hashes for exact matching of distributed files
+-- Run against the pivs-db PostgreSQL database
+
+-- 1. One row per generated version (badge, promoter-stamped) of an asset
+CREATE TABLE IF NOT EXISTS asset_derivatives (
+    id UUID PRIMARY KEY,
+    asset_id UUID NOT NULL REFERENCES assets(id),
+    kind VARCHAR(20) NOT NULL,
+    sha256_hash VARCHAR(64) NOT NULL,
+    pdq_hash VARCHAR(64),
+    created_at TIMESTAMP WITH TIME ZONE
+);
+
+-- 2. Indexes for the exact-match lookup and per-asset listing
+CREATE INDEX IF NOT EXISTS ix_asset_derivatives_sha256_hash ON asset_derivatives (sha256_hash);
+CREATE INDEX IF NOT EXISTS ix_asset_derivatives_asset_id ON asset_derivatives (asset_id);
+
+-- Existing assets have no derivative rows; their badge and promoter files
+-- are still matched perceptually until re-submitted.
@@ -0,0 +1,21 @@
+-- Migration 007: Deferred OCR promoter-statement checks
+-- Run against the pivs-db PostgreSQL database
+
+-- 1. Status enum and one row per check deferred past the response
+DO $$ BEGIN
+    CREATE TYPE promotercheckstatus AS ENUM ('PENDING', 'COMPLETE', 'FAILED');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE TABLE IF NOT EXISTS promoter_checks (
+    id UUID PRIMARY KEY,
+    status promotercheckstatus NOT NULL,
+    promoter_detected BOOLEAN,
+    promoter_party_name VARCHAR(255),
+    confidence DOUBLE PRECISION,
+    created_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- 2. For pruning old checks
+CREATE INDEX IF NOT EXISTS ix_promoter_checks_created_at ON promoter_checks (created_at);
@@ -29,7 +29,12 @@ from app.core.auth import create_access_token, hash_password
 from app.core.database import Base, get_db
 from app.main import app
 from app.models.party import Party, PartyUser, PartyStatus, UserRole
+from app.services.asset_metadata import asset_metadata
 from app.services.encryption import encrypt_string
+from app.services.ocr_cache import ocr_cache
+from app.services.pdq_index import pdq_index
+from app.services.promoter_index import promoter_index
+from app.services.verification_cache import verification_cache
 
 TEST_DB_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -53,6 +58,11 @@ async def setup_db():
     """Create tables before each test, drop after."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    pdq_index.reset()
+    verification_cache.reset()
+    asset_metadata.reset()
+    promoter_index.reset()
+    ocr_cache.reset()
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -71,6 +71,32 @@ class TestVerifyImage:
         assert data["confidence"] == 1.0
         assert data["party"]["short_name"] == "Labour"
 
+    @pytest.mark.asyncio
+    async def test_exact_match_skips_decode(
+        self, client: AsyncClient, db_session: AsyncSession, sample_party, admin_user,
+        monkeypatch,
+    ):
+        """An exact re-upload is resolved by SHA-256 without perceptual hashing."""
+        from app.api import verification
+        from app.services.verification_stats import verification_stats
+
+        img = create_test_image(color="teal")
+        await _insert_test_asset(db_session, sample_party, admin_user.id, img)
+        verification_stats.reset()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("perceptual hashes computed on an exact hit")
+
+        monkeypatch.setattr(verification, "compute_perceptual_hashes", fail)
+        resp = await client.post(
+            "/api/v1/verify/image",
+            files={"file": ("test.png", img, "image/png")},
+        )
+        assert resp.json()["match_type"] == "exact"
+        stats = verification_stats.stats()
+        assert stats["tier_hits"]["exact"] == 1
+        assert stats["decodes_avoided"] == 1
+
     @pytest.mark.asyncio
     async def test_verify_resized_image_perceptual_match(
         self, client: AsyncClient, db_session: AsyncSession, sample_party, admin_user
@@ -98,6 +124,69 @@ class TestVerifyImage:
         assert data["verified"] is True
         assert data["match_type"] in ("exact", "perceptual")
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["database", "bands"])
+    async def test_perceptual_match_database_backends(
+        self, client: AsyncClient, db_session: AsyncSession, sample_party, admin_user,
+        monkeypatch, backend,
+    ):
+        from PIL import Image as PILImage
+
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "PDQ_MATCH_BACKEND", backend)
+        original = create_test_image(width=400, height=400, color="green")
+        await _insert_test_asset(db_session, sample_party, admin_user.id, original)
+
+        img = PILImage.open(io.BytesIO(original)).resize((200, 200), PILImage.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+
+        resp = await client.post(
+            "/api/v1/verify/image",
+            files={"file": ("resized.png", buf.getvalue(), "image/png")},
+        )
+        data = resp.json()
+        assert data["verified"] is True
+        assert data["match_type"] == "perceptual"
+
+    @pytest.mark.asyncio
+    async def test_revoked_asset_no_longer_matches(
+        self, client: AsyncClient, auth_headers: dict, sample_party
+    ):
+        """Revoking an asset removes it from the perceptual index."""
+        from PIL import Image as PILImage
+
+        original = create_test_image(width=400, height=400, color="orange")
+        submit = await client.post(
+            "/api/v1/assets",
+            files={"file": ("orig.png", original, "image/png")},
+            headers=auth_headers,
+        )
+        asset_id = submit.json()["id"]
+
+        img = PILImage.open(io.BytesIO(original)).resize((200, 200), PILImage.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        resized_bytes = buf.getvalue()
+
+        resp = await client.post(
+            "/api/v1/verify/image",
+            files={"file": ("resized.png", resized_bytes, "image/png")},
+        )
+        assert resp.json()["verified"] is True
+
+        await client.patch(
+            f"/api/v1/assets/{asset_id}",
+            json={"status": "revoked"},
+            headers=auth_headers,
+        )
+        resp = await client.post(
+            "/api/v1/verify/image",
+            files={"file": ("resized.png", resized_bytes, "image/png")},
+        )
+        assert resp.json()["verified"] is False
+
 
 class TestVerifyById:
     @pytest.mark.asyncio
@@ -145,6 +234,66 @@ class TestVerifyHash:
         assert data["verified"] is True
         assert data["match_type"] == "exact"
 
+    @pytest.mark.asyncio
+    async def test_badge_derivative_matches_exactly(
+        self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict,
+        sample_party,
+    ):
+        """The generated badge file is registered for exact matching."""
+        from sqlalchemy import select
+
+        from app.models.asset import AssetDerivative
+
+        img = create_test_image(color="navy")
+        resp = await client.post(
+            "/api/v1/assets",
+            files={"file": ("campaign.png", img, "image/png")},
+            headers=auth_headers,
+        )
+        asset_id = uuid.UUID(resp.json()["id"])
+        result = await db_session.execute(
+            select(AssetDerivative).where(AssetDerivative.asset_id == asset_id)
+        )
+        badge = result.scalar_one()
+        assert badge.kind == "badge"
+        assert badge.sha256_hash != resp.json()["sha256_hash"]
+
+        resp = await client.post(
+            "/api/v1/verify/hash", json={"sha256": badge.sha256_hash}
+        )
+        data = resp.json()
+        assert data["verified"] is True
+        assert data["match_type"] == "exact"
+        assert data["asset_id"] == str(asset_id)
+
+    @pytest.mark.asyncio
+    async def test_downloaded_badge_verifies_exactly(
+        self, client: AsyncClient, auth_headers: dict, sample_party,
+    ):
+        """The badge a party downloads is the file registered as a derivative."""
+        img = create_test_image(color="olive")
+        resp = await client.post(
+            "/api/v1/assets",
+            files={"file": ("campaign.png", img, "image/png")},
+            headers=auth_headers,
+        )
+        asset_id = resp.json()["id"]
+        resp = await client.get(
+            f"/api/v1/assets/{asset_id}/download/badge", headers=auth_headers
+        )
+        assert resp.status_code == 200
+        badge = resp.content
+        assert badge.startswith(b"\x89PNG") or badge.startswith(b"\xff\xd8")
+
+        resp = await client.post(
+            "/api/v1/verify/image",
+            files={"file": ("badge.png", badge, "image/png")},
+        )
+        data = resp.json()
+        assert data["verified"] is True
+        assert data["match_type"] == "exact"
+        assert data["asset_id"] == asset_id
+
     @pytest.mark.asyncio
     async def test_verify_no_hashes_returns_error(self, client: AsyncClient):
         resp = await client.post("/api/v1/verify/hash", json={})
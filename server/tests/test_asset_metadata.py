@@ -0,0 +1,124 @@
+"""Tests for the asset/party metadata cache."""
+
+import time
+
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import AssetStatus
+from app.services.asset_metadata import AssetMetadataCache, asset_metadata
+from tests.conftest import TestSession, create_test_image, engine
+from tests.test_api_verification import _insert_test_asset
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(engine.sync_engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine.sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+class TestAssetMetadataCache:
+    async def test_lookups_served_from_memory(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        asset = await _insert_test_asset(
+            db_session, sample_party, admin_user.id, create_test_image()
+        )
+        cache = AssetMetadataCache(max_size=10, ttl_seconds=60)
+        async with TestSession() as db:
+            info = await cache.get_by_verification_id(db, asset.verification_id)
+            assert info.party_name == "Test Labour Party"
+            assert info.party_short_name == "Labour"
+            assert info.status == AssetStatus.ACTIVE
+            with _QueryCounter() as queries:
+                assert await cache.get_by_verification_id(db, "testver123") is info
+                assert await cache.get(db, asset.id) is info
+            assert queries.count == 0
+            assert await cache.get_by_verification_id(db, "missing") is None
+        assert cache.stats()["hits"] == 2
+
+    async def test_eviction_keeps_both_keys_consistent(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        asset = await _insert_test_asset(
+            db_session, sample_party, admin_user.id, create_test_image()
+        )
+        cache = AssetMetadataCache(max_size=0, ttl_seconds=60)
+        async with TestSession() as db:
+            assert (await cache.get(db, asset.id)).verification_id == "testver123"
+        assert len(cache) == 0
+        assert cache._by_verification_id == {}
+
+    async def test_entries_expire(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        asset = await _insert_test_asset(
+            db_session, sample_party, admin_user.id, create_test_image()
+        )
+        cache = AssetMetadataCache(max_size=10, ttl_seconds=0.01)
+        async with TestSession() as db:
+            await cache.get(db, asset.id)
+            time.sleep(0.02)
+            assert await cache.get(db, asset.id) is not None
+        assert cache.stats()["misses"] == 2
+
+    async def test_discard_party_drops_its_assets(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        asset = await _insert_test_asset(
+            db_session, sample_party, admin_user.id, create_test_image()
+        )
+        cache = AssetMetadataCache(max_size=10, ttl_seconds=60)
+        async with TestSession() as db:
+            await cache.get(db, asset.id)
+            sample_party.name = "Renamed Party"
+            db_session.add(sample_party)
+            await db_session.commit()
+            cache.discard_party(sample_party.id)
+            assert (await cache.get(db, asset.id)).party_name == "Renamed Party"
+
+
+class TestVerifyByIdCaching:
+    async def test_repeat_scan_needs_no_queries(
+        self, client: AsyncClient, db_session: AsyncSession, sample_party, admin_user
+    ):
+        await _insert_test_asset(
+            db_session, sample_party, admin_user.id, create_test_image()
+        )
+        assert (await client.get("/api/v1/verify/testver123")).json()["verified"]
+        with _QueryCounter() as queries:
+            resp = await client.get("/api/v1/verify/testver123")
+        assert resp.json()["party_short_name"] == "Labour"
+        assert queries.count == 0
+
+    async def test_revocation_visible_immediately(
+        self, client: AsyncClient, auth_headers: dict, sample_party
+    ):
+        resp = await client.post(
+            "/api/v1/assets",
+            files={"file": ("campaign.png", create_test_image(), "image/png")},
+            headers=auth_headers,
+        )
+        asset_id = resp.json()["id"]
+        verification_id = resp.json()["verification_id"]
+        assert (await client.get(f"/api/v1/verify/{verification_id}")).json()["verified"]
+        assert len(asset_metadata) == 1
+
+        await client.patch(
+            f"/api/v1/assets/{asset_id}",
+            json={"status": "revoked"},
+            headers=auth_headers,
+        )
+        data = (await client.get(f"/api/v1/verify/{verification_id}")).json()
+        assert data["verified"] is False
+        assert data["status"] == "revoked"
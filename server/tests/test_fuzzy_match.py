@@ -0,0 +1,130 @@
+"""Tests for the promoter statement fuzzy matcher."""
+
+import random
+from difflib import SequenceMatcher
+
+from app.services.fuzzy_match import (
+    MultiPatternSearcher,
+    StatementSet,
+    best_substring_matches,
+    max_distance_for,
+)
+from app.services.ocr import _best_substring_match
+
+STATEMENT = "Authorised by J. Smith, 12 Main Street, Wellington"
+
+
+def _edit_distance_search(pattern: str, text: str) -> tuple[int, list[int]]:
+    """Reference semi-global edit distance by dynamic programming."""
+    column = list(range(len(pattern) + 1))
+    distances = [len(pattern)]
+    for char in text:
+        current = [0]
+        for i in range(1, len(pattern) + 1):
+            current.append(
+                min(
+                    column[i] + 1,
+                    current[i - 1] + 1,
+                    column[i - 1] + (pattern[i - 1] != char),
+                )
+            )
+        column = current
+        distances.append(current[-1])
+    best = min(distances)
+    return best, [j for j, d in enumerate(distances) if d == best]
+
+
+def _sliding_window(text: str, target: str) -> float:
+    """The previous exhaustive matcher's ratio."""
+    text, target = text.lower(), target.lower()
+    if target in text:
+        return 1.0
+    best = 0.0
+    for size in range(max(1, len(target) - 20), len(target) + 20):
+        for start in range(0, len(text) - size + 1):
+            best = max(
+                best, SequenceMatcher(None, text[start : start + size], target).ratio()
+            )
+    return best
+
+
+class TestMultiPatternSearcher:
+    def test_matches_dynamic_programming(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            patterns = [
+                "".join(rng.choice("abc") for _ in range(rng.randint(1, 12)))
+                for _ in range(rng.randint(1, 4))
+            ]
+            text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 30)))
+            found = MultiPatternSearcher(patterns).search(text)
+            assert found == [_edit_distance_search(p, text) for p in patterns]
+
+    def test_long_patterns_beyond_machine_words(self):
+        pattern = "promoted by " * 10
+        text = "vote now " + pattern.replace("by", "bv", 3) + " enrol"
+        distance, _ = MultiPatternSearcher([pattern, "xyz"]).search(text)[0]
+        assert distance == 3
+
+
+class TestBestSubstringMatches:
+    def test_exact_match(self):
+        assert _best_substring_match(f"VOTE NOW {STATEMENT.upper()}", STATEMENT) == (
+            STATEMENT,
+            1.0,
+        )
+
+    def test_noisy_statement_matches_previous_ratio(self):
+        noisy = "Authorlsed by J. Smlth, 12 Maln Streel, Wel1ington"
+        text = f"Vote for change\n{noisy}\nEnrol now"
+        match, ratio = _best_substring_match(text, STATEMENT)
+        assert "Smlth" in match
+        assert abs(ratio - _sliding_window(text, STATEMENT)) < 0.01
+        assert ratio >= 0.8
+
+    def test_unrelated_text_stays_below_threshold(self):
+        text = "Big summer sale on now, everything must go at our stores"
+        _, ratio = _best_substring_match(text, STATEMENT)
+        assert ratio < 0.5
+
+    def test_text_much_shorter_than_statement(self):
+        assert _best_substring_match("Vote", STATEMENT) == ("", 0.0)
+
+    def test_all_statements_in_one_scan(self):
+        statements = [STATEMENT, "Promoted by A. Brown, 1 Cuba Street, Wellington", ""]
+        text = "Promoted by A. Bown, 1 Cuba Stret, Wellington. Party vote!"
+        results = best_substring_matches(text, statements)
+        assert results[0] == _best_substring_match(text, statements[0])
+        assert results[1] == _best_substring_match(text, statements[1])
+        assert results[1][1] > 0.9 > results[0][1]
+        assert results[2] == ("", 0.0)
+
+
+class TestStatementSet:
+    def test_normalises_case_whitespace_and_quotes(self):
+        statements = StatementSet(
+            ["Authorised by J. O\u2019Brien,  12 Main St \u2013 Wellington"]
+        )
+        text = "VOTE\nAUTHORISED BY J. O'BRIEN,\n12 MAIN ST - WELLINGTON"
+        assert statements.best_matches(text)[0][1] == 1.0
+
+    def test_min_ratio_skips_statements_that_cannot_reach_it(self):
+        statements = StatementSet([STATEMENT, "Vote Green for a cleaner future"])
+        text = "Authorlsed by J. Smlth, 12 Maln Streel, Wel1ington. Party vote!"
+        unpruned = statements.best_matches(text)
+        pruned = statements.best_matches(text, min_ratio=0.8)
+        assert pruned[0] == unpruned[0]
+        assert pruned[1] == ("", 0.0)
+        assert 0 < unpruned[1][1] < 0.8
+
+    def test_distance_bound_holds_for_matches_at_the_ratio(self):
+        rng = random.Random(5)
+        for _ in range(100):
+            pattern = "".join(rng.choice("abcde") for _ in range(rng.randint(20, 40)))
+            noisy = "".join(
+                c if rng.random() > 0.15 else rng.choice("abcdexyz") for c in pattern
+            )
+            text = "zz " + noisy + " zz"
+            (_, ratio), = StatementSet([pattern]).best_matches(text)
+            distance, _ = MultiPatternSearcher([pattern]).search(text)[0]
+            assert distance <= max_distance_for(len(pattern), ratio)
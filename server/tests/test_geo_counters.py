@@ -0,0 +1,50 @@
+"""Tests for in-memory geo stat aggregation."""
+
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models.geo_stats import VerificationGeoStat
+from app.services.geo_counters import GeoStatCounters, upsert_geo_counts
+from tests.conftest import TestSession
+
+
+async def _totals() -> dict:
+    async with TestSession() as db:
+        result = await db.execute(select(VerificationGeoStat))
+        return {
+            (s.region, s.country): s.verification_count for s in result.scalars().all()
+        }
+
+
+class TestGeoCounters:
+    async def test_upsert_adds_to_existing_counts(self):
+        today = date.today()
+        async with TestSession() as db:
+            await upsert_geo_counts(db, {(today, "Auckland", "NZ"): 2})
+            await db.commit()
+            await upsert_geo_counts(
+                db, {(today, "Auckland", "NZ"): 3, (today, "Otago", "NZ"): 1}
+            )
+            await db.commit()
+        assert await _totals() == {("Auckland", "NZ"): 5, ("Otago", "NZ"): 1}
+
+    async def test_inline_when_not_running(self):
+        counters = GeoStatCounters(flush_interval=60)
+        async with TestSession() as db:
+            await counters.record(db, "Wellington", "NZ")
+            await counters.record(db, "Wellington", "NZ")
+            await db.commit()
+        assert await _totals() == {("Wellington", "NZ"): 2}
+
+    async def test_aggregates_and_flushes_on_stop(self):
+        counters = GeoStatCounters(flush_interval=60)
+        counters.start(TestSession)
+        async with TestSession() as db:
+            for _ in range(4):
+                await counters.record(db, "Canterbury", "NZ")
+        assert counters.stats()["pending_count"] == 4
+        assert await _totals() == {}
+        await counters.stop()
+        assert await _totals() == {("Canterbury", "NZ"): 4}
+        assert counters.stats()["flushes"] == 1
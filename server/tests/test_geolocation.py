@@ -0,0 +1,140 @@
+"""Tests for offline IP-range geolocation."""
+
+import os
+
+import pytest
+
+from app.services import geolocation
+from app.services.geolocation import (
+    IPRangeDatabase,
+    LRUCache,
+    OfflineGeoResolver,
+    resolve_location,
+)
+
+
+def _write(path, text: str) -> str:
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+SIMPLE_CSV = """network,country_code,region,country_name
+203.0.113.0/24,NZ,Auckland,New Zealand
+198.51.100.0/24,AU,New South Wales,Australia
+2001:db8::/32,NZ,Wellington,New Zealand
+"""
+
+
+class TestIPRangeDatabase:
+    def test_simple_table(self, tmp_path):
+        db = IPRangeDatabase.load_csv(_write(tmp_path / "ranges.csv", SIMPLE_CSV))
+        assert len(db) == 3
+        assert db.lookup("203.0.113.7") == ("Auckland", "NZ")
+        assert db.lookup("203.0.113.255") == ("Auckland", "NZ")
+        # Outside NZ the country name is reported, as with ip-api
+        assert db.lookup("198.51.100.1") == ("Australia", "AU")
+        assert db.lookup("2001:db8:1::1") == ("Wellington", "NZ")
+        assert db.lookup("::ffff:203.0.113.9") == ("Auckland", "NZ")
+
+    def test_misses_between_and_outside_ranges(self, tmp_path):
+        db = IPRangeDatabase.load_csv(_write(tmp_path / "ranges.csv", SIMPLE_CSV))
+        assert db.lookup("1.1.1.1") is None
+        assert db.lookup("203.0.114.0") is None
+        assert db.lookup("255.255.255.255") is None
+        assert db.lookup("2001:db9::1") is None
+
+    def test_start_end_columns(self, tmp_path):
+        path = _write(
+            tmp_path / "ranges.csv",
+            "start_ip,end_ip,country_code,region\n"
+            "192.0.2.10,192.0.2.20,NZ,Otago\n",
+        )
+        db = IPRangeDatabase.load_csv(path)
+        assert db.lookup("192.0.2.10") == ("Otago", "NZ")
+        assert db.lookup("192.0.2.20") == ("Otago", "NZ")
+        assert db.lookup("192.0.2.21") is None
+
+    def test_geolite2_blocks_and_locations(self, tmp_path):
+        _write(
+            tmp_path / "GeoLite2-City-Locations-en.csv",
+            "geoname_id,locale_code,continent_code,continent_name,country_iso_code,"
+            "country_name,subdivision_1_iso_code,subdivision_1_name\n"
+            "2179538,en,OC,Oceania,NZ,New Zealand,WGN,Wellington\n"
+            "2077456,en,OC,Oceania,AU,Australia,,\n",
+        )
+        blocks = _write(
+            tmp_path / "GeoLite2-City-Blocks-IPv4.csv",
+            "network,geoname_id,registered_country_geoname_id,is_anonymous_proxy\n"
+            "203.0.113.0/24,2179538,2179538,0\n"
+            "198.51.100.0/24,,2077456,0\n"
+            "192.0.2.0/24,999,999,0\n",
+        )
+        db = IPRangeDatabase.load_csv(blocks)
+        assert db.lookup("203.0.113.1") == ("Wellington", "NZ")
+        # Falls back to the registered country when geoname_id is empty
+        assert db.lookup("198.51.100.1") == ("Australia", "AU")
+        # Unknown geoname ids are skipped
+        assert db.lookup("192.0.2.1") is None
+
+
+class TestLRUCache:
+    def test_bounded_and_least_recently_used_evicted(self):
+        cache = LRUCache(max_size=2)
+        cache.put("a", ("A", "NZ"))
+        cache.put("b", ("B", "NZ"))
+        assert cache.get("a") == ("A", "NZ")
+        cache.put("c", ("C", "NZ"))
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == ("A", "NZ")
+        assert cache.get("c") == ("C", "NZ")
+        assert (cache.hits, cache.misses) == (3, 1)
+
+
+class TestOfflineResolver:
+    async def test_reloads_when_file_changes(self, tmp_path):
+        path = _write(tmp_path / "ranges.csv", SIMPLE_CSV)
+        resolver = OfflineGeoResolver(path, check_interval=0)
+        await resolver.ensure_current()
+        assert resolver.lookup("203.0.113.1") == ("Auckland", "NZ")
+
+        _write(
+            tmp_path / "ranges.csv",
+            "network,country_code,region\n203.0.113.0/24,NZ,Canterbury\n",
+        )
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        await resolver.ensure_current()
+        assert resolver.reloads == 2
+        assert resolver.lookup("203.0.113.1") == ("Canterbury", "NZ")
+        assert resolver.lookup("198.51.100.1") == geolocation.UNKNOWN
+
+    async def test_unchanged_file_not_reloaded(self, tmp_path):
+        resolver = OfflineGeoResolver(
+            _write(tmp_path / "ranges.csv", SIMPLE_CSV), check_interval=0
+        )
+        await resolver.ensure_current()
+        await resolver.ensure_current()
+        assert resolver.reloads == 1
+
+    async def test_resolve_location_uses_offline_database(self, tmp_path, monkeypatch):
+        # Documentation ranges count as private, so use public addresses here
+        path = _write(
+            tmp_path / "ranges.csv",
+            "network,country_code,region\n49.224.0.0/14,NZ,Auckland\n",
+        )
+        resolver = OfflineGeoResolver(path, check_interval=60)
+        monkeypatch.setattr(geolocation, "_offline", resolver)
+        monkeypatch.setattr(geolocation, "_cache", LRUCache(max_size=10))
+
+        assert await resolve_location("49.225.1.2") == ("Auckland", "NZ")
+        assert await resolve_location("49.225.1.2") == ("Auckland", "NZ")
+        assert await resolve_location("8.8.8.8") == geolocation.UNKNOWN
+        assert await resolve_location("not-an-ip") == geolocation.UNKNOWN
+        assert geolocation._cache.hits == 1
+        assert geolocation.geolocation_stats()["backend"] == "offline"
+
+
+@pytest.mark.parametrize("ip", ["127.0.0.1", "10.1.2.3", "192.168.0.4", "::1", "localhost"])
+async def test_local_addresses(ip):
+    assert await resolve_location(ip) == ("Local", "NZ")
@@ -0,0 +1,144 @@
+"""Tests for database-side perceptual hash search."""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import Asset, AssetStatus
+from app.services.encryption import encrypt_string
+from app.services.hash_search import (
+    find_closest_pdq,
+    find_closest_pdq_banded,
+    find_closest_phash,
+    pdq_distance_query,
+    phash_distance_query,
+    phash_hex_to_int,
+)
+
+
+async def _insert_asset(
+    db: AsyncSession, party, user, pdq_hash: str, phash: str, verification_id: str,
+    status: AssetStatus = AssetStatus.ACTIVE,
+) -> Asset:
+    asset = Asset(
+        party_id=party.id,
+        submitted_by=user.id,
+        original_filename_encrypted=encrypt_string("test.png"),
+        mime_type="image/png",
+        file_size=1,
+        sha256_hash=verification_id.ljust(64, "0"),
+        pdq_hash=pdq_hash,
+        pdq_quality=100,
+        phash=phash,
+        encrypted_storage_key="test/fake_key|fake_dek",
+        encryption_iv="0" * 24,
+        verification_id=verification_id,
+        status=status,
+    )
+    db.add(asset)
+    await db.commit()
+    await db.refresh(asset)
+    return asset
+
+
+class TestBinaryColumns:
+    def test_binary_columns_follow_hex(self):
+        asset = Asset(pdq_hash="ff" + "0" * 62, phash="ffffffffffffffff")
+        assert asset.pdq_hash_bin == bytes.fromhex("ff" + "0" * 62)
+        assert asset.phash_int == -1
+
+    def test_phash_int_round_trip(self):
+        value = phash_hex_to_int("8000000000000001")
+        assert value < 0
+        assert (value & ((1 << 64) - 1)) == int("8000000000000001", 16)
+
+
+class TestBandColumns:
+    def test_bands_follow_hex(self):
+        asset = Asset(pdq_hash="ffff0001" + "0" * 56, phash="0" * 16)
+        assert asset.pdq_band_00 == 0xFFFF
+        assert asset.pdq_band_01 == 1
+        assert asset.pdq_band_15 == 0
+
+
+class TestPostgresQueries:
+    def test_pdq_query_uses_bit_count(self):
+        sql = str(
+            pdq_distance_query("0" * 64, 31).compile(dialect=postgresql.dialect())
+        )
+        assert "bit_count" in sql
+        assert "BIT(256)" in sql
+
+    def test_phash_query_uses_bit_count(self):
+        sql = str(
+            phash_distance_query("0" * 16, 10).compile(dialect=postgresql.dialect())
+        )
+        assert "bit_count" in sql
+        assert "BIT(64)" in sql
+
+
+class TestSQLiteFallback:
+    @pytest.mark.asyncio
+    async def test_closest_pdq_within_threshold(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        await _insert_asset(db_session, sample_party, admin_user, "f" * 64, "0" * 16, "far")
+        near = await _insert_asset(
+            db_session, sample_party, admin_user, "7" + "0" * 63, "0" * 16, "near"
+        )
+        found = await find_closest_pdq(db_session, "0" * 64, 31)
+        assert found is not None
+        assert found[0].id == near.id
+        assert found[1] == 3
+
+    @pytest.mark.asyncio
+    async def test_revoked_assets_ignored(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        await _insert_asset(
+            db_session, sample_party, admin_user, "0" * 64, "f" * 16, "revoked",
+            status=AssetStatus.REVOKED,
+        )
+        assert await find_closest_pdq(db_session, "0" * 64, 31) is None
+        assert await find_closest_phash(db_session, "f" * 16, 10) is None
+
+    @pytest.mark.asyncio
+    async def test_closest_phash_high_bit(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        asset = await _insert_asset(
+            db_session, sample_party, admin_user, "0" * 64, "8000000000000000", "phash"
+        )
+        found = await find_closest_phash(db_session, "8000000000000003", 10)
+        assert found is not None
+        assert found[0].id == asset.id
+        assert found[1] == 2
+
+
+class TestBandedSearch:
+    @pytest.mark.asyncio
+    async def test_finds_match_with_every_band_changed(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        """31 bits spread so no band is identical: neighbours must be probed."""
+        value = 0
+        for band in range(16):
+            value |= 1 << (band * 16)
+            if band < 15:
+                value |= 1 << (band * 16 + 1)
+        asset = await _insert_asset(
+            db_session, sample_party, admin_user, "0" * 64, "0" * 16, "banded"
+        )
+        found = await find_closest_pdq_banded(db_session, format(value, "064x"), 31)
+        assert found is not None
+        assert found[0].id == asset.id
+        assert found[1] == 31
+
+    @pytest.mark.asyncio
+    async def test_no_candidates_outside_threshold(
+        self, db_session: AsyncSession, sample_party, admin_user
+    ):
+        await _insert_asset(
+            db_session, sample_party, admin_user, "0" * 64, "0" * 16, "banded"
+        )
+        assert await find_closest_pdq_banded(db_session, "f" * 64, 31) is None
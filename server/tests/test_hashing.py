@@ -6,11 +6,14 @@ import pytest
 from PIL import Image
 
 from app.services.hashing import (
+    MultiIndexPDQIndex,
+    PackedPDQIndex,
     compute_all_hashes,
     compute_pdq,
     compute_phash,
     compute_sha256,
     hamming_distance_hex,
+    pdq_bands,
     pdq_match,
     phash_match,
 )
@@ -144,3 +147,230 @@ class TestComputeAllHashes:
     def test_pdq_correct_length(self):
         result = compute_all_hashes(create_test_image())
         assert len(result["pdq_hash"]) == 64
+
+    def test_pdq_bands_reassemble_hash(self):
+        result = compute_all_hashes(create_test_image())
+        bands = result["pdq_bands"]
+        assert bands == pdq_bands(result["pdq_hash"])
+        assert len(bands) == 16
+        assert "".join(format(b, "04x") for b in bands) == result["pdq_hash"]
+
+
+class TestPackedPDQIndex:
+    def test_empty_index_no_match(self):
+        index = PackedPDQIndex()
+        assert index.search("0" * 64, 31) is None
+
+    def test_finds_closest_within_threshold(self):
+        index = PackedPDQIndex()
+        index.add("far", "f" * 64)
+        index.add("near", "3" + "0" * 63)  # 2 bits from zero
+        index.add("other", "0" * 32 + "f" * 32)
+        assert index.search("0" * 64, 31) == ("near", 2)
+
+    def test_outside_threshold_no_match(self):
+        index = PackedPDQIndex()
+        index.add("a", "f" * 64)
+        assert index.search("0" * 64, 31) is None
+
+    def test_remove_and_replace(self):
+        index = PackedPDQIndex()
+        index.add("a", "0" * 64)
+        index.add("b", "1" + "0" * 63)
+        index.remove("a")
+        assert len(index) == 1
+        assert index.search("0" * 64, 31) == ("b", 1)
+        index.add("b", "f" * 64)
+        assert len(index) == 1
+        assert index.search("0" * 64, 31) is None
+
+    def test_grows_past_initial_capacity(self):
+        index = PackedPDQIndex(capacity=2)
+        for i in range(10):
+            index.add(i, format(i, "064x"))
+        assert len(index) == 10
+        assert index.search(format(7, "064x"), 0) == (7, 0)
+
+    def test_agrees_with_hamming_distance_hex(self):
+        import random
+
+        rng = random.Random(42)
+        index = PackedPDQIndex()
+        hashes = [format(rng.getrandbits(256), "064x") for _ in range(50)]
+        for i, h in enumerate(hashes):
+            index.add(i, h)
+        query = hashes[17]
+        key, distance = index.search(query, 256)
+        assert key == 17 and distance == 0
+        expected = min(hamming_distance_hex(hashes[0], h) for h in hashes[1:])
+        index.remove(0)
+        assert index.search(hashes[0], 256)[1] == expected
+
+
+def _flip_bits(hash_hex: str, count: int, rng) -> str:
+    value = int(hash_hex, 16)
+    for bit in rng.sample(range(256), count):
+        value ^= 1 << bit
+    return format(value, "064x")
+
+
+class TestMultiIndexPDQIndex:
+    def test_exact_and_near_match(self):
+        index = MultiIndexPDQIndex()
+        index.add("a", "0" * 64)
+        index.add("b", "f" * 64)
+        assert index.search("0" * 64, 31) == ("a", 0)
+        assert index.search("3" + "0" * 63, 31) == ("a", 2)
+
+    def test_remove(self):
+        index = MultiIndexPDQIndex()
+        index.add("a", "0" * 64)
+        index.remove("a")
+        assert len(index) == 0
+        assert index.search("0" * 64, 31) is None
+
+    def test_match_at_threshold_spread_across_all_chunks(self):
+        """31 flipped bits spread so no 16-bit chunk is left untouched."""
+        value = 0
+        for chunk in range(16):
+            value |= 1 << (chunk * 16)
+            if chunk < 15:
+                value |= 1 << (chunk * 16 + 1)
+        query = format(value, "064x")
+        index = MultiIndexPDQIndex()
+        index.add("a", "0" * 64)
+        assert index.search(query, 31) == ("a", 31)
+
+    def test_recall_matches_brute_force(self):
+        import random
+
+        rng = random.Random(1234)
+        brute = PackedPDQIndex()
+        mih = MultiIndexPDQIndex()
+        registry = [format(rng.getrandbits(256), "064x") for _ in range(2000)]
+        for i, h in enumerate(registry):
+            brute.add(i, h)
+            mih.add(i, h)
+
+        queries = [
+            _flip_bits(rng.choice(registry), rng.randint(0, 40), rng)
+            for _ in range(300)
+        ]
+        queries += [format(rng.getrandbits(256), "064x") for _ in range(50)]
+
+        for query in queries:
+            expected = brute.search(query, 31)
+            actual = mih.search(query, 31)
+            if expected is None:
+                assert actual is None
+            else:
+                assert actual is not None
+                assert actual[1] == expected[1]
+
+
+class TestCascadeMatch:
+    def test_pdq_match_reports_pdq_distance(self):
+        index = PackedPDQIndex()
+        index.add("a", "0" * 64, "0" * 16)
+        hit = index.match("3" + "0" * 63, "0" * 16, 31, 10, 24)
+        assert hit == ("a", 2, None)
+
+    def test_phash_fallback_reuses_pass(self):
+        index = PackedPDQIndex()
+        index.add("a", "f" * 64, "00000000000000ff")
+        hit = index.match("0" * 64, "0000000000000000", 31, 10, 24)
+        assert hit == ("a", None, 8)
+
+    def test_prune_skips_rows_with_distant_phash(self):
+        index = PackedPDQIndex()
+        index.add("pruned", "0" * 64, "f" * 16)
+        index.add("kept", "1" + "0" * 63, "0" * 16)
+        hit = index.match("0" * 64, "0" * 16, 31, 10, 24)
+        assert hit == ("kept", 1, None)
+        assert index.last_survivors == 1
+
+    def test_rows_without_phash_survive_pruning(self):
+        index = PackedPDQIndex()
+        index.add("a", "0" * 64)
+        assert index.match("0" * 64, "f" * 16, 31, 10, 24) == ("a", 0, None)
+
+    def test_pdq_only_query(self):
+        index = PackedPDQIndex()
+        index.add("a", "0" * 64, "f" * 16)
+        assert index.match("0" * 64, None, 31, 10, 24) == ("a", 0, None)
+
+    def test_mih_match_falls_back_to_phash(self):
+        index = MultiIndexPDQIndex()
+        index.add("a", "f" * 64, "0000000000000001")
+        assert index.match("0" * 64, "0" * 16, 31, 10) == ("a", None, 1)
+        index.remove("a")
+        assert index.match("0" * 64, "0" * 16, 31, 10) is None
+
+
+def _synthetic_photo(seed: int, width: int, height: int) -> Image.Image:
+    """Textured, photo-like test image: gradients, noise and shapes."""
+    import numpy as np
+    from PIL import ImageDraw
+
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    channels = [
+        (np.sin(x / (50 + seed * 7) + c) + np.cos(y / (70 + seed * 3) - c)) * 60 + 128
+        for c in (0, 1, 2)
+    ]
+    pixels = np.stack(channels, axis=-1) + rng.normal(0, 12, (height, width, 3))
+    img = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(img)
+    for _ in range(25):
+        x0, y0 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        r = int(rng.integers(20, width // 6))
+        draw.ellipse(
+            [x0, y0, x0 + r, y0 + r],
+            fill=tuple(int(v) for v in rng.integers(0, 255, 3)),
+        )
+    return img
+
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **({"quality": 88} if fmt == "JPEG" else {}))
+    return buf.getvalue()
+
+
+class TestFastDecodeRegression:
+    """Reduced-resolution decoding must not move hashes meaningfully."""
+
+    @pytest.mark.parametrize("seed", range(4))
+    @pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+    def test_fast_decode_close_to_full_decode(self, monkeypatch, seed, fmt):
+        from app.core.config import settings
+
+        img_bytes = _encode(_synthetic_photo(seed, 2000, 1500), fmt)
+
+        monkeypatch.setattr(settings, "HASH_FAST_DECODE", False)
+        full_pdq, _ = compute_pdq(img_bytes)
+        full_phash = compute_phash(img_bytes)
+
+        monkeypatch.setattr(settings, "HASH_FAST_DECODE", True)
+        fast_pdq, _ = compute_pdq(img_bytes)
+        fast_phash = compute_phash(img_bytes)
+
+        assert hamming_distance_hex(full_pdq, fast_pdq) <= 10
+        assert hamming_distance_hex(full_phash, fast_phash) <= 4
+
+    def test_jpeg_decoded_at_reduced_size(self):
+        from app.core.config import settings
+        from app.services.image_context import ImageContext
+
+        ctx = ImageContext(_encode(_synthetic_photo(0, 2000, 1500), "JPEG"))
+        width, height = ctx.hash_image.size
+        assert min(width, height) >= settings.HASH_DECODE_SIZE
+        assert width < 2000 and height < 1500
+        # The full-resolution image was never decoded
+        assert ctx._rgb is None
+
+    def test_small_images_not_reduced(self):
+        from app.services.image_context import ImageContext
+
+        ctx = ImageContext(create_test_image(width=300, height=200))
+        assert ctx.hash_image.size == (300, 200)
@@ -0,0 +1,63 @@
+"""Tests for the shared decoded-image context."""
+
+import io
+
+from PIL import Image
+
+from app.services import image_context
+from app.services.badge import generate_badge_overlay
+from app.services.hashing import compute_all_hashes, compute_pdq, compute_phash
+from app.services.image_context import ImageContext
+from app.services.promoter_overlay import overlay_promoter_statement
+from app.services.thumbnail import generate_thumbnail
+from tests.conftest import create_test_image
+
+
+class TestImageContext:
+    def test_of_passes_context_through(self):
+        ctx = ImageContext(create_test_image())
+        assert ImageContext.of(ctx) is ctx
+        assert isinstance(ImageContext.of(create_test_image()), ImageContext)
+
+    def test_hashes_match_raw_bytes(self):
+        img_bytes = create_test_image(width=300, height=200, color="purple")
+        ctx = ImageContext(img_bytes)
+        assert compute_pdq(ctx) == compute_pdq(img_bytes)
+        assert compute_phash(ctx) == compute_phash(img_bytes)
+        assert compute_all_hashes(ctx) == compute_all_hashes(img_bytes)
+
+    def test_thumbnail_fits_size(self):
+        ctx = ImageContext(create_test_image(width=800, height=400))
+        thumb = ctx.thumbnail((200, 200))
+        assert thumb.size == (200, 100)
+        assert ctx.size == (800, 400)
+
+    def test_decodes_once_across_services(self, monkeypatch):
+        img_bytes = create_test_image(width=400, height=400)
+        calls = []
+        real_open = Image.open
+
+        def counting_open(fp, *args, **kwargs):
+            # Only count decodes of the upload (the badge also opens its QR code)
+            if isinstance(fp, io.BytesIO) and fp.getvalue() == img_bytes:
+                calls.append(fp)
+            return real_open(fp, *args, **kwargs)
+
+        monkeypatch.setattr(image_context.Image, "open", counting_open)
+        ctx = ImageContext(img_bytes)
+        compute_all_hashes(ctx)
+        overlay_promoter_statement(ctx, "Authorised by A. Person, 1 Street, Wellington")
+        generate_badge_overlay(ctx, "ctx123", "Labour")
+        generate_thumbnail(ctx)
+        assert len(calls) == 1
+
+    def test_services_do_not_mutate_shared_image(self):
+        img_bytes = create_test_image(width=400, height=400, color="white")
+        ctx = ImageContext(img_bytes)
+        before = ctx.rgb.tobytes()
+        overlay_promoter_statement(ctx, "Authorised by A. Person, 1 Street, Wellington")
+        generate_badge_overlay(ctx, "ctx123", "Labour")
+        generate_thumbnail(ctx)
+        assert ctx.rgb.tobytes() == before
+        thumb = Image.open(io.BytesIO(generate_thumbnail(ctx)))
+        assert thumb.size == (200, 200)
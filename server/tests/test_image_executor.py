@@ -0,0 +1,188 @@
+"""Tests for the bounded image-processing executor."""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.services.fuzzy_match import StatementSet
+from app.services.hashing import compute_all_hashes, compute_perceptual_hashes
+from app.services.image_executor import ExecutorBusy, ImageExecutor
+from app.services.image_tasks import (
+    check_promoter,
+    hash_and_preview,
+    process_submission,
+    render_badge,
+)
+from app.services.ocr import find_promoter_across_parties
+from app.services.promoter_overlay import overlay_promoter_statement
+from tests.conftest import create_test_image
+
+STATEMENT = "Authorised by J. Smith, 12 Main Street, Wellington"
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _die() -> None:
+    """Kill the worker process, as an OOM kill or a Tesseract crash would."""
+    os._exit(1)
+
+
+class TestImageExecutor:
+    async def test_runs_off_event_loop(self):
+        executor = ImageExecutor("test", workers=2, max_queue=4, mode="thread")
+        try:
+            thread = await executor.run("probe", threading.get_ident)
+            assert thread != threading.get_ident()
+            stats = executor.stats()["tasks"]["probe"]
+            assert stats["submitted"] == stats["completed"] == 1
+            assert stats["in_flight"] == 0
+        finally:
+            executor.shutdown()
+
+    async def test_rejects_when_queue_full(self):
+        executor = ImageExecutor("test", workers=1, max_queue=2, mode="thread")
+        try:
+            running = [
+                asyncio.create_task(executor.run("slow", _sleep, 0.2)) for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            with pytest.raises(ExecutorBusy):
+                await executor.run("slow", _sleep, 0)
+            await asyncio.gather(*running)
+            stats = executor.stats()["tasks"]["slow"]
+            assert stats["rejected"] == 1
+            assert stats["completed"] == 2
+            # The second task waited for the single worker
+            assert stats["max_wait_ms"] > 100
+        finally:
+            executor.shutdown()
+
+    async def test_per_type_limit(self):
+        executor = ImageExecutor(
+            "test", workers=4, max_queue=8, limits={"ocr": 1}, mode="thread"
+        )
+        try:
+            started = time.monotonic()
+            await asyncio.gather(*(executor.run("ocr", _sleep, 0.1) for _ in range(3)))
+            # Serialised by the limit despite four free workers
+            assert time.monotonic() - started >= 0.3
+        finally:
+            executor.shutdown()
+
+    async def test_stages_share_one_family_limit(self):
+        executor = ImageExecutor(
+            "test",
+            workers=2,
+            max_queue=4,
+            limits={"submission": 1, "submission.stages": 1},
+            mode="thread",
+        )
+        badge = executor._semaphore("submission.badge")
+        assert badge is not None
+        assert executor._semaphore("submission.hashes") is badge
+        assert executor._semaphore("submission") is not badge
+        assert executor._semaphore("verify") is None
+
+    async def test_failures_are_counted(self):
+        executor = ImageExecutor("test", workers=1, max_queue=2, mode="thread")
+        try:
+            with pytest.raises(ValueError):
+                await executor.run("bad", int, "not a number")
+            assert executor.stats()["tasks"]["bad"]["failed"] == 1
+            assert executor.stats()["in_flight"] == 0
+        finally:
+            executor.shutdown()
+
+    async def test_process_mode(self):
+        executor = ImageExecutor("test", workers=1, max_queue=2, mode="process")
+        img_bytes = create_test_image(width=200, height=200, color="green")
+        try:
+            hashes = await executor.run("hash", compute_all_hashes, img_bytes)
+            assert hashes == compute_all_hashes(img_bytes)
+        finally:
+            executor.shutdown()
+
+
+    async def test_replaces_pool_after_worker_dies(self):
+        executor = ImageExecutor("test", workers=1, max_queue=2, mode="process")
+        try:
+            with pytest.raises(ExecutorBusy):
+                await executor.run("crash", _die)
+            assert await executor.run("probe", os.getpid) != os.getpid()
+            assert executor.stats()["pool_restarts"] == 1
+            assert executor.stats()["tasks"]["crash"]["failed"] == 1
+        finally:
+            executor.shutdown()
+
+
+class TestProcessModeTasks:
+    """The task functions the app submits, run in a real process pool.
+
+    The suite otherwise runs IMAGE_EXECUTOR_MODE=thread, where arguments
+    and results are never pickled.
+    """
+
+    @pytest.fixture(scope="class")
+    def executor(self):
+        executor = ImageExecutor("test", workers=1, max_queue=4, mode="process")
+        yield executor
+        executor.shutdown()
+
+    async def test_submission_tasks(self, executor):
+        image = create_test_image(400, 300, "orange")
+        processed = await executor.run(
+            "submission", process_submission, image, "abc123", "Labour", None, STATEMENT
+        )
+        assert processed["hashes"] == compute_all_hashes(image)
+        assert processed["promoter_bytes"]
+
+        promoter = await executor.run(
+            "submission.promoter", check_promoter, image, STATEMENT, "bottom-left"
+        )
+        badge = await executor.run(
+            "submission.badge", render_badge, image, "abc123", "Labour", None
+        )
+        previews = await executor.run(
+            "submission.hashes", hash_and_preview, image, "abc123"
+        )
+        derivatives = processed["derivative_hashes"]
+        assert promoter["derivative_hashes"] == derivatives["promoter"]
+        assert badge["derivative_hashes"] == derivatives["badge"]
+        assert previews["hashes"] == processed["hashes"]
+
+    async def test_verification_and_overlay_tasks(self, executor):
+        image = create_test_image(400, 300, "green")
+        hashes = await executor.run("hash", compute_perceptual_hashes, image)
+        assert hashes == compute_perceptual_hashes(image)
+
+        stamped = await executor.run(
+            "overlay", overlay_promoter_statement, image, STATEMENT, "bottom-left"
+        )
+        assert stamped != image
+
+        parties = [("p1", "Test Labour Party", STATEMENT)]
+        result = await executor.run(
+            "promoter",
+            find_promoter_across_parties,
+            image,
+            parties,
+            StatementSet([STATEMENT]),
+        )
+        assert result["found"] is False
+
+
+class TestProcessSubmission:
+    def test_matches_individual_services(self):
+        img_bytes = create_test_image(width=400, height=300, color="orange")
+        result = process_submission(img_bytes, "abc123", "Labour")
+        assert result["hashes"] == compute_all_hashes(img_bytes)
+        assert result["promoter_check"] is None
+        assert result["promoter_bytes"] is None
+        for key in ("qr_bytes", "badge_bytes", "thumbnail_bytes"):
+            assert result[key]
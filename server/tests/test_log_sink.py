@@ -0,0 +1,68 @@
+"""Tests for the write-behind verification log sink."""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from app.models.verification import MatchType, VerificationLog, VerificationResult
+from app.services.log_sink import VerificationLogSink
+from tests.conftest import TestSession
+
+
+def _row() -> dict:
+    return {
+        "asset_id": None,
+        "match_type": MatchType.NONE,
+        "pdq_distance": None,
+        "phash_distance": None,
+        "source_ip_hash": "0" * 64,
+        "result": VerificationResult.UNVERIFIED,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+async def _count_logs() -> int:
+    async with TestSession() as db:
+        return (await db.execute(select(func.count(VerificationLog.id)))).scalar()
+
+
+class TestVerificationLogSink:
+    def test_not_running_means_inline(self, tmp_path):
+        sink = VerificationLogSink(10, 0.05, 100, str(tmp_path))
+        assert sink.submit(_row()) is False
+        assert sink.stats()["written_inline"] == 1
+
+    async def test_flushes_in_batches_and_drains_on_stop(self, tmp_path):
+        sink = VerificationLogSink(10, 0.05, 100, str(tmp_path))
+        sink.start(TestSession)
+        for _ in range(25):
+            assert sink.submit(_row())
+        await asyncio.sleep(0.1)
+        assert await _count_logs() >= 20
+        sink.submit(_row())
+        await sink.stop()
+        assert await _count_logs() == 26
+        stats = sink.stats()
+        assert stats["flushed"] == 26 and not stats["running"]
+        # Clean shutdown leaves no checkpoint behind
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_bounded_queue_falls_back_inline(self, tmp_path):
+        sink = VerificationLogSink(100, 10.0, 3, str(tmp_path))
+        sink.start(TestSession)
+        results = [sink.submit(_row()) for _ in range(5)]
+        assert results == [True, True, True, False, False]
+        await sink.stop()
+        assert await _count_logs() == 3
+
+    async def test_accounts_rows_lost_by_dead_worker(self, tmp_path):
+        # PIDs are capped well below this, so it cannot be a live process
+        checkpoint = tmp_path / "log_sink-999999999.json"
+        checkpoint.write_text(json.dumps({"enqueued": 40, "flushed": 32, "dropped": 0}))
+        sink = VerificationLogSink(10, 0.05, 100, str(tmp_path))
+        sink.start(TestSession)
+        await sink.stop()
+        assert sink.stats()["lost_in_crashes"] == 8
+        assert not checkpoint.exists()
@@ -0,0 +1,302 @@
+"""Tests for promoter OCR: ROI bands, the small-text prefilter and backends."""
+
+import io
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.core.config import settings
+from app.services import ocr
+from app.services.image_context import ImageContext
+from app.services.promoter_overlay import (
+    VALID_POSITIONS,
+    _load_font,
+    overlay_promoter_statement,
+)
+
+STATEMENT = "Authorised by J. Smith, 12 Main Street, Wellington"
+PARTIES = [("p1", "Test Labour Party", STATEMENT)]
+
+
+def _encode(img: Image.Image, format: str = "PNG") -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=format, quality=60)
+    return buf.getvalue()
+
+
+def _image(width: int, height: int) -> bytes:
+    return _encode(Image.new("RGB", (width, height), "white"))
+
+
+def _background(kind: str, size: tuple[int, int], rng: random.Random) -> Image.Image:
+    """Text-free stand-ins for photos: flat, gradient, shapes, smooth noise."""
+    w, h = size
+    colour = tuple(rng.randrange(256) for _ in range(3))
+    if kind == "flat":
+        return Image.new("RGB", size, colour)
+    if kind == "gradient":
+        ramp = (
+            np.linspace(0.2, 1.0, w)[None, :, None]
+            * np.linspace(0.5, 1.0, h)[:, None, None]
+        )
+        return Image.fromarray((ramp * np.array(colour)).astype(np.uint8))
+    if kind == "shapes":
+        img = Image.new("RGB", size, colour)
+        draw = ImageDraw.Draw(img)
+        for _ in range(25):
+            x, y, r = rng.randrange(w), rng.randrange(h), rng.randrange(w // 20, w // 4)
+            draw.ellipse(
+                [x - r, y - r, x + r, y + r],
+                fill=tuple(rng.randrange(256) for _ in range(3)),
+            )
+        return img.filter(ImageFilter.GaussianBlur(w / 200))
+    noise = np.random.default_rng(rng.randrange(2**32)).normal(
+        128, 40, (h // 8, w // 8, 3)
+    )
+    return Image.fromarray(noise.clip(0, 255).astype(np.uint8)).resize(
+        size, Image.BICUBIC
+    )
+
+
+def _bare_text(img: Image.Image, statement: str, rng: random.Random) -> Image.Image:
+    """A statement printed straight onto the image, with no backing box."""
+    img = img.copy()
+    w, h = img.size
+    size = max(12, int(h * 0.015))
+    x, y = rng.choice([size, w // 2]), rng.choice([size, h - 3 * size])
+    light = sum(img.getpixel((x, y))) > 384
+    fill = (0, 0, 0) if light else (255, 255, 255)
+    ImageDraw.Draw(img).text((x, y), statement, fill=fill, font=_load_font(size))
+    return img
+
+
+@pytest.fixture(scope="module")
+def labelled_corpus() -> list[tuple[bool, str, bytes]]:
+    """(has small text, description, image bytes) for a synthetic corpus."""
+    rng = random.Random(11)
+    statements = [
+        STATEMENT,
+        "Promoted by A. Brown, 1 Cuba Street, Wellington",
+        "Authorised by R. Jones, PO Box 123, Auckland",
+    ]
+    corpus = []
+    for i, kind in enumerate(["flat", "gradient", "shapes", "noise"] * 3):
+        size = [(1200, 800), (800, 1200), (1000, 1000)][i % 3]
+        base = _background(kind, size, rng)
+        statement = statements[i % len(statements)]
+        position = VALID_POSITIONS[i % len(VALID_POSITIONS)]
+        stamped = overlay_promoter_statement(_encode(base), statement, position=position)
+        label = f"{kind} {size}"
+        corpus.append((False, label, _encode(base)))
+        corpus.append((True, f"{label} overlay {position}", stamped))
+        jpeg = _encode(Image.open(io.BytesIO(stamped)), "JPEG")
+        corpus.append((True, f"{label} overlay jpeg", jpeg))
+        bare = _encode(_bare_text(base, statement, rng))
+        corpus.append((True, f"{label} bare text", bare))
+    return corpus
+
+
+@pytest.fixture
+def tesseract(monkeypatch):
+    """Fake Tesseract answering from a script: one text per call."""
+
+    class Fake:
+        def __init__(self):
+            self.script: list[str] = []
+            self.sizes: list[tuple[int, int]] = []
+
+        def __call__(self, image: Image.Image) -> str:
+            self.sizes.append(image.size)
+            return self.script.pop(0) if self.script else ""
+
+    fake = Fake()
+    monkeypatch.setattr(ocr, "_run_tesseract", fake)
+    # Blank test images have no text for the prefilter to find
+    monkeypatch.setattr(settings, "OCR_TEXT_SCORE_CUTOFF", 0)
+    return fake
+
+
+class TestRegionOfInterestOcr:
+    def test_stops_at_first_confident_band(self, tesseract):
+        tesseract.script = ["VOTE 1", "Authorlsed by J. Smith, 12 Main Street, Wellington"]
+        result = ocr.find_promoter_across_parties(_image(1200, 800), PARTIES)
+        assert result["found"] is True
+        assert result["party_name"] == "Test Labour Party"
+        assert result["region"] == "bottom-right"
+        assert len(tesseract.sizes) == 2
+
+    def test_falls_back_to_full_image(self, tesseract):
+        tesseract.script = ["", "Sale", "", "", STATEMENT]
+        result = ocr.find_promoter_statement(_image(1200, 800), STATEMENT)
+        assert result["found"] is True
+        assert result["region"] == "full"
+        # Four corner bands, then the full image
+        assert len(tesseract.sizes) == 5
+        assert tesseract.sizes[-1] == (1200, 800)
+
+    def test_unconfident_band_match_is_not_accepted(self, tesseract):
+        tesseract.script = ["Authorised by J. Brown, Auckland", "", "", "", ""]
+        result = ocr.find_promoter_statement(_image(1200, 800), STATEMENT)
+        assert result["found"] is False
+        assert result["region"] == "full"
+
+    def test_portrait_images_read_edge_strips(self, tesseract):
+        tesseract.script = ["", STATEMENT]
+        result = ocr.find_promoter_statement(_image(800, 1200), STATEMENT)
+        assert result["region"] == "top"
+        assert tesseract.sizes == [(800, 360), (800, 360)]
+
+    def test_large_images_are_downsampled_to_text_height(self, tesseract):
+        names = [name for name, _ in ocr._band_images(_image(4000, 3000))]
+        assert names == ["bottom-left", "bottom-right", "top-left", "top-right"]
+
+        ocr.find_promoter_statement(ImageContext(_image(4000, 3000)), STATEMENT)
+        # Smallest statement text is 1.5% of 3000px = 45px, scaled to 24px
+        scale = settings.OCR_ROI_TEXT_HEIGHT / 45
+        band_w, band_h = tesseract.sizes[0]
+        assert band_w == round(2200 * scale)
+        assert band_h == round(900 * scale)
+        band_area = sum(w * h for w, h in tesseract.sizes[:4])
+        assert band_area < 0.2 * 4000 * 3000
+
+    def test_roi_disabled_reads_full_image_only(self, tesseract, monkeypatch):
+        monkeypatch.setattr(settings, "OCR_ROI_ENABLED", False)
+        tesseract.script = [STATEMENT]
+        result = ocr.find_promoter_statement(_image(1200, 800), STATEMENT)
+        assert result["found"] is True
+        assert tesseract.sizes == [(1200, 800)]
+
+    def test_missing_tesseract_is_not_found(self, monkeypatch):
+        monkeypatch.setattr(ocr, "pytesseract", None)
+        result = ocr.find_promoter_across_parties(_image(300, 200), PARTIES)
+        assert result["found"] is False
+        assert result["confidence"] == 0.0
+
+
+class TestTextPrefilter:
+    def test_false_negative_rate_on_labelled_corpus(self, labelled_corpus):
+        cutoff = settings.OCR_TEXT_SCORE_CUTOFF
+        with_text = [
+            (label, ocr.text_score(data))
+            for has_text, label, data in labelled_corpus
+            if has_text
+        ]
+        missed = [(label, score) for label, score in with_text if score < cutoff]
+        assert len(missed) / len(with_text) == 0, missed
+
+    def test_skips_most_text_free_images(self, labelled_corpus):
+        cutoff = settings.OCR_TEXT_SCORE_CUTOFF
+        scores = [
+            ocr.text_score(data) for has_text, _, data in labelled_corpus if not has_text
+        ]
+        assert sum(score < cutoff for score in scores) / len(scores) >= 0.9
+
+    def test_skipped_image_is_not_ocrd(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(ocr, "_run_tesseract", lambda image: calls.append(image) or "")
+        result = ocr.find_promoter_across_parties(_image(1200, 800), PARTIES)
+        assert result["found"] is False
+        assert result["ocr_skipped"] is True
+        assert result["text_score"] == 0
+        assert calls == []
+
+    def test_tiny_images_are_never_skipped(self):
+        assert ocr.text_score(_image(40, 20)) == float("inf")
+
+
+class _FakeApi:
+    """Stand-in for tesserocr.PyTessBaseAPI."""
+
+    instances: list["_FakeApi"] = []
+
+    def __init__(self, lang: str):
+        self.lang = lang
+        self.ended = False
+        self.fail_next = False
+        self.images: list[Image.Image] = []
+        _FakeApi.instances.append(self)
+
+    def GetInitLanguagesAsString(self) -> str:
+        return "" if self.ended else self.lang
+
+    def SetImage(self, image: Image.Image) -> None:
+        self.images.append(image)
+
+    def GetUTF8Text(self) -> str:
+        if self.fail_next:
+            raise OSError("engine crashed")
+        return f"text {len(self.images)}\n"
+
+    def Clear(self) -> None:
+        pass
+
+    def End(self) -> None:
+        self.ended = True
+
+
+@pytest.fixture
+def fake_tesserocr(monkeypatch):
+    class Module:
+        PyTessBaseAPI = _FakeApi
+
+    _FakeApi.instances = []
+    monkeypatch.setattr(ocr, "tesserocr", Module)
+    return _FakeApi
+
+
+class TestOcrBackends:
+    def test_engines_are_reused(self, fake_tesserocr):
+        pool = ocr.TesseractEnginePool(size=2, max_uses=100)
+        image = Image.new("L", (10, 10))
+        assert [pool.image_to_string(image) for _ in range(3)] == [
+            "text 1\n",
+            "text 2\n",
+            "text 3\n",
+        ]
+        assert len(fake_tesserocr.instances) == 1
+        assert fake_tesserocr.instances[0].images == [image] * 3
+
+    def test_recycled_after_max_uses(self, fake_tesserocr):
+        pool = ocr.TesseractEnginePool(size=1, max_uses=2)
+        for _ in range(5):
+            pool.image_to_string(Image.new("L", (10, 10)))
+        assert len(fake_tesserocr.instances) == 3
+        assert [api.ended for api in fake_tesserocr.instances] == [True, True, False]
+        assert pool.stats()["recycled"] == 2
+
+    def test_failed_engine_is_replaced(self, fake_tesserocr):
+        pool = ocr.TesseractEnginePool(size=1, max_uses=100)
+        pool.image_to_string(Image.new("L", (10, 10)))
+        fake_tesserocr.instances[0].fail_next = True
+        with pytest.raises(RuntimeError):
+            pool.image_to_string(Image.new("L", (10, 10)))
+        assert fake_tesserocr.instances[0].ended
+        assert pool.image_to_string(Image.new("L", (10, 10))) == "text 1\n"
+        assert pool.stats()["errors"] == 1
+
+    def test_unhealthy_idle_engine_is_replaced(self, fake_tesserocr):
+        pool = ocr.TesseractEnginePool(size=1, max_uses=100)
+        pool.image_to_string(Image.new("L", (10, 10)))
+        fake_tesserocr.instances[0].ended = True
+        pool.image_to_string(Image.new("L", (10, 10)))
+        assert len(fake_tesserocr.instances) == 2
+        assert pool.stats()["failed_health_checks"] == 1
+
+    def test_concurrent_calls_bounded_by_pool_size(self, fake_tesserocr):
+        pool = ocr.TesseractEnginePool(size=2, max_uses=1000)
+        with ThreadPoolExecutor(6) as threads:
+            list(threads.map(pool.image_to_string, [Image.new("L", (5, 5))] * 60))
+        assert len(fake_tesserocr.instances) <= 2
+        assert pool.stats()["calls"] == 60
+        pool.close()
+        assert all(api.ended for api in fake_tesserocr.instances)
+
+    def test_auto_prefers_engine_pool(self, fake_tesserocr, monkeypatch):
+        assert isinstance(ocr.create_backend("auto"), ocr.TesseractEnginePool)
+        monkeypatch.setattr(ocr, "tesserocr", None)
+        assert isinstance(ocr.create_backend("auto"), ocr.PytesseractBackend)
+        with pytest.raises(ValueError):
+            ocr.create_backend("easyocr")
@@ -0,0 +1,163 @@
+"""Tests for the shared OCR text cache."""
+
+import io
+import sqlite3
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.services import ocr
+from app.services.image_context import ImageContext
+from app.services.ocr_cache import OcrCache
+from app.services.promoter_overlay import overlay_promoter_statement
+
+STATEMENT = "Authorised by J. Smith, 12 Main Street, Wellington"
+PARTIES = [("p1", "Test Labour Party", STATEMENT)]
+
+
+def _poster(format: str = "PNG", quality: int = 90) -> bytes:
+    img = Image.new("RGB", (1200, 800), (30, 90, 160))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, 1200, 60):
+        draw.ellipse([x, x // 2, x + 200, x // 2 + 150], fill=(x % 256, 120, 60))
+    buf = io.BytesIO()
+    img.save(buf, format=format, quality=quality)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch) -> OcrCache:
+    cache = OcrCache(str(tmp_path / "ocr.sqlite3"), max_bytes=1024 * 1024)
+    monkeypatch.setattr(ocr, "ocr_cache", cache)
+    monkeypatch.setattr(settings, "OCR_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_TEXT_SCORE_CUTOFF", 0)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def tesseract(monkeypatch) -> list[tuple[int, int]]:
+    """Fake Tesseract finding the statement in the bottom-right band only."""
+    calls = []
+
+    def run(image: Image.Image) -> str:
+        calls.append(image.size)
+        return STATEMENT if len(calls) == 2 else ""
+
+    monkeypatch.setattr(ocr, "_run_tesseract", run)
+    return calls
+
+
+class TestOcrCache:
+    def test_cached_text_skips_tesseract(self, cache, tesseract):
+        first = ocr.find_promoter_statement(_poster(), STATEMENT)
+        assert first["region"] == "bottom-right"
+        assert first["ocr_cached"] is False
+        assert len(tesseract) == 2
+
+        # A new decode of the same bytes, as in another request
+        second = ocr.find_promoter_across_parties(ImageContext(_poster()), PARTIES)
+        assert second["found"] is True
+        assert second["region"] == "bottom-right"
+        assert second["ocr_cached"] is True
+        assert len(tesseract) == 2
+        assert cache.stats()["entries"] == 2
+
+    def test_empty_text_cached_but_failures_not(self, cache, monkeypatch):
+        def broken(image):
+            raise RuntimeError("tesseract crashed")
+
+        monkeypatch.setattr(ocr, "_run_tesseract", broken)
+        assert ocr.find_promoter_statement(_poster(), STATEMENT)["found"] is False
+
+        calls = []
+        monkeypatch.setattr(ocr, "_run_tesseract", lambda image: calls.append(1) or "")
+        assert ocr.extract_text_from_image(_poster()) == ""
+        assert ocr.extract_text_from_image(_poster()) == ""
+        assert len(calls) == 1
+
+    def test_bands_keyed_by_text_height(self, cache, tesseract, monkeypatch):
+        ocr.find_promoter_statement(_poster(), STATEMENT)
+        monkeypatch.setattr(settings, "OCR_ROI_TEXT_HEIGHT", 32)
+        result = ocr.find_promoter_statement(_poster(), STATEMENT)
+        assert result["ocr_cached"] is False
+        assert len(tesseract) > 2
+
+    def test_shared_between_processes_through_the_file(self, cache):
+        cache.put("a" * 64, "full", STATEMENT)
+        other = OcrCache(cache.path, max_bytes=cache.max_bytes)
+        assert other.get("a" * 64, "full") == STATEMENT
+        assert other.get("b" * 64, "full") is None
+        other.close()
+
+    def test_stats_read_from_the_file(self, cache):
+        cache.put("a" * 64, "full", STATEMENT)
+        other = OcrCache(cache.path, max_bytes=cache.max_bytes)
+        stats = other.stats()
+        assert stats["entries"] == 1
+        assert stats["bytes"] == 64 + len("full") + len(STATEMENT)
+        assert stats["oldest_age_seconds"] == 0
+        other.close()
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self, cache):
+        cache.max_bytes = 2000
+        for i in range(40):
+            cache.put(f"{i:064x}", "full", "x" * 100)
+        # Entry 0 stays in use, so it outlives the rest of the oldest
+        conn = sqlite3.connect(cache.path)
+        conn.execute(
+            "UPDATE ocr_text SET last_used = last_used + 60 WHERE sha256 = ?",
+            (f"{0:064x}",),
+        )
+        conn.commit()
+        conn.close()
+
+        evicted = cache.evict()
+        conn = sqlite3.connect(cache.path)
+        total, rows = conn.execute("SELECT SUM(bytes), COUNT(*) FROM ocr_text").fetchone()
+        conn.close()
+        assert total <= cache.max_bytes
+        assert cache.get(f"{0:064x}", "full") is not None
+        assert cache.get(f"{1:064x}", "full") is None
+        assert cache.get(f"{39:064x}", "full") is not None
+        assert evicted == 40 - rows > 0
+
+    def test_entries_expire_after_max_age(self, cache):
+        cache.max_age = 3600
+        cache.put("a" * 64, "full", STATEMENT)
+        cache.put("b" * 64, "full", STATEMENT)
+        # Entry "a" was stored two hours ago; being read does not extend it
+        conn = sqlite3.connect(cache.path)
+        conn.execute(
+            "UPDATE ocr_text SET stored_at = stored_at - 7200, "
+            "last_used = last_used + 60 WHERE sha256 = ?",
+            ("a" * 64,),
+        )
+        conn.commit()
+        conn.close()
+
+        assert cache.get("a" * 64, "full") is None
+        assert cache.get("b" * 64, "full") == STATEMENT
+        assert cache.evict() == 1
+        assert cache.stats()["entries"] == 1
+
+
+class TestNearDuplicates:
+    def test_stamped_copy_does_not_reuse_original_text(self, cache, monkeypatch):
+        """The stamped copy is a near-duplicate, but its statement is new."""
+        original = _poster()
+        stamped = overlay_promoter_statement(original, STATEMENT, "bottom-left")
+        calls = []
+
+        def run(image: Image.Image) -> str:
+            calls.append(image.size)
+            return STATEMENT if reading_stamped else ""
+
+        monkeypatch.setattr(ocr, "_run_tesseract", run)
+        reading_stamped = False
+        assert ocr.find_promoter_statement(original, STATEMENT)["found"] is False
+        reading_stamped = True
+        result = ocr.find_promoter_statement(stamped, STATEMENT)
+        assert result["found"] is True
+        assert result["ocr_cached"] is False
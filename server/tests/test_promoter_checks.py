@@ -0,0 +1,177 @@
+"""Tests for deferred OCR promoter checks."""
+
+import time
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.party import Party
+from app.models.verification import PromoterCheck, PromoterCheckStatus
+from app.services import ocr
+from app.services.promoter_checks import PromoterChecks, promoter_checks
+from app.services.verification_cache import verification_cache
+from tests.conftest import TestSession, create_test_image
+
+PARTIES = [("p1", "Test Labour Party", "Authorised by A. Person, Wellington")]
+
+
+def _ocr_after(delay: float, found: bool = True):
+    def fake(image, parties, statements=None):
+        time.sleep(delay)
+        if found is None:
+            raise RuntimeError("tesseract crashed")
+        return {
+            "found": found,
+            "party_id": "p1",
+            "party_name": "Test Labour Party" if found else None,
+            "confidence": 0.93,
+            "extracted_text": "",
+        }
+
+    return fake
+
+
+async def _stored(check_id) -> PromoterCheck:
+    async with TestSession() as db:
+        return await db.get(PromoterCheck, check_id)
+
+
+class TestPromoterChecks:
+    async def test_not_started_waits_for_result(self, monkeypatch):
+        monkeypatch.setattr(ocr, "find_promoter_across_parties", _ocr_after(0.05))
+        checks = PromoterChecks(budget=0.001, retention=timedelta(hours=1))
+        result, check_id = await checks.run(b"image", PARTIES)
+        assert result["found"] is True
+        assert check_id is None
+
+    async def test_counts_checks_skipped_by_text_prefilter(self, monkeypatch):
+        def skipped(image, parties, statements=None):
+            return {"found": False, "ocr_skipped": True, "text_score": 0}
+
+        monkeypatch.setattr(ocr, "find_promoter_across_parties", skipped)
+        checks = PromoterChecks(budget=5, retention=timedelta(hours=1))
+        await checks.run(b"image", PARTIES)
+        monkeypatch.setattr(ocr, "find_promoter_across_parties", _ocr_after(0))
+        await checks.run(b"image", PARTIES)
+        assert checks.stats()["checks"] == 2
+        assert checks.stats()["ocr_skipped"] == 1
+
+    async def test_counts_checks_answered_from_ocr_cache(self, monkeypatch):
+        def cached(image, parties, statements=None):
+            return {"found": False, "region": "full", "ocr_cached": True}
+
+        monkeypatch.setattr(ocr, "find_promoter_across_parties", cached)
+        checks = PromoterChecks(budget=5, retention=timedelta(hours=1))
+        await checks.run(b"image", PARTIES)
+        assert checks.stats()["ocr_cached"] == 1
+        assert checks.stats()["ocr_skipped"] == 0
+
+    async def test_within_budget_returns_result(self, monkeypatch):
+        monkeypatch.setattr(ocr, "find_promoter_across_parties", _ocr_after(0))
+        checks = PromoterChecks(budget=5, retention=timedelta(hours=1))
+        checks.start(TestSession)
+        result, check_id = await checks.run(b"image", PARTIES)
+        await checks.stop()
+        assert result["party_name"] == "Test Labour Party"
+        assert check_id is None
+        assert checks.stats()["within_budget"] == 1
+
+    async def test_overrun_is_deferred_and_recorded(self, monkeypatch):
+        monkeypatch.setattr(ocr, "find_promoter_across_parties", _ocr_after(0.2))
+        checks = PromoterChecks(budget=0.01, retention=timedelta(hours=1))
+        checks.start(TestSession)
+        result, check_id = await checks.run(b"image", PARTIES)
+        assert result is None
+        assert (await _stored(check_id)).status == PromoterCheckStatus.PENDING
+
+        await checks.stop()
+        check = await _stored(check_id)
+        assert check.status == PromoterCheckStatus.COMPLETE
+        assert check.promoter_detected is True
+        assert check.promoter_party_name == "Test Labour Party"
+        assert check.completed_at is not None
+        assert checks.stats()["deferred_completed"] == 1
+
+    async def test_deferred_failure_recorded(self, monkeypatch):
+        monkeypatch.setattr(
+            ocr, "find_promoter_across_parties", _ocr_after(0.1, found=None)
+        )
+        checks = PromoterChecks(budget=0.01, retention=timedelta(hours=1))
+        checks.start(TestSession)
+        _, check_id = await checks.run(b"image", PARTIES)
+        await checks.stop()
+        assert (await _stored(check_id)).status == PromoterCheckStatus.FAILED
+        assert checks.stats()["deferred_failed"] == 1
+
+
+class TestPromoterCheckApi:
+    @pytest.fixture
+    async def deferring(self, monkeypatch):
+        monkeypatch.setattr(ocr, "find_promoter_across_parties", _ocr_after(0.2))
+        monkeypatch.setattr(promoter_checks, "budget", 0.01)
+        promoter_checks.start(TestSession)
+        yield
+        await promoter_checks.stop()
+
+    async def test_verify_returns_check_id_to_poll(
+        self, client: AsyncClient, db_session: AsyncSession, sample_party: Party, deferring
+    ):
+        sample_party.promoter_statement = PARTIES[0][2]
+        await db_session.commit()
+
+        resp = await client.post(
+            "/api/v1/verify/image",
+            files={"file": ("poster.png", create_test_image(color="teal"), "image/png")},
+        )
+        data = resp.json()
+        assert data["verified"] is False
+        assert data["promoter_detected"] is False
+        check_id = data["promoter_check_id"]
+        assert check_id
+
+        poll = await client.get(f"/api/v1/verify/promoter-check/{check_id}")
+        assert poll.json()["status"] == "pending"
+
+        await promoter_checks.stop()
+        poll = await client.get(f"/api/v1/verify/promoter-check/{check_id}")
+        assert poll.status_code == 200
+        assert poll.json()["status"] == "complete"
+        assert poll.json()["promoter_detected"] is True
+        assert poll.json()["promoter_party_name"] == "Test Labour Party"
+        # Not cached while pending, so a repeat upload is checked afresh
+        assert verification_cache.stats()["size"] == 0
+
+    async def test_failed_ocr_is_not_cached(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        sample_party: Party,
+        monkeypatch,
+    ):
+        def broken(image):
+            raise RuntimeError("Tesseract engine failed")
+
+        monkeypatch.setattr(ocr, "_run_tesseract", broken)
+        monkeypatch.setattr(settings, "OCR_TEXT_SCORE_CUTOFF", 0)
+        sample_party.promoter_statement = PARTIES[0][2]
+        await db_session.commit()
+
+        upload = {"file": ("poster.png", create_test_image(color="teal"), "image/png")}
+        resp = await client.post("/api/v1/verify/image", files=upload)
+        assert resp.status_code == 200
+        assert resp.json()["promoter_detected"] is False
+        assert verification_cache.stats()["size"] == 0
+
+        monkeypatch.setattr(ocr, "_run_tesseract", lambda image: PARTIES[0][2])
+        resp = await client.post("/api/v1/verify/image", files=upload)
+        assert resp.json()["promoter_detected"] is True
+        assert verification_cache.stats()["size"] == 1
+
+    async def test_unknown_check_id(self, client: AsyncClient):
+        resp = await client.get(
+            "/api/v1/verify/promoter-check/00000000-0000-0000-0000-000000000000"
+        )
+        assert resp.status_code == 404
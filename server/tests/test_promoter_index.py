@@ -0,0 +1,192 @@
+"""Tests for the promoter statement index."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.party import Party, PartyUser, UserRole
+from app.services import ocr
+from app.services.encryption import encrypt_string
+from app.services.promoter_index import PromoterStatementIndex, promoter_index
+from tests.conftest import create_test_image
+
+PARTY_STATEMENT = "Authorised by A. Person, 1 Main Street, Wellington"
+CANDIDATE_STATEMENT = "Authorised by C. Andidate, 22 High Street, Dunedin"
+
+
+async def _add_candidate(
+    db: AsyncSession, party: Party, statement: str | None, username: str = "cand"
+) -> PartyUser:
+    user = PartyUser(
+        party_id=party.id,
+        username=username,
+        email_encrypted=encrypt_string(f"{username}@test.com"),
+        hashed_password="x",
+        role=UserRole.CANDIDATE,
+        promoter_statement=statement,
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+@pytest.fixture
+async def party_with_statement(db_session: AsyncSession, sample_party: Party) -> Party:
+    sample_party.promoter_statement = PARTY_STATEMENT
+    await db_session.commit()
+    return sample_party
+
+
+class TestPromoterStatementIndex:
+    async def test_indexes_party_and_candidate_statements(
+        self, db_session: AsyncSession, party_with_statement: Party
+    ):
+        await _add_candidate(db_session, party_with_statement, CANDIDATE_STATEMENT)
+        # A candidate repeating the party statement is indexed once
+        await _add_candidate(
+            db_session, party_with_statement, f" {PARTY_STATEMENT.upper()} ", "dup"
+        )
+        index = PromoterStatementIndex(refresh_seconds=60)
+        snapshot = await index.snapshot(db_session)
+
+        assert len(index) == 3
+        assert [p[2] for p in snapshot.parties] == [PARTY_STATEMENT, CANDIDATE_STATEMENT]
+        assert {p[1] for p in snapshot.parties} == {"Test Labour Party"}
+        assert len(snapshot.statements) == 2
+
+    async def test_empty_registry(self, db_session: AsyncSession, sample_party: Party):
+        index = PromoterStatementIndex(refresh_seconds=60)
+        assert await index.snapshot(db_session) is None
+        assert index.loaded
+
+    async def test_snapshot_reused_until_changed(
+        self, db_session: AsyncSession, party_with_statement: Party
+    ):
+        index = PromoterStatementIndex(refresh_seconds=60)
+        first = await index.snapshot(db_session)
+        assert await index.snapshot(db_session) is first
+        assert index.stats()["loads"] == 1
+        assert index.stats()["builds"] == 1
+
+        user = await _add_candidate(db_session, party_with_statement, CANDIDATE_STATEMENT)
+        index.set_user(user)
+        second = await index.snapshot(db_session)
+        assert second is not first
+        assert len(second.parties) == 2
+        assert index.stats()["loads"] == 1
+
+        user.promoter_statement = None
+        index.set_user(user)
+        assert len((await index.snapshot(db_session)).parties) == 1
+
+    async def test_reload_picks_up_changes_from_other_workers(
+        self, db_session: AsyncSession, party_with_statement: Party
+    ):
+        index = PromoterStatementIndex(refresh_seconds=0)
+        first = await index.snapshot(db_session)
+        # Unchanged rows do not rebuild the StatementSet
+        assert await index.snapshot(db_session) is first
+
+        await _add_candidate(db_session, party_with_statement, CANDIDATE_STATEMENT)
+        assert len((await index.snapshot(db_session)).parties) == 2
+        assert index.stats()["builds"] == 2
+
+    async def test_party_rename_relabels_statements(
+        self, db_session: AsyncSession, party_with_statement: Party
+    ):
+        await _add_candidate(db_session, party_with_statement, CANDIDATE_STATEMENT)
+        index = PromoterStatementIndex(refresh_seconds=60)
+        await index.snapshot(db_session)
+
+        party_with_statement.name = "Renamed Party"
+        index.set_party(party_with_statement)
+        snapshot = await index.snapshot(db_session)
+        assert {p[1] for p in snapshot.parties} == {"Renamed Party"}
+
+
+    async def test_inactive_candidates_not_indexed(
+        self, db_session: AsyncSession, party_with_statement: Party
+    ):
+        user = await _add_candidate(db_session, party_with_statement, CANDIDATE_STATEMENT)
+        user.is_active = False
+        await db_session.commit()
+        index = PromoterStatementIndex(refresh_seconds=60)
+        snapshot = await index.snapshot(db_session)
+        assert [p[2] for p in snapshot.parties] == [PARTY_STATEMENT]
+
+        user.is_active = True
+        index.set_user(user)
+        assert len((await index.snapshot(db_session)).parties) == 2
+        user.is_active = False
+        index.set_user(user)
+        assert len((await index.snapshot(db_session)).parties) == 1
+        assert index.stats()["loads"] == 1
+
+
+class TestPromoterIndexApi:
+    async def test_user_statement_endpoints_update_index(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        party_with_statement: Party,
+        auth_headers: dict,
+    ):
+        await promoter_index.snapshot(db_session)
+        resp = await client.put(
+            "/api/v1/parties/me/promoter-statement",
+            json={"statement": CANDIDATE_STATEMENT},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200
+        snapshot = await promoter_index.snapshot(db_session)
+        assert CANDIDATE_STATEMENT in [p[2] for p in snapshot.parties]
+
+        resp = await client.delete(
+            "/api/v1/parties/me/promoter-statement", headers=auth_headers
+        )
+        assert resp.status_code == 200
+        snapshot = await promoter_index.snapshot(db_session)
+        assert [p[2] for p in snapshot.parties] == [PARTY_STATEMENT]
+        assert promoter_index.stats()["loads"] == 1
+
+    async def test_candidate_statement_detected(
+        self, db_session: AsyncSession, party_with_statement: Party, monkeypatch
+    ):
+        await _add_candidate(db_session, party_with_statement, CANDIDATE_STATEMENT)
+        monkeypatch.setattr(
+            ocr,
+            "_run_tesseract",
+            lambda image: "VOTE 1\nAuthorised by C. Andidate,\n22 High Street, Dunedln",
+        )
+        monkeypatch.setattr(settings, "OCR_TEXT_SCORE_CUTOFF", 0)
+        snapshot = await promoter_index.snapshot(db_session)
+        result = ocr.find_promoter_across_parties(
+            create_test_image(), snapshot.parties, snapshot.statements
+        )
+        assert result["found"] is True
+        assert result["party_name"] == "Test Labour Party"
+        assert result["party_id"] == str(party_with_statement.id)
+
+    async def test_member_deactivation_updates_index(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        party_with_statement: Party,
+        auth_headers: dict,
+    ):
+        user = await _add_candidate(db_session, party_with_statement, CANDIDATE_STATEMENT)
+        await promoter_index.snapshot(db_session)
+        url = f"/api/v1/parties/{party_with_statement.id}/members/{user.id}/active"
+
+        resp = await client.patch(url, json={"is_active": False}, headers=auth_headers)
+        assert resp.status_code == 200
+        snapshot = await promoter_index.snapshot(db_session)
+        assert [p[2] for p in snapshot.parties] == [PARTY_STATEMENT]
+
+        resp = await client.patch(url, json={"is_active": True}, headers=auth_headers)
+        assert resp.status_code == 200
+        snapshot = await promoter_index.snapshot(db_session)
+        assert CANDIDATE_STATEMENT in [p[2] for p in snapshot.parties]
+        assert promoter_index.stats()["loads"] == 1
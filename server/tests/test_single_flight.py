@@ -0,0 +1,146 @@
+"""Tests for in-flight request coalescing."""
+
+import asyncio
+import os
+
+import pytest
+
+from app.services.single_flight import CrossWorkerFlight, SingleFlight
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+        assert results == ["result"] * 10
+        assert calls == 1
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 9}
+
+    async def test_exception_propagates_to_followers(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flight.do("k", work) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+    async def test_follower_takes_over_when_leader_cancelled(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+
+class TestCrossWorkerFlight:
+    async def test_waiting_worker_reuses_result(self, tmp_path):
+        # Two instances with separate lock fds behave like two workers
+        first = CrossWorkerFlight(str(tmp_path))
+        second = CrossWorkerFlight(str(tmp_path))
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"verified": True}
+
+        kwargs = {"dump": lambda r: '{"verified": true}', "load": lambda s: {"shared": s}}
+        leader = asyncio.create_task(first.do("abc", work, **kwargs))
+        await asyncio.sleep(0.01)
+        follower = await second.do("abc", work, **kwargs)
+        assert await leader == {"verified": True}
+        assert follower == {"shared": '{"verified": true}'}
+        assert len(calls) == 1
+        assert second.stats()["shared"] == 1
+
+    async def test_old_results_are_not_reused(self, tmp_path):
+        flight = CrossWorkerFlight(str(tmp_path))
+
+        async def work():
+            return "fresh"
+
+        kwargs = {"dump": str, "load": lambda s: "shared"}
+        assert await flight.do("abc", work, **kwargs) == "fresh"
+        assert await flight.do("abc", work, **kwargs) == "fresh"
+        assert flight.stats()["leaders"] == 2
+
+
+    async def test_different_keys_do_not_wait(self, tmp_path):
+        first = CrossWorkerFlight(str(tmp_path))
+        second = CrossWorkerFlight(str(tmp_path), timeout=5)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "slow"
+
+        async def fast():
+            return "fast"
+
+        kwargs = {"dump": str, "load": str}
+        leader = asyncio.create_task(first.do("aaa", slow, **kwargs))
+        await asyncio.sleep(0.02)
+        assert await asyncio.wait_for(second.do("bbb", fast, **kwargs), 1) == "fast"
+        release.set()
+        assert await leader == "slow"
+
+    async def test_prune_removes_only_unheld_stale_locks(self, tmp_path):
+        flight = CrossWorkerFlight(str(tmp_path), result_ttl=0)
+        held = await flight._acquire("held")
+        stale = await flight._acquire("stale")
+        flight._release(stale)
+        os.utime(tmp_path / "held.lock", (0, 0))
+        os.utime(tmp_path / "stale.lock", (0, 0))
+        flight._prune()
+        assert (tmp_path / "held.lock").exists()
+        assert not (tmp_path / "stale.lock").exists()
+        flight._release(held)
+
+
+class TestVerifyImageCoalescing:
+    async def test_identical_concurrent_uploads_verified_once(self, client, monkeypatch):
+        from app.api import verification
+        from tests.conftest import create_test_image
+
+        real_verify_upload = verification._verify_upload
+        calls = []
+
+        async def counting_verify_upload(*args):
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return await real_verify_upload(*args)
+
+        monkeypatch.setattr(verification, "_verify_upload", counting_verify_upload)
+        img = create_test_image(color="coral")
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    "/api/v1/verify/image",
+                    files={"file": ("test.png", img, "image/png")},
+                )
+                for _ in range(5)
+            )
+        )
+        assert all(r.status_code == 200 for r in responses)
+        assert len(calls) == 1
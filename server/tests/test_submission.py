@@ -0,0 +1,126 @@
+"""Tests for the parallel asset submission pipeline."""
+
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services import image_tasks, ocr
+from app.services.encryption import decrypt_data, decrypt_dek
+from app.services.storage import retrieve_blob
+from app.services.submission import run_submission, submission_stats
+from tests.conftest import create_test_image
+
+STATEMENT = "Authorised by J. Smith, 12 Main Street, Wellington"
+BLOB_PREFIXES = ("assets", "badges", "qrcodes", "thumbnails", "promoter")
+
+
+def _stored_blobs() -> list[Path]:
+    root = Path(settings.LOCAL_STORAGE_PATH)
+    return [
+        path
+        for prefix in BLOB_PREFIXES
+        if (root / prefix).is_dir()
+        for path in (root / prefix).iterdir()
+    ]
+
+
+@pytest.fixture
+def no_statement_found(monkeypatch):
+    monkeypatch.setattr(ocr, "_run_tesseract", lambda image: "")
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    submission_stats.reset()
+
+
+class TestRunSubmission:
+    @pytest.mark.parametrize("parallel", [True, False])
+    async def test_stores_every_derivative(
+        self, parallel, monkeypatch, no_statement_found
+    ):
+        monkeypatch.setattr(settings, "SUBMISSION_PARALLEL_STAGES", parallel)
+        image = create_test_image(400, 300, "orange")
+        result = await run_submission(
+            image, "abc123", "Labour", None, STATEMENT, "bottom-left"
+        )
+
+        assert result.promoter_check["found"] is False
+        assert result.promoter_storage_key.startswith("promoter/")
+        assert set(result.derivative_hashes) == {"badge", "promoter"}
+        # Derivatives are matched by SHA-256 only, so no PDQ is computed
+        assert result.derivative_hashes["badge"]["pdq_hash"] is None
+        assert len(_stored_blobs()) == 5
+        dek = decrypt_dek(result.encrypted_dek)
+        encrypted = await retrieve_blob(result.storage_key)
+        assert decrypt_data(encrypted, dek, result.nonce) == image
+
+        stages = submission_stats.stats()["stages"]
+        if parallel:
+            expected = {"promoter", "badge", "hashes"}
+        else:
+            expected = {"process"}
+        assert set(stages) == expected | {"encrypt", "store"}
+        assert stages["store"]["completed"] == 5
+
+    async def test_parallel_matches_single_task(self, monkeypatch):
+        image = create_test_image(400, 300, "green")
+        single = await run_submission(image, "abc123", "Labour")
+        monkeypatch.setattr(settings, "SUBMISSION_PARALLEL_STAGES", True)
+        parallel = await run_submission(image, "abc123", "Labour")
+        assert parallel.hashes == single.hashes
+        assert parallel.derivative_hashes == single.derivative_hashes
+        assert parallel.promoter_check is None
+        assert parallel.promoter_storage_key is None
+        assert len(_stored_blobs()) == 8
+
+    async def test_failed_stage_removes_stored_blobs(self, monkeypatch):
+        def broken(image):
+            raise ValueError("thumbnail failed")
+
+        monkeypatch.setattr(settings, "SUBMISSION_PARALLEL_STAGES", True)
+        monkeypatch.setattr(image_tasks, "generate_thumbnail", broken)
+        with pytest.raises(ValueError):
+            await run_submission(create_test_image(), "abc123", "Labour")
+        assert _stored_blobs() == []
+        assert submission_stats.stats()["stages"]["hashes"]["failed"] == 1
+        assert submission_stats.stats()["rollbacks"] == 1
+
+    async def test_discard_removes_blobs(self):
+        result = await run_submission(create_test_image(), "abc123", "Labour")
+        assert len(_stored_blobs()) == 4
+        await result.discard()
+        assert _stored_blobs() == []
+
+
+class TestSubmitAssetPipeline:
+    async def test_invalid_metadata_stores_nothing(
+        self, client: AsyncClient, auth_headers: dict
+    ):
+        resp = await client.post(
+            "/api/v1/assets",
+            files={"file": ("campaign.png", create_test_image(), "image/png")},
+            data={"metadata": "{not json"},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 400
+        assert _stored_blobs() == []
+
+    async def test_failed_commit_removes_blobs(
+        self, client: AsyncClient, auth_headers: dict, monkeypatch
+    ):
+        async def failing_commit(self):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+        with pytest.raises(RuntimeError):
+            await client.post(
+                "/api/v1/assets",
+                files={"file": ("campaign.png", create_test_image(), "image/png")},
+                headers=auth_headers,
+            )
+        assert _stored_blobs() == []
+        assert submission_stats.stats()["stages"]["commit"]["failed"] == 1
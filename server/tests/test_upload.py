@@ -0,0 +1,139 @@
+"""Tests for chunked upload ingestion."""
+
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+from httpx import AsyncClient
+from PIL import Image
+
+from app.api import assets
+from app.services.upload import (
+    EmptyUpload,
+    RASTER_IMAGE_TYPES,
+    UploadRejected,
+    ingest_upload,
+    sniff_mime_type,
+)
+from tests.conftest import create_test_image
+
+
+def _upload(data: bytes, size: int | None = None) -> UploadFile:
+    return UploadFile(io.BytesIO(data), size=size, filename="upload")
+
+
+class _CountingFile(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class TestSniffMimeType:
+    @pytest.mark.parametrize(
+        "head, expected",
+        [
+            (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+            (b"\x89PNG\r\n\x1a\n\x00\x00", "image/png"),
+            (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+            (b"GIF89a\x01\x00", "image/gif"),
+            (b"BM" + bytes(8) + b"\x36\x00\x00\x00\x28\x00\x00\x00", "image/bmp"),
+            (b"BM" + bytes(8) + b"\x1a\x00\x00\x00\x0c\x00\x00\x00", "image/bmp"),
+            (b"BMW sales figures 2024", None),
+            (b"BM" + bytes(8) + b"\x10\x00\x00\x00\x28\x00\x00\x00", None),
+            (b"BM\x00\x00", None),
+            (b"%PDF-1.7\n", "application/pdf"),
+            (b'\xef\xbb\xbf<?xml version="1.0"?>\n<svg xmlns=', "image/svg+xml"),
+            (b"  <svg width='1'>", "image/svg+xml"),
+            (b"<?xml version='1.0'?><html>", None),
+            (b"not an image", None),
+        ],
+    )
+    def test_signatures(self, head, expected):
+        assert sniff_mime_type(head) == expected
+
+    @pytest.mark.parametrize("mode", ["RGB", "P", "1"])
+    def test_bmp_written_by_pillow(self, mode):
+        buf = io.BytesIO()
+        Image.new(mode, (8, 8)).save(buf, format="BMP")
+        assert sniff_mime_type(buf.getvalue()) == "image/bmp"
+
+
+class TestIngestUpload:
+    async def test_hashes_in_chunks(self):
+        data = create_test_image(width=300, height=300)
+        upload = await ingest_upload(_upload(data), RASTER_IMAGE_TYPES, chunk_size=100)
+        assert upload.mime_type == "image/png"
+        assert upload.size == len(data)
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+        assert await upload.read() == data
+
+    async def test_rejects_non_image_after_first_chunk(self):
+        source = _CountingFile(b"MZ" + b"\x00" * 10000)
+        with pytest.raises(UploadRejected) as exc:
+            await ingest_upload(
+                UploadFile(source, filename="x.png"), RASTER_IMAGE_TYPES, chunk_size=1024
+            )
+        assert exc.value.status_code == 400
+        assert source.bytes_read == 1024
+
+    async def test_aborts_once_over_the_cap(self):
+        source = _CountingFile(create_test_image() + b"\x00" * 10000)
+        with pytest.raises(UploadRejected) as exc:
+            await ingest_upload(
+                UploadFile(source, filename="x.png"),
+                RASTER_IMAGE_TYPES,
+                max_size=2048,
+                chunk_size=1024,
+            )
+        assert exc.value.status_code == 413
+        assert source.bytes_read <= 3 * 1024
+
+    async def test_declared_size_rejected_before_reading(self):
+        source = _CountingFile(create_test_image())
+        with pytest.raises(UploadRejected) as exc:
+            await ingest_upload(
+                UploadFile(source, size=10**9, filename="x.png"), RASTER_IMAGE_TYPES
+            )
+        assert exc.value.status_code == 413
+        assert source.bytes_read == 0
+
+    async def test_empty(self):
+        with pytest.raises(EmptyUpload):
+            await ingest_upload(_upload(b""), RASTER_IMAGE_TYPES)
+
+
+class TestUploadEndpoints:
+    async def test_verify_rejects_non_image(self, client: AsyncClient):
+        resp = await client.post(
+            "/api/v1/verify/image",
+            files={"file": ("fake.png", b"plain text, not pixels", "image/png")},
+        )
+        assert resp.status_code == 400
+
+    async def test_submit_records_sniffed_type(
+        self, client: AsyncClient, auth_headers: dict
+    ):
+        resp = await client.post(
+            "/api/v1/assets",
+            files={"file": ("photo.jpg", create_test_image(), "image/jpeg")},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 201
+        assert resp.json()["mime_type"] == "image/png"
+
+    async def test_submit_too_large(
+        self, client: AsyncClient, auth_headers: dict, monkeypatch
+    ):
+        monkeypatch.setattr(assets, "MAX_FILE_SIZE", 100)
+        resp = await client.post(
+            "/api/v1/assets",
+            files={"file": ("big.png", create_test_image(), "image/png")},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 413
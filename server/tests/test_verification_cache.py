@@ -0,0 +1,117 @@
+"""Tests for the verification outcome cache."""
+
+import time
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.verification import MatchType, VerificationResult
+from app.schemas.verification import VerificationResponse
+from app.services.verification_cache import (
+    VerificationCache,
+    hash_key,
+    image_key,
+    verification_cache,
+)
+from tests.conftest import create_test_image
+from tests.test_api_verification import _insert_test_asset
+
+
+def _response(verified: bool = False) -> VerificationResponse:
+    return VerificationResponse(
+        verified=verified,
+        result=VerificationResult.VERIFIED if verified else VerificationResult.UNVERIFIED,
+        match_type=MatchType.EXACT if verified else MatchType.NONE,
+        confidence=1.0 if verified else 0.0,
+    )
+
+
+class TestVerificationCache:
+    def test_hit_and_miss(self):
+        cache = VerificationCache(max_size=10, ttl_seconds=60)
+        assert cache.get(image_key("a")) is None
+        cache.put(image_key("a"), _response(True), cache.generation)
+        assert cache.get(image_key("a")).verified is True
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_returns_copies(self):
+        cache = VerificationCache(max_size=10, ttl_seconds=60)
+        cache.put(image_key("a"), _response(), cache.generation)
+        cache.get(image_key("a")).promoter_detected = True
+        assert cache.get(image_key("a")).promoter_detected is False
+
+    def test_lru_eviction(self):
+        cache = VerificationCache(max_size=2, ttl_seconds=60)
+        for key in ("a", "b"):
+            cache.put(image_key(key), _response(), cache.generation)
+        cache.get(image_key("a"))
+        cache.put(image_key("c"), _response(), cache.generation)
+        assert cache.get(image_key("b")) is None
+        assert cache.get(image_key("a")) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        cache = VerificationCache(max_size=10, ttl_seconds=0.01)
+        cache.put(image_key("a"), _response(), cache.generation)
+        time.sleep(0.02)
+        assert cache.get(image_key("a")) is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_stale_generation_not_stored(self):
+        cache = VerificationCache(max_size=10, ttl_seconds=60)
+        generation = cache.generation
+        cache.clear()
+        cache.put(image_key("a"), _response(), generation)
+        assert len(cache) == 0
+
+    def test_hash_key_normalises_case(self):
+        assert hash_key(None, "ABCD", None) == hash_key(None, "abcd", None)
+
+
+class TestVerificationCacheApi:
+    async def test_cached_miss_invalidated_by_registration(
+        self, client: AsyncClient, db_session: AsyncSession, sample_party, admin_user
+    ):
+        img = create_test_image(color="olive")
+        resp = await client.post(
+            "/api/v1/verify/image", files={"file": ("test.png", img, "image/png")}
+        )
+        assert resp.json()["verified"] is False
+        resp = await client.post(
+            "/api/v1/verify/image", files={"file": ("test.png", img, "image/png")}
+        )
+        assert resp.json()["verified"] is False
+        assert verification_cache.stats()["hits"] == 1
+
+        # Direct inserts bypass the API, so invalidate as submit_asset does
+        await _insert_test_asset(db_session, sample_party, admin_user.id, img)
+        verification_cache.clear()
+        resp = await client.post(
+            "/api/v1/verify/image", files={"file": ("test.png", img, "image/png")}
+        )
+        assert resp.json()["verified"] is True
+
+    async def test_revocation_clears_cached_hit(
+        self, client: AsyncClient, auth_headers: dict, sample_party
+    ):
+        img = create_test_image(color="maroon")
+        resp = await client.post(
+            "/api/v1/assets",
+            files={"file": ("campaign.png", img, "image/png")},
+            headers=auth_headers,
+        )
+        asset_id = resp.json()["id"]
+        body = {"sha256": resp.json()["sha256_hash"]}
+        assert (await client.post("/api/v1/verify/hash", json=body)).json()["verified"]
+        assert (await client.post("/api/v1/verify/hash", json=body)).json()["verified"]
+        assert verification_cache.stats()["hits"] == 1
+
+        await client.patch(
+            f"/api/v1/assets/{asset_id}",
+            json={"status": "revoked"},
+            headers=auth_headers,
+        )
+        resp = await client.post("/api/v1/verify/hash", json=body)
+        assert resp.json()["verified"] is False